@@ -0,0 +1,43 @@
+import time
+import numpy as np
+from models.q_network import DQNAgent
+from models.inference import NumpyQNetwork
+from config.settings import settings
+
+def latency_us(fn, states, iters: int) -> float:
+    """Mean wall time per call in microseconds"""
+    for _ in range(10):
+        fn(states)
+    start = time.perf_counter()
+    for _ in range(iters):
+        fn(states)
+    return (time.perf_counter() - start) / iters * 1e6
+
+def main(iters: int = 200):
+    agent = DQNAgent(settings.STATE_SIZE, settings.ACTION_SIZE)
+    numpy_net = NumpyQNetwork.from_keras(agent.model)
+    rng = np.random.default_rng(0)
+
+    paths = {
+        'keras_predict': lambda s: agent.model.predict(s, verbose=0),
+        'compiled': agent.q_values,
+        'numpy': numpy_net.q_values
+    }
+    results = {}
+    for batch in (1, 256):
+        states = rng.random((batch, settings.STATE_SIZE), dtype=np.float32)
+        for name, fn in paths.items():
+            n = iters // 10 if name == 'keras_predict' else iters
+            key = f"{name}_batch{batch}_us"
+            results[key] = latency_us(fn, states, n)
+            print(f"{name:>14} | batch {batch:>3} | {results[key]:>10.1f} us/call")
+
+    # DQNAgent.act itself (greedy, so every call runs the network)
+    agent.epsilon = 0.0
+    state = rng.random(settings.STATE_SIZE, dtype=np.float32)
+    results['act_us'] = latency_us(lambda s: agent.act(s), state, iters)
+    print(f"{'DQNAgent.act':>14} | batch   1 | {results['act_us']:>10.1f} us/call")
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import time
+import numpy as np
+from environments.backtest_env import BacktestEnvironment
+from environments.vec_backtest_env import VecBacktestEnvironment
+from benchmarks.data import synthetic_candles
+
+def main(bars: int = 100_000, num_envs: int = 64):
+    data = synthetic_candles(bars)
+    actions = np.random.default_rng(0).integers(0, 3, bars).tolist()
+
+    env = BacktestEnvironment(data, copy_state=False)
+    env.reset()
+    step = env.step
+    start = time.perf_counter()
+    for action in actions[:env.max_steps]:
+        step(action)
+    single = env.max_steps / (time.perf_counter() - start)
+
+    vec = VecBacktestEnvironment(data, num_envs, episode_length=1000, random_starts=True, seed=0)
+    vec.reset()
+    batch_actions = np.random.default_rng(1).integers(0, 3, (bars // num_envs, num_envs))
+    start = time.perf_counter()
+    for row in batch_actions:
+        vec.step(row)
+    vectorized = batch_actions.size / (time.perf_counter() - start)
+
+    results = {'step_per_sec': single, 'vec_env_steps_per_sec': vectorized}
+    print(f"BacktestEnvironment.step | {single:,.0f} steps/s")
+    print(f"VecBacktestEnvironment   | {vectorized:,.0f} env-steps/s ({num_envs} envs)")
+    return results
+
+if __name__ == "__main__":
+    main()
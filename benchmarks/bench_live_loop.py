@@ -0,0 +1,81 @@
+import asyncio
+import time
+import numpy as np
+import pandas as pd
+from environments.live_env import LiveTradingEnvironment
+from environments.async_live_env import AsyncLiveTradingEnvironment
+from models.q_network import DQNAgent
+from utils.market_feed import ReplayFeed
+from utils.sim_exchange import SimulatedExchange, AsyncSimulatedExchange
+from config.settings import settings
+from benchmarks.data import scratch_logs
+import main_live_async
+
+def make_exchange(latency: float) -> SimulatedExchange:
+    """Simulated exchange with deep quotes around the replayed prices"""
+    base = settings.SYMBOL.split('/')[0]
+    exchange = SimulatedExchange(balances={'USDT': settings.INITIAL_BALANCE, base: 1.0}, latency=latency)
+    exchange.set_mid_price(100.0, levels=400, size=1e6, tick=0.05)
+    return exchange
+
+
+def replay_feed(steps: int, pushes_per_sec: float = 100.0) -> ReplayFeed:
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 0.1, steps + 10))
+    candles = pd.DataFrame({
+        'timestamp': np.arange(len(close)) * 60_000, 'open': close, 'high': close + 0.1,
+        'low': close - 0.1, 'close': close, 'volume': 1000.0
+    })
+    # An unthrottled replay thread would compete with the loop for the GIL
+    speed = pushes_per_sec * 60.0
+    return ReplayFeed(candles, timeframe='1m', speed=speed, loop=True)
+
+
+def _summary(name: str, latencies: list, elapsed: float) -> dict:
+    ms = np.array(latencies) * 1e3
+    result = {
+        'mean_ms': float(ms.mean()), 'p50_ms': float(np.percentile(ms, 50)),
+        'p99_ms': float(np.percentile(ms, 99)), 'decisions_per_sec': len(ms) / elapsed
+    }
+    print(f"{name:>6} | decision-to-order mean {result['mean_ms']:.2f} ms | "
+          f"p50 {result['p50_ms']:.2f} ms | p99 {result['p99_ms']:.2f} ms | "
+          f"{result['decisions_per_sec']:.1f} decisions/s")
+    return result
+
+
+def bench_sync(agent, steps: int, latency: float) -> dict:
+    """The main_live.py loop: act, then a blocking step"""
+    env = LiveTradingEnvironment(exchange=make_exchange(latency), feed=replay_feed(steps))
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(steps):
+        state = env.get_state()
+        action = agent.act(state)
+        decided = time.perf_counter()
+        next_state, reward, done, _ = env.step(action)
+        latencies.append(time.perf_counter() - decided)
+        agent.remember(state, action, reward, next_state, done)
+        agent.train()
+    elapsed = time.perf_counter() - start
+    env.feed.stop()
+    return _summary('sync', latencies, elapsed)
+
+
+def bench_async(agent, steps: int, latency: float) -> dict:
+    """main_live_async.run deciding as fast as possible (interval 0)"""
+    env = AsyncLiveTradingEnvironment(exchange=AsyncSimulatedExchange(make_exchange(latency)), feed=replay_feed(steps))
+    start = time.perf_counter()
+    latencies = asyncio.run(main_live_async.run(env, agent, interval=0, max_steps=steps))
+    return _summary('async', latencies, time.perf_counter() - start)
+
+
+def main(steps: int = 200, latency: float = 0.02):
+    agent = DQNAgent(settings.STATE_SIZE, settings.ACTION_SIZE)
+    # Simulated orders are logged; keep them out of the real trading log
+    with scratch_logs():
+        return {
+            'sync': bench_sync(agent, steps, latency),
+            'async': bench_async(agent, steps, latency)
+        }
+
+if __name__ == "__main__":
+    main()
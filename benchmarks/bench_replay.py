@@ -0,0 +1,64 @@
+import tempfile
+import time
+import numpy as np
+from utils.memory import ReplayBuffer, PrioritizedReplayBuffer, DiskReplayBuffer
+from config.settings import settings
+
+def bench_sample(buffer, batch_size: int, iters: int) -> float:
+    """Batches sampled per second"""
+    sample = buffer.sample
+    start = time.perf_counter()
+    for _ in range(iters):
+        sample(batch_size)
+    return iters / (time.perf_counter() - start)
+
+def bench_add(buffer, state_size: int, count: int) -> float:
+    """Single-transition adds per second (the per-step ``remember`` path)"""
+    state = np.zeros(state_size, dtype=np.float32)
+    add = buffer.add
+    start = time.perf_counter()
+    for i in range(count):
+        add(state, i % 3, 0.0, state, False)
+    return count / (time.perf_counter() - start)
+
+def fill(buffer, count: int, state_size: int):
+    """Fill a buffer in chunks with random transitions"""
+    chunk = 100_000
+    rng = np.random.default_rng(0)
+    for start in range(0, count, chunk):
+        n = min(chunk, count - start)
+        states = rng.random((n, state_size), dtype=np.float32)
+        buffer.add_batch(states, rng.integers(0, 3, n), rng.random(n), states, np.zeros(n, dtype=bool))
+
+def main(capacities=(10_000, 100_000, 1_000_000), iters: int = 2000, adds: int = 100_000):
+    batch_size = settings.BATCH_SIZE
+    state_size = settings.STATE_SIZE
+    results = {}
+    names = ('uniform', 'prioritized', 'disk')
+    tmp = tempfile.TemporaryDirectory()
+
+    for capacity in capacities:
+        uniform = ReplayBuffer(capacity, state_size)
+        prioritized = PrioritizedReplayBuffer(capacity, state_size)
+        disk = DiskReplayBuffer(capacity, state_size, directory=f"{tmp.name}/{capacity}")
+        for name, buffer in zip(names, (uniform, prioritized, disk)):
+            results[f"{name}_{capacity}_add_per_sec"] = bench_add(buffer, state_size, min(adds, capacity))
+            fill(buffer, capacity, state_size)
+        disk.flush()
+
+        # Spread priorities so the tree is not flat
+        rng = np.random.default_rng(1)
+        prioritized.update_priorities(np.arange(capacity), rng.exponential(size=capacity))
+
+        results[f"uniform_{capacity}_sample_per_sec"] = bench_sample(uniform, batch_size, iters)
+        results[f"prioritized_{capacity}_sample_per_sec"] = bench_sample(prioritized, batch_size, iters)
+        results[f"disk_{capacity}_sample_per_sec"] = bench_sample(disk, batch_size, iters)
+        for name in names:
+            print(f"{name:>12} | capacity {capacity:>9,} | "
+                  f"add {results[f'{name}_{capacity}_add_per_sec']:>10,.0f}/s | "
+                  f"sample (batch {batch_size}) {results[f'{name}_{capacity}_sample_per_sec']:>8,.0f} batches/s")
+    tmp.cleanup()
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import time
+import numpy as np
+from utils.sim_exchange import SimulatedExchange
+from config.settings import settings
+
+def main(orders: int = 100_000):
+    """Orders/sec through the matching engine with a mix of crossing and resting orders"""
+    base = settings.SYMBOL.split('/')[0]
+    exchange = SimulatedExchange(balances={'USDT': 1e12, base: 1e9}, min_cost=0.0)
+    exchange.load_markets()
+    exchange.set_mid_price(100.0, levels=50, size=1e6)
+
+    rng = np.random.default_rng(0)
+    sides = rng.integers(0, 2, orders)
+    prices = np.round(100.0 + rng.normal(0, 0.2, orders), 2).tolist()
+    amounts = np.round(rng.uniform(0.01, 5.0, orders), 3).tolist()
+    buy, sell = exchange.create_limit_buy_order, exchange.create_limit_sell_order
+    symbol = settings.SYMBOL
+
+    start = time.perf_counter()
+    for side, price, amount in zip(sides, prices, amounts):
+        (buy if side == 0 else sell)(symbol, amount, price)
+    elapsed = time.perf_counter() - start
+
+    closed = sum(1 for o in exchange.orders.values() if o.status == 'closed')
+    result = {'orders_per_sec': orders / elapsed, 'filled_fraction': closed / orders}
+    print(f"Simulated exchange | {result['orders_per_sec']:,.0f} orders/s | "
+          f"{result['filled_fraction']:.1%} fully filled")
+    return result
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import time
+import numpy as np
+from environments.backtest_env import BacktestEnvironment
+from models.q_network import DQNAgent
+from training.episodes import train_episodes
+from benchmarks.data import synthetic_candles
+from config.settings import settings
+
+def main(train_steps: int = 300, episode_bars: int = 1000):
+    agent = DQNAgent(settings.STATE_SIZE, settings.ACTION_SIZE)
+    rng = np.random.default_rng(0)
+    n = settings.BATCH_SIZE * 20
+    states = rng.random((n, settings.STATE_SIZE), dtype=np.float32)
+    agent.memory.add_batch(states, rng.integers(0, 3, n), rng.random(n), states, np.zeros(n, dtype=bool))
+
+    # DQNAgent.train: sample + compiled gradient step (first calls trace the graph)
+    for _ in range(10):
+        agent.train()
+    start = time.perf_counter()
+    for _ in range(train_steps):
+        agent.train()
+    train_ms = (time.perf_counter() - start) / train_steps * 1e3
+
+    # One main_backtest2-style episode: act, step, remember, train every bar
+    env = BacktestEnvironment(synthetic_candles(episode_bars))
+    start = time.perf_counter()
+    train_episodes(agent, env, 1)
+    episode_seconds = time.perf_counter() - start
+
+    results = {
+        'train_step_ms': train_ms,
+        'episode_seconds': episode_seconds,
+        'episode_steps_per_sec': env.max_steps / episode_seconds
+    }
+    print(f"DQNAgent.train | {train_ms:.2f} ms/step (batch {settings.BATCH_SIZE})")
+    print(f"Episode        | {episode_seconds:.2f} s for {env.max_steps} bars "
+          f"({results['episode_steps_per_sec']:.0f} steps/s)")
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import contextlib
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from config.settings import settings
+
+def synthetic_candles(bars: int, seed: int = 0, start_price: float = 100.0) -> pd.DataFrame:
+    """Random-walk 1m OHLCV candles so benchmarks need no network or data files"""
+    rng = np.random.default_rng(seed)
+    close = start_price * np.cumprod(1 + rng.normal(0, 0.001, bars))
+    spread = close * rng.uniform(0, 0.002, bars)
+    return pd.DataFrame({
+        'timestamp': np.arange(bars, dtype=np.int64) * 60_000,
+        'open': np.concatenate(([start_price], close[:-1])),
+        'high': close + spread, 'low': close - spread, 'close': close,
+        'volume': rng.uniform(100, 1000, bars)
+    })
+
+
+@contextlib.contextmanager
+def scratch_logs():
+    """Send TradingLogger output and the trade journal to a temporary directory"""
+    with tempfile.TemporaryDirectory(prefix='bench-logs-') as directory:
+        with settings.override(LOG_PATH=os.path.join(directory, 'trading.log'),
+                               JOURNAL_DIR=os.path.join(directory, 'journal')):
+            yield directory
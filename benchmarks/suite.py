@@ -0,0 +1,133 @@
+"""Run every hot-path benchmark, save JSON and compare against a baseline
+
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --quick --compare bench.json
+
+Metric direction comes from the name: ``*_per_sec`` is higher-is-better,
+``*_us``/``*_ms``/``*_seconds`` lower-is-better; anything else is reported
+but never flagged.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+# CPU-only and quiet, set before TensorFlow is imported by any benchmark
+os.environ.setdefault('CUDA_VISIBLE_DEVICES', '-1')
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+# name -> (module, full kwargs, quick kwargs)
+BENCHMARKS = {
+    'env': ('benchmarks.bench_env', {}, {'bars': 20_000}),
+    'replay': ('benchmarks.bench_replay', {}, {'capacities': (10_000, 100_000), 'iters': 500, 'adds': 20_000}),
+    'act': ('benchmarks.bench_act', {}, {'iters': 50}),
+    'train': ('benchmarks.bench_train', {}, {'train_steps': 50, 'episode_bars': 200}),
+    'live': ('benchmarks.bench_live_loop', {}, {'steps': 50}),
+    'sim_exchange': ('benchmarks.bench_sim_exchange', {}, {'orders': 20_000}),
+}
+
+HIGHER_IS_BETTER = ('_per_sec',)
+LOWER_IS_BETTER = ('_us', '_ms', '_seconds')
+
+
+def _flatten(results: dict, prefix: str = '') -> dict:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{name}."))
+        else:
+            flat[name] = float(value)
+    return flat
+
+
+def _environment() -> dict:
+    import numpy as np
+    import tensorflow as tf
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit, 'python': platform.python_version(), 'platform': platform.platform(),
+        'cpu_count': os.cpu_count(), 'numpy': np.__version__, 'tensorflow': tf.__version__
+    }
+
+
+def run(names=None, quick: bool = False) -> dict:
+    """Run the selected benchmarks; returns ``{'environment', 'results'}``"""
+    import importlib
+    from benchmarks.data import scratch_logs
+    results = {}
+    with scratch_logs():
+        for name in names or BENCHMARKS:
+            module, full, short = BENCHMARKS[name]
+            print(f"\n== {name}")
+            results.update(_flatten(importlib.import_module(module).main(**(short if quick else full)), f"{name}."))
+    return {'environment': _environment(), 'quick': quick, 'results': results}
+
+
+def direction(metric: str) -> int:
+    """+1 higher is better, -1 lower is better, 0 informational"""
+    if metric.endswith(HIGHER_IS_BETTER):
+        return 1
+    if metric.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.10) -> list:
+    """Metrics that got worse than the baseline by more than ``threshold`` (relative)"""
+    regressions = []
+    print(f"\n{'metric':<45} {'baseline':>14} {'current':>14} {'change':>9}")
+    for metric, value in current['results'].items():
+        base = baseline['results'].get(metric)
+        sign = direction(metric)
+        if base is None or not base or sign == 0:
+            continue
+        change = (value - base) / abs(base)
+        worse = -change * sign > threshold
+        flag = '  REGRESSION' if worse else ''
+        print(f"{metric:<45} {base:>14.4g} {value:>14.4g} {change:>+8.1%}{flag}")
+        if worse:
+            regressions.append({'metric': metric, 'baseline': base, 'current': value, 'change': change})
+    if current.get('quick') != baseline.get('quick'):
+        print("Warning: comparing quick and full runs; sizes differ")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default='benchmarks/results.json', help="JSON file to write")
+    parser.add_argument('--compare', metavar='BASELINE', help="Baseline JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Relative slowdown that counts as a regression")
+    parser.add_argument('--only', help="Comma-separated subset of: " + ', '.join(BENCHMARKS))
+    parser.add_argument('--quick', action='store_true', help="Smaller sizes for a fast smoke run")
+    args = parser.parse_args(argv)
+
+    names = args.only.split(',') if args.only else None
+    report = run(names, args.quick)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        report['regressions'] = regressions
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            return 1
+        print("\nNo regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,4 @@
+from contextlib import contextmanager
 from dataclasses import dataclass
 
 @dataclass
@@ -7,11 +8,33 @@ class Settings:
     BATCH_SIZE: int = 64             # Experience replay batch size
     MEMORY_SIZE: int = 10000         # Replay buffer capacity
     GAMMA: float = 0.99              # Discount factor
+    N_STEP: int = 1                  # Rewards summed before bootstrapping (n-step targets)
     EPS_START: float = 1.0           # Initial exploration rate
     EPS_MIN = 0.01  # Minimum exploration rate
     EPS_END: float = 0.01            # Minimum exploration rate
     EPS_DECAY: float = 0.995         # Exploration decay rate
     TAU: float = 0.005               # Target network update rate
+    XLA_TRAIN_STEP: bool = False     # XLA-compile the train step graph
+
+    # Actor/Learner Training
+    NUM_ACTORS: int = 2              # Experience-collecting actor threads
+    REPLAY_RATIO: float = 1.0        # Gradient updates per actor step
+    WEIGHT_PUBLISH_INTERVAL: int = 50  # Learner updates between policy refreshes
+    NUM_WORKERS: int = 4             # Collector processes (multi-process mode)
+    TRANSITION_RING_SIZE: int = 4096 # Per-worker shared-memory transition slots
+
+    # Prioritized Replay
+    PRIORITIZED_REPLAY: bool = False # Sample by TD error instead of uniformly
+    PER_ALPHA: float = 0.6           # Priority exponent (0 = uniform)
+    PER_BETA: float = 0.4            # Initial importance-sampling exponent
+    PER_BETA_INCREMENT: float = 0.001  # Beta annealing per sample, capped at 1
+    PER_EPSILON: float = 1e-6        # Keeps zero-error transitions sampleable
+
+    # Disk-backed Replay (uniform sampling only)
+    DISK_REPLAY: bool = False        # Keep the replay buffer in memory-mapped files
+    REPLAY_DIR: str = "replay"       # Parent of the per-run buffer directories (resumed via checkpoints)
+    REPLAY_HOT_SIZE: int = 65536     # Newest transitions held in RAM before a sequential write
+    INDEXED_REPLAY: bool = False     # Store bar indices + account columns instead of full states (backtests)
     
     # Trading Parameters
     SYMBOL: str = "SOL/USDT"
@@ -20,17 +43,56 @@ class Settings:
     MAX_RISK_PCT: float = 0.05       # Max % of capital per trade
     FEE_RATE: float = 0.001          # Transaction fee percentage
     MAX_POSITION: float = 100.0      # Maximum allowed position size
+    DECISION_INTERVAL: float = 60.0  # Seconds between live decisions (async loop)
+    MARKET_DATA_TIMEOUT: float = 120.0  # Seconds without a feed push before the live loop reports it
     
     # Risk Management
     RISK_FREE_RATE: float = 0.0001   # For Sharpe ratio calculation
     DRAWDOWN_PENALTY: float = 2.0    # Drawdown penalty multiplier
     
+    # State Features
+    FEATURES: tuple = ()             # Indicators appended to the state, e.g. ('ema_12', 'rsi_14', 'atr_14', 'vol_20', 'zscore_close_20')
+    FEATURE_WARMUP: int = 500        # Closed bars replayed from the candle store into live features
+    BASE_STATE_SIZE: int = 7         # Market (4) + account (2) + price change
+
     # Network Architecture
-    STATE_SIZE: int = 7              # Must match state representation
     ACTION_SIZE: int = 3             # Buy, Sell, Hold
     
+    # Diagnostics
+    INSTRUMENTATION: bool = False    # Time hot-path stages and report p50/p99
+    INSTRUMENTATION_REPORT_INTERVAL: float = 60.0  # Seconds between stage breakdowns
+    PROFILE_STEPS: int = 0           # Capture a profiler trace for this many env steps (0 = off)
+    PROFILE_MODE: str = "cprofile"   # "cprofile" or "tf"
+
     # Paths
     MODEL_PATH: str = "models/trained_model.weights.h5"  # Must use .h5 extension
     LOG_PATH: str = "logs/trading.log"
+    ASYNC_LOGGING: bool = True       # Write logs from a background thread via a queue
+    TRADE_JOURNAL: bool = True       # Binary order/balance/performance journal
+    JOURNAL_DIR: str = "logs/journal"
+    CHECKPOINT_DIR: str = "checkpoints"  # Full training-state snapshots (resume point)
+    CHECKPOINT_INTERVAL: int = 10    # Episodes between checkpoints
+    CHECKPOINT_KEEP: int = 3         # Most recent checkpoints kept on disk
+    DATA_DIR: str = "data/candles"   # Local columnar candle store
+
+    @property
+    def STATE_SIZE(self) -> int:
+        """Derived from the feature set so it always matches the state"""
+        return self.BASE_STATE_SIZE + len(self.FEATURES)
+
+    @contextmanager
+    def override(self, **changes):
+        """Temporarily replace settings; the previous values are restored on exit"""
+        for name in changes:
+            if not hasattr(self, name) or isinstance(getattr(type(self), name, None), property):
+                raise ValueError(f"Unknown setting: {name}")
+        previous = {name: getattr(self, name) for name in changes}
+        try:
+            for name, value in changes.items():
+                setattr(self, name, value)
+            yield self
+        finally:
+            for name, value in previous.items():
+                setattr(self, name, value)
 
 settings = Settings()
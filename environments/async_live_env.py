@@ -0,0 +1,135 @@
+import asyncio
+import time
+import numpy as np
+from utils.risk_manager import RiskManager
+from utils.logger import TradingLogger
+from utils.market_feed import CcxtProFeed
+from utils.features import ClosedCandleFeatures
+from utils.instrumentation import instruments, timed
+from config.settings import settings
+from utils.candle_store import CandleStore
+from .live_env import build_live_state, warm_up_features
+
+class AsyncLiveTradingEnvironment:
+    """Asyncio variant of ``LiveTradingEnvironment``
+
+    Works with an async exchange (``ccxt.async_support`` or any object with
+    awaitable ``fetch_balance``/``create_limit_*_order``/``load_markets``).
+    Market data comes from the feed cache, so a step only waits on the
+    exchange for the order and, once it completes, the balance refresh.
+    """
+
+    def __init__(self, exchange=None, feed=None, store=None):
+        self.exchange = exchange if exchange is not None else self._default_exchange()
+        self.feed = feed if feed is not None else CcxtProFeed(settings.SYMBOL, settings.TIMEFRAME)
+        self.market_data = self.feed.cache
+        self.features = ClosedCandleFeatures(self.market_data)
+        self.rm = RiskManager()
+        self.logger = TradingLogger(settings.LOG_PATH)
+        self.asset = settings.SYMBOL.split('/')[0]
+        if settings.FEATURES:
+            # Seeded from stored history only; keep the store current with data_fetcher.load_candles
+            bars = warm_up_features(self.features, store if store is not None else CandleStore(settings.DATA_DIR))
+            if bars < settings.FEATURE_WARMUP:
+                self.logger.log_error(f"Feature warm-up used {bars} of {settings.FEATURE_WARMUP} bars")
+
+        self.balance = settings.INITIAL_BALANCE
+        self.position = 0.0
+        self.current_price = 0.0
+        self.previous_value = 0.0
+        self.current_step = 0
+        self.market = None
+
+    @staticmethod
+    def _default_exchange():
+        import ccxt.async_support as ccxt_async
+        from config.keys import BINANCE_API_KEY, BINANCE_API_SECRET
+        return ccxt_async.binance({
+            'apiKey': BINANCE_API_KEY,
+            'secret': BINANCE_API_SECRET,
+            'enableRateLimit': True
+        })
+
+    async def start(self):
+        """Load markets while waiting for market data, then fetch balances"""
+        if not self.feed.running:
+            self.feed.start()
+        _, ready = await asyncio.gather(
+            self._load_markets(),
+            asyncio.to_thread(self.feed.wait_ready)
+        )
+        if not ready:
+            raise RuntimeError("No market data received from feed")
+        self.market = self.exchange.market(settings.SYMBOL)
+        return await self.reset()
+
+    async def reset(self):
+        self.current_step = 0
+        self._apply_balance(await self._fetch_balance())
+        self.current_price = self.market_data.last_price()
+        self.previous_value = self.balance + self.position * self.current_price
+        return self.get_state()
+
+    async def close(self):
+        self.feed.stop()
+        if hasattr(self.exchange, 'close'):
+            await self.exchange.close()
+
+    async def _load_markets(self):
+        with instruments.timer('exchange.load_markets'):
+            return await self.exchange.load_markets()
+
+    async def _fetch_balance(self) -> dict:
+        with instruments.timer('exchange.fetch_balance'):
+            return await self.exchange.fetch_balance()
+
+    def _apply_balance(self, balances: dict):
+        self.balance = balances['USDT']['free']
+        self.position = balances[self.asset]['free']
+
+    def get_state(self) -> np.ndarray:
+        """Market state from the feed cache (no I/O)"""
+        return build_live_state(self.market_data.candle, self.balance, self.position, self.features)
+
+    async def wait_for_market_data(self, after: int, timeout: float = None) -> int:
+        """Await a feed push newer than sequence ``after`` without blocking the loop"""
+        return await asyncio.to_thread(self.market_data.wait_for_update, after, timeout)
+
+    async def _place_order(self, action: int, price: float):
+        if action != 2 and self.market_data.stale:
+            self.logger.log_error("Market data is stale, order skipped")
+            return None
+        try:
+            if action == 0:  # Buy
+                amount = self.rm.calculate_position_size(self.balance, price, settings.MAX_RISK_PCT)
+                if self.rm.validate_order(amount, price, self.market):
+                    with instruments.timer('exchange.create_order'):
+                        return await self.exchange.create_limit_buy_order(settings.SYMBOL, amount, price)
+            elif action == 1:  # Sell
+                if self.position > 0:
+                    with instruments.timer('exchange.create_order'):
+                        return await self.exchange.create_limit_sell_order(settings.SYMBOL, self.position, price)
+        except Exception as e:
+            self.logger.log_error(f"Order failed: {str(e)}")
+        return None
+
+    @timed('live.step')
+    async def step(self, action: int) -> tuple:
+        """Place the order, then refresh balances so they include its fill"""
+        decided = time.perf_counter()
+        self.current_step += 1
+        self.current_price = self.market_data.last_price()
+
+        order = await self._place_order(action, self.current_price)
+        order_latency = time.perf_counter() - decided
+        if order is not None:
+            self.logger.log_order(order)
+        self._apply_balance(await self._fetch_balance())
+
+        # Reward: change in marked-to-market portfolio value
+        current_value = self.balance + self.position * self.current_price
+        reward = current_value - self.previous_value
+        self.previous_value = current_value
+
+        info = {'order': order, 'order_latency': order_latency}
+        return self.get_state(), reward, False, info
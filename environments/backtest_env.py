@@ -3,23 +3,64 @@ import pandas as pd
 from abc import ABC, abstractmethod
 from config.settings import settings
 from utils.logger import TradingLogger
+from utils.features import compute_features
+from utils.instrumentation import timed
+
+# Columns and scale factors of the market part of the state vector
+MARKET_COLUMNS = ['open', 'high', 'low', 'volume']
+MARKET_SCALES = np.array([1e4, 1e4, 1e4, 1e6])
+# Per-episode part of the state: balance, position, price change (stale after reset)
+ACCOUNT_COLUMNS = slice(4, 7)
+
+
+def build_market_features(historical_data: pd.DataFrame) -> np.ndarray:
+    """Precompute the normalized market features for every bar"""
+    raw = historical_data[MARKET_COLUMNS].to_numpy(dtype=np.float64)
+    return np.ascontiguousarray(raw / MARKET_SCALES)
+
+
+def build_indicator_features(historical_data: pd.DataFrame) -> np.ndarray:
+    """Precompute the configured indicator features (``settings.FEATURES``)"""
+    return compute_features(historical_data, settings.FEATURES)
+
 
 class BacktestEnvironment:
-    """Enhanced backtesting environment with realistic market modeling"""
-    
-    def __init__(self, historical_data: pd.DataFrame):
+    """Enhanced backtesting environment with realistic market modeling
+
+    The OHLCV frame is converted once into contiguous arrays; stepping is
+    pure integer indexing. With ``copy_state=False`` the returned state is
+    a reused buffer that is overwritten on the next ``step``/``reset``.
+    """
+
+    def __init__(self, historical_data: pd.DataFrame, copy_state: bool = True):
         self.historical_data = historical_data
+        self.copy_state = copy_state
         self.current_step = 0
         self.balance = settings.INITIAL_BALANCE
         self.position = 0.0
         self.portfolio_value = settings.INITIAL_BALANCE
         self.logger = TradingLogger(settings.LOG_PATH)
         self.max_steps = len(historical_data) - 1
-        
+
+        # Array views of the data (built once)
+        self.market_features = build_market_features(historical_data)
+        self.indicator_features = build_indicator_features(historical_data)
+        self.close_prices = historical_data['close'].to_numpy(dtype=np.float64)
+        self._closes = self.close_prices.tolist()
+        self._state = np.empty(settings.STATE_SIZE)
+
         # Price tracking
-        self.current_price = historical_data['close'].iloc[0]
+        self.current_price = self._closes[0]
         self.previous_price = self.current_price
-        
+
+    def market_states(self, dtype=np.float32) -> np.ndarray:
+        """State rows for every bar with zeroed account columns (for ``IndexedReplayBuffer``)"""
+        table = np.zeros((len(self.market_features), settings.STATE_SIZE), dtype=dtype)
+        table[:, :4] = self.market_features
+        if settings.FEATURES:
+            table[:, settings.BASE_STATE_SIZE:] = self.indicator_features
+        return table
+
     def reset(self):
         """Reset environment to initial state"""
         self.current_step = 0
@@ -27,38 +68,37 @@ class BacktestEnvironment:
         self.position = 0.0
         self.portfolio_value = settings.INITIAL_BALANCE
         return self._get_state()
-    
+
     def _get_state(self) -> np.ndarray:
         """Get normalized market state"""
-        row = self.historical_data.iloc[self.current_step]
-        return np.array([
-            row['open'] / 1e4,    # Normalized open price
-            row['high'] / 1e4,    # Normalized high price
-            row['low'] / 1e4,     # Normalized low price
-            row['volume'] / 1e6,  # Normalized volume (millions)
-            self.balance / settings.INITIAL_BALANCE,
-            self.position / settings.MAX_POSITION,
-            (self.current_price - self.previous_price) / self.previous_price  # Price change %
-        ])
-    
+        state = self._state
+        state[:4] = self.market_features[self.current_step]
+        state[4] = self.balance / settings.INITIAL_BALANCE
+        state[5] = self.position / settings.MAX_POSITION
+        state[6] = (self.current_price - self.previous_price) / self.previous_price  # Price change %
+        if settings.FEATURES:
+            state[settings.BASE_STATE_SIZE:] = self.indicator_features[self.current_step]
+        return state.copy() if self.copy_state else state
+
+    @timed('env.step')
     def step(self, action: int) -> tuple:
         """Execute one step in the environment"""
         self.current_step += 1
         done = self.current_step >= self.max_steps
-        
+
         # Store previous values
         self.previous_price = self.current_price
-        self.current_price = self.historical_data['close'].iloc[self.current_step]
-        
+        self.current_price = self._closes[self.current_step]
+
         # Execute trade
         self._process_action(action)
-        
+
         # Calculate reward
         reward = self._calculate_reward()
-        
+
         # Get next state
         next_state = self._get_state()
-        
+
         return next_state, reward, done, {}
 
     def _process_action(self, action: int):
@@ -66,15 +106,15 @@ class BacktestEnvironment:
         if action == 0:  # Buy
             max_affordable = (self.balance * settings.MAX_RISK_PCT) / self.current_price
             amount = min(max_affordable, settings.MAX_POSITION - self.position)
-            
+
             if amount > 0:
                 cost = amount * self.current_price * (1 + settings.FEE_RATE)
                 self.balance -= cost
                 self.position += amount
-                
+
         elif action == 1:  # Sell
             amount = min(self.position, settings.MAX_POSITION)
-            
+
             if amount > 0:
                 proceeds = amount * self.current_price * (1 - settings.FEE_RATE)
                 self.balance += proceeds
@@ -84,21 +124,21 @@ class BacktestEnvironment:
         """Risk-adjusted reward function"""
         current_value = self.balance + (self.position * self.current_price)
         raw_return = current_value - self.portfolio_value
-        
+
         # Drawdown penalty
         drawdown = max(0, (self.portfolio_value - current_value) / self.portfolio_value)
-        
+
         # Position risk penalty
         position_penalty = abs(self.position) * 0.001
-        
+
         # Volatility penalty
         price_change = abs(self.current_price - self.previous_price) / self.previous_price
         volatility_penalty = price_change * 0.5
-        
+
         # Combine components
-        reward = raw_return - (drawdown * 2) - position_penalty - volatility_penalty
-        
+        reward = raw_return - (drawdown * settings.DRAWDOWN_PENALTY) - position_penalty - volatility_penalty
+
         # Update portfolio value tracker
         self.portfolio_value = current_value
-        
-        return reward
\ No newline at end of file
+
+        return reward
@@ -1,22 +1,53 @@
+import time
 import ccxt
 import numpy as np
 from .base_env import TradingEnvironment
 # from config import settings
-from config.keys import BINANCE_API_KEY, BINANCE_API_SECRET
 from utils.risk_manager import RiskManager
 from utils.logger import TradingLogger
+from utils.market_feed import CcxtProFeed
+from utils.candle_store import CandleStore, timeframe_to_ms
+from utils.features import ClosedCandleFeatures
+from utils.instrumentation import instruments, timed
 from config.settings import settings  # Correct
+from .backtest_env import MARKET_SCALES
+
+
+def build_live_state(candle, balance: float, position: float, features: ClosedCandleFeatures) -> np.ndarray:
+    """State with the backtest layout from the forming candle and closed-bar features"""
+    state = np.empty(settings.STATE_SIZE)
+    state[:4] = np.array([candle[1], candle[2], candle[3], candle[5]]) / MARKET_SCALES
+    state[4] = balance / settings.INITIAL_BALANCE
+    state[5] = position / settings.MAX_POSITION
+    last_close = features.last_close
+    state[6] = (candle[4] - last_close) / last_close if last_close else 0.0
+    state[settings.BASE_STATE_SIZE:] = features.values
+    return state
+
+
+def warm_up_features(features: ClosedCandleFeatures, store: CandleStore, bars: int = None) -> int:
+    """Replay the newest closed bars in ``store`` through ``features``
+
+    Returns the number of bars replayed. The store should be up to date
+    (``CandleStore.update``) so the history runs into the feed's first bar.
+    """
+    bars = settings.FEATURE_WARMUP if bars is None else bars
+    end = int(time.time() * 1000) - timeframe_to_ms(settings.TIMEFRAME) + 1   # Closed by now
+    return features.warm_up(store.tail(settings.SYMBOL, settings.TIMEFRAME, bars, end))
+
 
 class LiveTradingEnvironment(TradingEnvironment):
-    """Live exchange trading environment"""
+    """Live exchange trading environment
+
+    Market data comes from a push feed (websocket by default) through an
+    in-memory cache, so ``get_state`` and order pricing make no REST calls.
+    States use the same layout and scaling as ``BacktestEnvironment``.
+    Pass ``exchange``/``feed``/``store`` to run against local stand-ins.
+    """
     
-    def __init__(self):
+    def __init__(self, exchange=None, feed=None, store=None):
         super().__init__()
-        self.exchange = ccxt.binance({
-            'apiKey': BINANCE_API_KEY,
-            'secret': BINANCE_API_SECRET,
-            'enableRateLimit': True
-        })
+        self.exchange = exchange if exchange is not None else self._default_exchange()
 
         # First load market data
         self.load_markets()
@@ -25,6 +56,18 @@ class LiveTradingEnvironment(TradingEnvironment):
         self.rm = RiskManager()
         self.logger = TradingLogger(settings.LOG_PATH)
         
+        # Market data feed
+        self.feed = feed if feed is not None else CcxtProFeed(settings.SYMBOL, settings.TIMEFRAME)
+        self.features = ClosedCandleFeatures(self.feed.cache)
+        if settings.FEATURES:
+            self._warm_up_features(store if store is not None else CandleStore(settings.DATA_DIR))
+        if not self.feed.running:
+            self.feed.start()
+        if not self.feed.wait_ready():
+            raise RuntimeError("No market data received from feed")
+        self.market_data = self.feed.cache
+        self._seen_sequence = 0
+        
         # Price tracking
         self.current_price = 0.0
         self.previous_price = 0.0
@@ -43,25 +86,49 @@ class LiveTradingEnvironment(TradingEnvironment):
             self.logger.log_error(f"Initialization failed: {str(e)}")
             raise
 
+    @staticmethod
+    def _default_exchange():
+        from config.keys import BINANCE_API_KEY, BINANCE_API_SECRET
+        return ccxt.binance({
+            'apiKey': BINANCE_API_KEY,
+            'secret': BINANCE_API_SECRET,
+            'enableRateLimit': True
+        })
+
+    def _warm_up_features(self, store: CandleStore):
+        """Bring the candle store up to date and seed the indicators from it"""
+        try:
+            with instruments.timer('exchange.fetch_ohlcv'):
+                store.update(self.exchange, settings.SYMBOL, settings.TIMEFRAME)
+        except Exception as e:
+            self.logger.log_error(f"Candle history update failed: {str(e)}")
+        bars = warm_up_features(self.features, store)
+        if bars < settings.FEATURE_WARMUP:
+            self.logger.log_error(f"Feature warm-up used {bars} of {settings.FEATURE_WARMUP} bars")
+
     def reset(self):
         """Implement abstract method from base class"""
         self.current_step = 0
-        self.balance = self.exchange.fetch_balance()['USDT']['free']
-        self.position = self.exchange.fetch_balance()[settings.SYMBOL.split('/')[0]]['free']
+        with instruments.timer('exchange.fetch_balance'):
+            balances = self.exchange.fetch_balance()
+        self.balance = balances['USDT']['free']
+        self.position = balances[settings.SYMBOL.split('/')[0]]['free']
         return self.get_state()
         
     def load_markets(self):
-        self.exchange.load_markets()
+        with instruments.timer('exchange.load_markets'):
+            self.exchange.load_markets()
         self.market = self.exchange.market(settings.SYMBOL)
         
+    def wait_for_market_data(self, timeout: float = None) -> bool:
+        """Block until the feed has pushed data not yet seen by get_state"""
+        sequence = self.market_data.wait_for_update(self._seen_sequence, timeout)
+        return sequence > self._seen_sequence
+
     def get_state(self) -> np.ndarray:
-        """Get real-time market state"""
-        ticker = self.exchange.fetch_ticker(settings.SYMBOL)
-        ohlcv = self.exchange.fetch_ohlcv(settings.SYMBOL, settings.TIMEFRAME)[-1]
-        return np.array([
-            ohlcv[1], ohlcv[2], ohlcv[3], ohlcv[4],
-            ohlcv[5], self.balance, self.position
-        ])
+        """Get real-time market state from the feed cache"""
+        self._seen_sequence = self.market_data.sequence
+        return build_live_state(self.market_data.candle, self.balance, self.position, self.features)
 
     def _calculate_reward(self):
         """Calculate reward based on portfolio value change"""
@@ -73,6 +140,7 @@ class LiveTradingEnvironment(TradingEnvironment):
         self.previous_price = self.current_price
         return reward
     
+    @timed('live.step')
     def step(self, action: int) -> tuple:
         self.current_step += 1
         done = False  # Live trading never stops automatically
@@ -94,8 +162,11 @@ class LiveTradingEnvironment(TradingEnvironment):
         return next_state, reward, done, {}
     
     def _process_action(self, action: int):
-        ticker = self.exchange.fetch_ticker(settings.SYMBOL)
-        current_price = ticker['last']
+        current_price = self.market_data.last_price()
+        self.current_price = current_price
+        if action != 2 and self.market_data.stale:
+            self.logger.log_error("Market data is stale, order skipped")
+            return
         
         try:
             if action == 0:  # Buy
@@ -103,16 +174,18 @@ class LiveTradingEnvironment(TradingEnvironment):
                     self.balance, current_price, settings.MAX_RISK_PCT
                 )
                 if self.rm.validate_order(amount, current_price, self.market):
-                    order = self.exchange.create_limit_buy_order(
-                        settings.SYMBOL, amount, current_price
-                    )
+                    with instruments.timer('exchange.create_order'):
+                        order = self.exchange.create_limit_buy_order(
+                            settings.SYMBOL, amount, current_price
+                        )
                     self.logger.log_order(order)
                     
             elif action == 1:  # Sell
                 if self.position > 0:
-                    order = self.exchange.create_limit_sell_order(
-                        settings.SYMBOL, self.position, current_price
-                    )
+                    with instruments.timer('exchange.create_order'):
+                        order = self.exchange.create_limit_sell_order(
+                            settings.SYMBOL, self.position, current_price
+                        )
                     self.logger.log_order(order)
                     
         except Exception as e:
@@ -120,8 +193,7 @@ class LiveTradingEnvironment(TradingEnvironment):
 
     def execute_order(self, action: int):
         try:
-            ticker = self.exchange.fetch_ticker(settings.SYMBOL)
-            self.current_price = ticker['last']
+            self.current_price = self.market_data.last_price()
             
             if action == 0:  # Buy
                 amount = self.rm.calculate_position_size(
@@ -130,11 +202,12 @@ class LiveTradingEnvironment(TradingEnvironment):
                     settings.MAX_RISK_PCT
                 )
                 if self.rm.validate_order(amount, self.current_price, self.market):
-                    order = self.exchange.create_limit_buy_order(
-                        settings.SYMBOL, 
-                        amount, 
-                        self.current_price
-                    )
+                    with instruments.timer('exchange.create_order'):
+                        order = self.exchange.create_limit_buy_order(
+                            settings.SYMBOL, 
+                            amount, 
+                            self.current_price
+                        )
                     if order['status'] == 'filled':
                         self.logger.log_order(order)
                         self._log_current_balance()
@@ -143,11 +216,12 @@ class LiveTradingEnvironment(TradingEnvironment):
                 asset = settings.SYMBOL.split('/')[0]
                 amount = self.get_balance(asset)
                 if amount > 0:
-                    order = self.exchange.create_limit_sell_order(
-                        settings.SYMBOL, 
-                        amount, 
-                        self.current_price
-                    )
+                    with instruments.timer('exchange.create_order'):
+                        order = self.exchange.create_limit_sell_order(
+                            settings.SYMBOL, 
+                            amount, 
+                            self.current_price
+                        )
                     if order['status'] == 'filled':
                         self.logger.log_order(order)
                         self._log_current_balance()
@@ -161,5 +235,6 @@ class LiveTradingEnvironment(TradingEnvironment):
         self.logger.log_balance(usdt, asset, self.current_price)
 
     def get_balance(self, currency: str) -> float:
-        balances = self.exchange.fetch_balance()
+        with instruments.timer('exchange.fetch_balance'):
+            balances = self.exchange.fetch_balance()
         return balances[currency]['free']
\ No newline at end of file
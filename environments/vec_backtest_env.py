@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+from config.settings import settings
+from utils.instrumentation import timed
+from .backtest_env import build_market_features, build_indicator_features
+
+class VecBacktestEnvironment:
+    """N independent backtest episodes stepped together with NumPy
+
+    Each sub-environment trades its own window ``[start, end]`` of one shared
+    feature matrix with the same fee and reward model as
+    ``BacktestEnvironment``. Finished sub-environments are reset automatically;
+    the pre-reset next states are returned in ``info['terminal_states']``.
+    Default starts are spread evenly over the data; without
+    ``episode_length`` each sub-environment runs from its start to the
+    last bar.
+    """
+
+    def __init__(self, historical_data: pd.DataFrame, num_envs: int,
+                 episode_length: int = None, starts=None,
+                 random_starts: bool = False, seed: int = None):
+        self.historical_data = historical_data
+        self.num_envs = num_envs
+        self.market_features = build_market_features(historical_data)
+        self.indicator_features = build_indicator_features(historical_data)
+        self.close_prices = historical_data['close'].to_numpy(dtype=np.float64)
+        self.max_steps = len(historical_data) - 1
+        self.episode_length = episode_length
+        self.random_starts = random_starts
+        self.rng = np.random.default_rng(seed)
+
+        if starts is None:
+            if episode_length is None:
+                starts = np.linspace(0, self.max_steps, num_envs, endpoint=False)
+            else:
+                starts = np.linspace(0, max(self.max_steps - episode_length, 0), num_envs)
+        self.starts = np.asarray(starts, dtype=np.int64).copy()
+        if len(self.starts) != num_envs:
+            raise ValueError(f"Expected {num_envs} start offsets, got {len(self.starts)}")
+        self.ends = self._episode_ends(self.starts)
+
+        # Per-environment account state
+        self.current_step = self.starts.copy()
+        self.balance = np.full(num_envs, settings.INITIAL_BALANCE)
+        self.position = np.zeros(num_envs)
+        self.portfolio_value = np.full(num_envs, settings.INITIAL_BALANCE)
+        self.current_price = self.close_prices[self.starts]
+        self.previous_price = self.current_price.copy()
+
+    @classmethod
+    def from_slices(cls, slices: list, **kwargs):
+        """One sub-environment per DataFrame slice"""
+        lengths = np.array([len(s) for s in slices], dtype=np.int64)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        env = cls(pd.concat(slices, ignore_index=True), len(slices), starts=starts, **kwargs)
+        env.ends = starts + lengths - 1
+        if settings.FEATURES:
+            # Indicator windows must not reach back into the previous slice
+            env.indicator_features = np.concatenate([build_indicator_features(s) for s in slices])
+        return env
+
+    def _episode_ends(self, starts: np.ndarray) -> np.ndarray:
+        if self.episode_length is None:
+            return np.full(len(starts), self.max_steps, dtype=np.int64)
+        return np.minimum(starts + self.episode_length, self.max_steps)
+
+    def reset(self) -> np.ndarray:
+        """Reset all sub-environments"""
+        self._reset_envs(np.ones(self.num_envs, dtype=bool))
+        return self._get_states()
+
+    def _reset_envs(self, mask: np.ndarray):
+        if self.random_starts and self.episode_length is not None:
+            count = int(mask.sum())
+            high = max(self.max_steps - self.episode_length, 0) + 1
+            self.starts[mask] = self.rng.integers(0, high, count)
+            self.ends[mask] = self._episode_ends(self.starts[mask])
+        self.current_step[mask] = self.starts[mask]
+        self.balance[mask] = settings.INITIAL_BALANCE
+        self.position[mask] = 0.0
+        self.portfolio_value[mask] = settings.INITIAL_BALANCE
+        self.current_price[mask] = self.close_prices[self.starts[mask]]
+        self.previous_price[mask] = self.current_price[mask]
+
+    def _get_states(self) -> np.ndarray:
+        """Stacked (num_envs, STATE_SIZE) states"""
+        states = np.empty((self.num_envs, settings.STATE_SIZE))
+        states[:, :4] = self.market_features[self.current_step]
+        states[:, 4] = self.balance / settings.INITIAL_BALANCE
+        states[:, 5] = self.position / settings.MAX_POSITION
+        states[:, 6] = (self.current_price - self.previous_price) / self.previous_price
+        if settings.FEATURES:
+            states[:, settings.BASE_STATE_SIZE:] = self.indicator_features[self.current_step]
+        return states
+
+    @timed('vec_env.step')
+    def step(self, actions) -> tuple:
+        """Step every sub-environment with its own action"""
+        actions = np.asarray(actions)
+        self.current_step += 1
+        dones = self.current_step >= self.ends
+
+        self.previous_price = self.current_price
+        self.current_price = self.close_prices[self.current_step]
+
+        self._process_actions(actions)
+        rewards = self._calculate_rewards()
+        next_states = self._get_states()
+
+        info = {}
+        if dones.any():
+            info['terminal_states'] = next_states.copy()
+            info['final_portfolio_values'] = self.portfolio_value.copy()
+            self._reset_envs(dones)
+            next_states[dones] = self._get_states()[dones]
+
+        return next_states, rewards, dones, info
+
+    def _process_actions(self, actions: np.ndarray):
+        """Vectorized trade execution with fee modeling"""
+        price = self.current_price
+
+        # Buy
+        max_affordable = (self.balance * settings.MAX_RISK_PCT) / price
+        amount = np.minimum(max_affordable, settings.MAX_POSITION - self.position)
+        buy = (actions == 0) & (amount > 0)
+        self.balance = np.where(buy, self.balance - amount * price * (1 + settings.FEE_RATE), self.balance)
+        self.position = np.where(buy, self.position + amount, self.position)
+
+        # Sell
+        amount = np.minimum(self.position, settings.MAX_POSITION)
+        sell = (actions == 1) & (amount > 0)
+        self.balance = np.where(sell, self.balance + amount * price * (1 - settings.FEE_RATE), self.balance)
+        self.position = np.where(sell, self.position - amount, self.position)
+
+    def _calculate_rewards(self) -> np.ndarray:
+        """Risk-adjusted reward, same components as BacktestEnvironment"""
+        current_value = self.balance + (self.position * self.current_price)
+        raw_return = current_value - self.portfolio_value
+
+        drawdown = np.maximum(0, (self.portfolio_value - current_value) / self.portfolio_value)
+        position_penalty = np.abs(self.position) * 0.001
+        price_change = np.abs(self.current_price - self.previous_price) / self.previous_price
+        volatility_penalty = price_change * 0.5
+
+        rewards = raw_return - (drawdown * settings.DRAWDOWN_PENALTY) - position_penalty - volatility_penalty
+        self.portfolio_value = current_value
+        return rewards
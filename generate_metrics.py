@@ -1,10 +1,24 @@
+import argparse
+import os
 import numpy as np
 from environments.backtest_env import BacktestEnvironment
 from models.q_network import DQNAgent
+from training.evaluation import HybridEvaluator, evaluate_sequential
+from utils.checkpoint import Checkpointer
 from utils.data_fetcher import fetch_historical_data  # Added missing import
 from config.settings import settings
 
-def generate_metrics():
+def _print_summary(name, metrics):
+    print(f"{name}: Return: {metrics['summary_total_return']:.2%} | "
+          f"Max drawdown: {metrics['summary_max_drawdown']:.2%} | "
+          f"Sharpe: {metrics['summary_sharpe']:.3f} | Trades: {metrics['summary_trades']}")
+
+def generate_metrics(paths=None, sequential=False):
+    """Greedy evaluation of one or more saved models on the test split
+
+    The default hybrid mode batches inference over the bars between trades
+    and matches step-by-step evaluation (``sequential=True``) exactly.
+    """
     # Load test data
     data = fetch_historical_data(settings.SYMBOL, settings.TIMEFRAME)
     test_data = data.iloc[int(len(data)*0.8):]
@@ -12,39 +26,31 @@ def generate_metrics():
     # Initialize components
     env = BacktestEnvironment(test_data)
     agent = DQNAgent(settings.STATE_SIZE, settings.ACTION_SIZE)
-    agent.model.load_weights(settings.MODEL_PATH)
-    
-    # Initialize metrics
-    metrics = {
-        'portfolio_values': [],
-        'positions': [],
-        'episode_rewards': [],
-        'drawdowns': []
-    }
-    
-    # Run evaluation
-    state = env.reset()
-    done = False
+    paths = paths or [settings.MODEL_PATH]
     
-    while not done:
-        action = agent.act(state)
-        next_state, reward, done, _ = env.step(action)
-        
-        # Track metrics
-        metrics['portfolio_values'].append(env.portfolio_value)
-        metrics['positions'].append(env.position)
-        metrics['episode_rewards'].append(reward)
-        state = next_state
-        
-        # Calculate drawdown
-        current_value = env.portfolio_value
-        peak = max(metrics['portfolio_values']) if metrics['portfolio_values'] else current_value
-        drawdown = (peak - current_value) / peak
-        metrics['drawdowns'].append(drawdown)
+    # Run evaluation (market part of the state is built once for all models)
+    if sequential:
+        results = {}
+        for path in paths:
+            Checkpointer.load_weights(agent.model, path)
+            results[path] = evaluate_sequential(agent, env)
+    else:
+        results = HybridEvaluator(env).run_checkpoints(agent, paths)
 
     # Save metrics
-    np.savez('test_metrics.npz', **metrics)
-    print("Metrics saved to test_metrics.npz")
+    for path, metrics in results.items():
+        _print_summary(path, metrics)
+        if len(results) == 1:
+            output = 'test_metrics.npz'
+        else:
+            output = f"test_metrics_{os.path.splitext(os.path.basename(path.rstrip('/')))[0]}.npz"
+        np.savez(output, **metrics)
+        print(f"Metrics saved to {output}")
+    return results
 
 if __name__ == "__main__":
-    generate_metrics()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Evaluate trained models on the test split")
+    parser.add_argument('--checkpoints', nargs='+', help="Weights files or checkpoint directories")
+    parser.add_argument('--sequential', action='store_true', help="One agent.act per bar (reference mode)")
+    args = parser.parse_args()
+    generate_metrics(args.checkpoints, args.sequential)
@@ -0,0 +1,27 @@
+import os
+from models.q_network import DQNAgent
+from training.actor_learner import ActorLearner
+from utils.data_fetcher import load_backtest_data
+from config.settings import settings
+
+def main(total_steps: int = 1_000_000):
+    os.makedirs('models', exist_ok=True)
+
+    # Load data from the local candle store (imported from CSV on first run)
+    full_data = load_backtest_data('historical_data.csv')
+    train_data = full_data.iloc[:int(len(full_data)*0.8)]
+
+    agent = DQNAgent(
+        state_size=settings.STATE_SIZE,
+        action_size=settings.ACTION_SIZE
+    )
+    pipeline = ActorLearner(agent, train_data)
+    stats = pipeline.run(total_steps)
+
+    agent.model.save_weights(settings.MODEL_PATH)
+    print(f"Actor steps/s: {stats['actor_steps_per_sec']:.1f} | "
+          f"Learner updates/s: {stats['learner_updates_per_sec']:.1f}")
+    print(f"\nModel saved to {settings.MODEL_PATH}")
+
+if __name__ == "__main__":
+    main()
@@ -18,13 +18,14 @@ def main():
     # Training loop
     for episode in range(1000):
         state = env.reset()
+        agent.n_step_window.clear()
         total_reward = 0
         done = False
         
         while not done:
             action = agent.act(state)
             next_state, reward, done, _ = env.step(action)
-            agent.memory.add(state, action, reward, next_state, done)
+            agent.remember(state, action, reward, next_state, done)
             agent.train()
             total_reward += reward
             state = next_state
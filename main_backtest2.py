@@ -3,9 +3,14 @@ import pandas as pd
 import matplotlib.pyplot as plt
 from tqdm import tqdm
 import os  # Added for directory creation
-from environments.backtest_env import BacktestEnvironment
+from environments.backtest_env import BacktestEnvironment, ACCOUNT_COLUMNS
 from models.q_network import DQNAgent
-from utils.data_fetcher import fetch_historical_data
+from utils.data_fetcher import fetch_historical_data, load_backtest_data
+from utils.metrics import StreamingMetrics
+from utils.metrics_log import MetricsLog, STEP_DTYPE, EPISODE_DTYPE
+from utils.memory import IndexedReplayBuffer
+from utils.instrumentation import instruments
+from utils.checkpoint import Checkpointer
 from config.settings import settings
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '0'  # Enable all logs
 import tensorflow as tf
@@ -16,15 +21,20 @@ if physical_devices:
     tf.config.experimental.set_memory_growth(physical_devices[0], True)
     tf.keras.mixed_precision.set_global_policy('mixed_float16')
 
+STEP_LOG_PATH = 'training_metrics.steps.bin'
+EPISODE_LOG_PATH = 'training_metrics.episodes.bin'
+
 def main():
     # Ensure models directory exists
     os.makedirs('models', exist_ok=True)
     log_dir = os.path.dirname(settings.LOG_PATH)
     os.makedirs(log_dir, exist_ok=True)
+
+    # Stage timing / profiling (off unless enabled in settings)
+    instruments.enable_from_settings()
     
-    # Load data from CSV
-    full_data = pd.read_csv('historical_data.csv')
-    full_data['timestamp'] = pd.to_datetime(full_data['timestamp'])
+    # Load data from the local candle store (imported from CSV on first run)
+    full_data = load_backtest_data('historical_data.csv')
    
     # Print the first few rows to verify
     print("Data Loaded:\n", full_data.head())
@@ -39,55 +49,79 @@ def main():
         action_size=settings.ACTION_SIZE
     )
     
-    # Training metrics
-    metrics = {
-        'episode_rewards': [],
-        'portfolio_values': [],
-        'positions': [],
-        'drawdowns': []
-    }
+    if settings.INDEXED_REPLAY:
+        if settings.N_STEP > 1:
+            raise ValueError("INDEXED_REPLAY stores one-step transitions; set N_STEP=1")
+        # Market features are read from the env's table instead of stored per transition
+        agent.memory = IndexedReplayBuffer(settings.MEMORY_SIZE, env.market_states(), ACCOUNT_COLUMNS)
+    
+    # Resume from the latest full-state checkpoint, if any
+    checkpointer = Checkpointer()
+    resumed = checkpointer.restore(agent)
+    start_episode = resumed['episode'] + 1 if resumed else 0
+    if resumed:
+        print(f"Resumed from episode {resumed['episode']} (epsilon {agent.epsilon:.3f})")
+    
+    # Training metrics (per-step and per-episode records streamed to disk);
+    # on resume, records written after the checkpoint are cut off
+    logged = resumed['extra'].get('logs', {}) if resumed else {}
+    step_log = MetricsLog(STEP_LOG_PATH, STEP_DTYPE, append=bool(resumed), records=logged.get('steps'))
+    episode_log = MetricsLog(EPISODE_LOG_PATH, EPISODE_DTYPE, chunk_size=1024, append=bool(resumed),
+                             records=logged.get('episodes'))
+    tracker = StreamingMetrics()
     
     # Training loop
-    with tqdm(total=settings.EPISODES, desc="Training Progress") as pbar:
-        for episode in range(settings.EPISODES):
+    with tqdm(total=settings.EPISODES, initial=start_episode, desc="Training Progress") as pbar:
+        for episode in range(start_episode, settings.EPISODES):
             state = env.reset()
+            agent.n_step_window.clear()
+            tracker.start_episode(env.portfolio_value, env.position)
             done = False
             
             while not done:
+                row = env.current_step
                 action = agent.act(state)
                 next_state, reward, done, _ = env.step(action)
-                agent.remember(state, action, reward, next_state, done)
+                agent.remember(state, action, reward, next_state, done, row)
                 agent.train()
                 state = next_state
                 
-                # Track metrics
-                metrics['portfolio_values'].append(env.portfolio_value)
-                metrics['positions'].append(env.position)
-                
-                # Calculate drawdown
-                current_value = env.portfolio_value
-                peak = max(metrics['portfolio_values']) if metrics['portfolio_values'] else current_value
-                drawdown = (peak - current_value) / peak
-                metrics['drawdowns'].append(drawdown)
+                # Track metrics (running peak/drawdown in O(1))
+                drawdown = tracker.update(env.portfolio_value, env.position, env.current_price)
+                step_log.append(episode, env.portfolio_value, env.position, drawdown)
                 
             # Update progress
-            metrics['episode_rewards'].append(env.portfolio_value - settings.INITIAL_BALANCE)
+            summary = tracker.end_episode()
+            episode_log.append(
+                episode, env.portfolio_value - settings.INITIAL_BALANCE, summary['final_value'],
+                summary['max_drawdown'], summary['sharpe'], summary['trades'], summary['turnover']
+            )
+            step_log.flush()
+            episode_log.flush()
             pbar.update(1)
             pbar.set_postfix({
                 'Portfolio': f"{env.portfolio_value:.2f}",
+                'MaxDD': f"{summary['max_drawdown']:.3f}",
+                'Sharpe': f"{summary['sharpe']:.3f}",
                 'Epsilon': f"{agent.epsilon:.3f}"
             })
             
-            # Update target network and save periodically
+            # Update target network and checkpoint periodically
             if episode % 10 == 0:
                 agent.update_target_network()
-                agent.model.save_weights(settings.MODEL_PATH)
+            if (episode + 1) % settings.CHECKPOINT_INTERVAL == 0:
+                checkpointer.save(agent, episode, extra={
+                    'logs': {'steps': step_log.records, 'episodes': episode_log.records}
+                })
     
     # Final save
     agent.model.save_weights(settings.MODEL_PATH)
-    np.savez('training_metrics.npz', **metrics)
+    checkpointer.close()
+    agent.memory.close()
+    step_log.close()
+    episode_log.close()
     print(f"\nModel saved to {settings.MODEL_PATH}")
-    print(f"Metrics saved to training_metrics.npz")
+    print(f"Metrics saved to {STEP_LOG_PATH} and {EPISODE_LOG_PATH}")
 
 def _plot_performance(metrics, test_data):
     """Safe plotting using Agg backend"""
@@ -0,0 +1,29 @@
+import os
+from training.collector import DistributedCollector
+from utils.data_fetcher import load_backtest_data
+from config.settings import settings
+
+def main(total_steps: int = 10_000_000):
+    # Imported here: spawned workers re-import this module and must not load TensorFlow
+    from models.q_network import DQNAgent
+
+    os.makedirs('models', exist_ok=True)
+
+    # Load data from the local candle store (imported from CSV on first run)
+    full_data = load_backtest_data('historical_data.csv')
+    train_data = full_data.iloc[:int(len(full_data)*0.8)]
+
+    agent = DQNAgent(
+        state_size=settings.STATE_SIZE,
+        action_size=settings.ACTION_SIZE
+    )
+    with DistributedCollector(agent, train_data) as collector:
+        stats = collector.run(total_steps)
+
+    agent.model.save_weights(settings.MODEL_PATH)
+    print(f"Actor steps/s: {stats['actor_steps_per_sec']:.1f} | "
+          f"Learner updates/s: {stats['learner_updates_per_sec']:.1f}")
+    print(f"\nModel saved to {settings.MODEL_PATH}")
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,13 @@
 from environments.live_env import LiveTradingEnvironment
 from models.q_network import DQNAgent
+from utils.instrumentation import instruments
 from config.settings import settings
 
 
 def main():
+    instruments.enable_from_settings(stage='live.step')
     env = LiveTradingEnvironment()
-    agent = DQNAgent()
+    agent = DQNAgent(settings.STATE_SIZE, settings.ACTION_SIZE)
     
     try:
         agent.model.load_weights(settings.MODEL_PATH)
@@ -13,10 +15,18 @@ def main():
         print("No saved model found, starting fresh")
     
     while True:
+        # Decide once per new market data push
+        if not env.wait_for_market_data(timeout=settings.MARKET_DATA_TIMEOUT):
+            env.logger.log_error(f"No market data for {settings.MARKET_DATA_TIMEOUT:.0f}s")
+            continue
+        if env.market_data.stale:
+            # The feed is reconnecting; don't act or learn on old data
+            env.get_state()  # Marks this push as seen
+            continue
         state = env.get_state()
         action = agent.act(state)
         next_state, reward, done, _ = env.step(action)
-        agent.memory.add(state, action, reward, next_state, done)
+        agent.remember(state, action, reward, next_state, done)
         agent.train()
         
         # Save model periodically
@@ -0,0 +1,66 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from environments.async_live_env import AsyncLiveTradingEnvironment
+from models.q_network import DQNAgent
+from utils.memory import SynchronizedReplayBuffer
+from utils.instrumentation import instruments
+from config.settings import settings
+
+async def run(env, agent, interval: float = settings.DECISION_INTERVAL, max_steps: int = None) -> list:
+    """Trade on a fixed decision clock; returns decision-to-order latencies
+
+    Inference and training run in their own worker threads so the event
+    loop keeps serving exchange I/O. ``interval=None`` decides on every
+    feed push instead of on the clock.
+    """
+    loop = asyncio.get_running_loop()
+    inference = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inference')
+    training = ThreadPoolExecutor(max_workers=1, thread_name_prefix='training')
+    agent.memory = SynchronizedReplayBuffer(agent.memory)
+    train_future = None
+    latencies = []
+
+    await env.start()
+    sequence = env.market_data.sequence
+    next_decision = loop.time()
+    try:
+        while max_steps is None or env.current_step < max_steps:
+            state = env.get_state()
+            action = await loop.run_in_executor(inference, agent.act, state)
+            next_state, reward, done, info = await env.step(action)
+            latencies.append(info['order_latency'])
+            agent.remember(state, action, reward, next_state, done)
+
+            # Train in the background; skip if the previous update is still running
+            if train_future is None or train_future.done():
+                train_future = loop.run_in_executor(training, agent.train)
+
+            # Save model periodically
+            if env.current_step % 100 == 0:
+                loop.run_in_executor(training, agent.model.save_weights, settings.MODEL_PATH)
+
+            if interval:
+                next_decision += interval
+                await asyncio.sleep(max(0.0, next_decision - loop.time()))
+            else:
+                sequence = await env.wait_for_market_data(sequence)
+    finally:
+        inference.shutdown(wait=True)
+        training.shutdown(wait=True)
+        await env.close()
+    return latencies
+
+def main():
+    instruments.enable_from_settings(stage='live.step')
+    env = AsyncLiveTradingEnvironment()
+    agent = DQNAgent(settings.STATE_SIZE, settings.ACTION_SIZE)
+
+    try:
+        agent.model.load_weights(settings.MODEL_PATH)
+    except:
+        print("No saved model found, starting fresh")
+
+    asyncio.run(run(env, agent))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+from training.sweep import SweepRunner, grid_search, random_search
+from utils.data_fetcher import load_backtest_data
+
+# Settings fields to search: lists are grid values / random choices,
+# (low, high) tuples are ranges for random search
+SEARCH_SPACE = {
+    'GAMMA': [0.95, 0.99],
+    'EPS_DECAY': [0.99, 0.995],
+    'BATCH_SIZE': [32, 64],
+    'MAX_RISK_PCT': [0.02, 0.05],
+    'DRAWDOWN_PENALTY': [1.0, 2.0, 4.0],
+}
+
+def main(random_trials: int = None, episodes: int = 20):
+    # Load data from the local candle store (imported from CSV on first run)
+    full_data = load_backtest_data('historical_data.csv')
+
+    if random_trials:
+        trials = random_search(SEARCH_SPACE, random_trials, seed=0)
+    else:
+        trials = grid_search(SEARCH_SPACE)
+    for params in trials:
+        params.setdefault('EPISODES', episodes)
+
+    runner = SweepRunner(full_data)
+    table = runner.run(trials, results_path='sweeps/results.csv')
+    print(table.head(10).to_string())
+    print("\nResults saved to sweeps/results.csv")
+
+if __name__ == "__main__":
+    main()
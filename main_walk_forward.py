@@ -0,0 +1,20 @@
+import json
+from training.walk_forward import WalkForward
+from utils.data_fetcher import load_backtest_data
+
+def main(train_bars: int = 30 * 1440, test_bars: int = 7 * 1440, episodes: int = 10):
+    # Load data from the local candle store (imported from CSV on first run)
+    full_data = load_backtest_data('historical_data.csv')
+
+    # Rolling 30-day training / 7-day test windows on 1m candles
+    engine = WalkForward(full_data, train_bars, test_bars, episodes=episodes)
+    table = engine.run()
+    table.to_csv('walk_forward_results.csv', index=False)
+
+    print(table[['fold', 'test_from', 'test_to', 'total_return', 'buy_and_hold_return',
+                 'sharpe', 'max_drawdown']].to_string())
+    print(json.dumps(WalkForward.aggregate(table), indent=2))
+    print("\nResults saved to walk_forward_results.csv")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import numpy as np
+
+class NumpyQNetwork:
+    """NumPy-only forward pass exported from a Keras Dense/BatchNorm MLP
+
+    Inference-mode BatchNormalization is folded into the following Dense
+    layer, so a forward pass is one matmul per Dense layer with no TF call.
+    The export is a snapshot: call ``load_weights`` again after training.
+    TensorFlow is only imported for the export, so worker processes that
+    receive weights through ``set_weights`` never load it.
+    """
+
+    def __init__(self, layers: list, seed: int = None):
+        # Each entry: (kernel, bias, relu)
+        self.layers = layers
+        self.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_keras(cls, model):
+        net = cls([])
+        net.load_weights(model)
+        return net
+
+    def load_weights(self, model):
+        """Re-export kernels from a Keras model"""
+        import tensorflow as tf
+        layers = []
+        scale, shift = None, None
+        for layer in model.layers:
+            if isinstance(layer, tf.keras.layers.BatchNormalization):
+                gamma, beta, mean, var = [w.astype(np.float64) for w in layer.get_weights()]
+                scale = gamma / np.sqrt(var + layer.epsilon)
+                shift = beta - mean * scale
+            elif isinstance(layer, tf.keras.layers.Dense):
+                kernel, bias = [w.astype(np.float64) for w in layer.get_weights()]
+                if scale is not None:
+                    # BN(x) @ W + b == x @ (scale * W) + (shift @ W + b)
+                    bias = shift @ kernel + bias
+                    kernel = scale[:, np.newaxis] * kernel
+                    scale, shift = None, None
+                activation = tf.keras.activations.serialize(layer.activation)
+                if activation not in ('relu', 'linear'):
+                    raise ValueError(f"Unsupported activation: {activation}")
+                layers.append((
+                    np.ascontiguousarray(kernel, dtype=np.float32),
+                    bias.astype(np.float32),
+                    activation == 'relu'
+                ))
+        if scale is not None:
+            raise ValueError("BatchNormalization must be followed by a Dense layer")
+        self.layers = layers
+
+    @classmethod
+    def from_layout(cls, layout: list, seed: int = None):
+        """Zero-initialized network from ``layout()`` of another instance"""
+        return cls([
+            (np.zeros(shape, dtype=np.float32), np.zeros(shape[1], dtype=np.float32), relu)
+            for shape, relu in layout
+        ], seed)
+
+    def layout(self) -> list:
+        """Picklable description of the layer shapes: [(kernel_shape, relu)]"""
+        return [(kernel.shape, relu) for kernel, _, relu in self.layers]
+
+    def get_weights(self) -> list:
+        """Flat list of arrays (kernel, bias per layer), e.g. for broadcasting"""
+        return [w for kernel, bias, _ in self.layers for w in (kernel, bias)]
+
+    def set_weights(self, weights: list):
+        """Overwrite kernels and biases in place, keeping the layer layout"""
+        for i, (kernel, bias, _) in enumerate(self.layers):
+            kernel[...] = weights[2 * i]
+            bias[...] = weights[2 * i + 1]
+
+    def q_values(self, states) -> np.ndarray:
+        x = np.asarray(states, dtype=np.float32)
+        for kernel, bias, relu in self.layers:
+            x = x @ kernel
+            x += bias
+            if relu:
+                np.maximum(x, 0, out=x)
+        return x
+
+    def act(self, states, epsilon: float = 0.0) -> np.ndarray:
+        """Vectorized epsilon-greedy actions for a (batch, state_size) array"""
+        q_values = self.q_values(states)
+        actions = np.argmax(q_values, axis=1)
+        if epsilon > 0:
+            explore = self.rng.random(len(actions)) <= epsilon
+            actions[explore] = self.rng.integers(q_values.shape[1], size=int(explore.sum()))
+        return actions
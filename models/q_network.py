@@ -1,7 +1,8 @@
 import numpy as np
 import tensorflow as tf
 from tensorflow.keras import layers, optimizers, Input
-from utils.memory import ReplayBuffer
+from utils.memory import ReplayBuffer, PrioritizedReplayBuffer, DiskReplayBuffer, NStepWindow
+from utils.instrumentation import timed
 from config.settings import settings
 
 class DQNAgent:
@@ -11,18 +12,43 @@ class DQNAgent:
         self.state_size = state_size
         self.action_size = action_size
         
-        # GPU Strategy Scope ▼
-        self.strategy = tf.distribute.MirroredStrategy()
-        with self.strategy.scope():
-            self.model = self._build_model()
-            self.target_model = self._build_model()
-            self.target_model.set_weights(self.model.get_weights())
-        
-        self.memory = ReplayBuffer(settings.MEMORY_SIZE)
+        # Single-device training: the compiled train step is one graph call
+        # on the default device, not a replica-split step
+        self.model = self._build_model()
+        self.target_model = self._build_model()
+        self.target_model.set_weights(self.model.get_weights())
+
+        self.memory = self._build_memory()
         self.gamma = settings.GAMMA
+        self.n_step = settings.N_STEP
+        self.n_step_window = NStepWindow(self.n_step, self.gamma)
         self.epsilon = settings.EPS_START
         self.epsilon_min = settings.EPS_MIN  # Add this line
         self.epsilon_decay = settings.EPS_DECAY
+        self._forward = self._build_forward()
+        self._train_step = self._build_train_step()
+        self._unit_weights = np.ones(settings.BATCH_SIZE, dtype=np.float32)
+
+    def _build_memory(self):
+        """Replay buffer selected by settings"""
+        if settings.PRIORITIZED_REPLAY:
+            return PrioritizedReplayBuffer(
+                settings.MEMORY_SIZE, self.state_size,
+                alpha=settings.PER_ALPHA,
+                beta=settings.PER_BETA,
+                beta_increment=settings.PER_BETA_INCREMENT,
+                epsilon=settings.PER_EPSILON
+            )
+        if settings.DISK_REPLAY:
+            # One run directory per agent under REPLAY_DIR, created by the first
+            # add so concurrent runs never share files; a checkpoint restore
+            # reopens the directory it was taken from
+            return DiskReplayBuffer(
+                settings.MEMORY_SIZE, self.state_size,
+                root=settings.REPLAY_DIR,
+                hot_size=settings.REPLAY_HOT_SIZE
+            )
+        return ReplayBuffer(settings.MEMORY_SIZE, self.state_size)
 
     def _build_model(self):
         """GPU-optimized model architecture"""
@@ -36,41 +62,106 @@ class DQNAgent:
         model.compile(optimizer=optimizers.Adam(learning_rate=0.001), loss='mse')
         return model
 
+    def _build_forward(self):
+        """Compiled inference-mode forward pass for any batch size"""
+        model = self.model
+        spec = tf.TensorSpec(shape=(None, self.state_size), dtype=tf.float32)
+
+        @tf.function(input_signature=[spec])
+        def forward(states):
+            return tf.cast(model(states, training=False), tf.float32)
+
+        return forward
+
+    def q_values(self, states):
+        """Q values for a (batch, state_size) array"""
+        return self._forward(np.asarray(states, dtype=np.float32)).numpy()
+
+    @timed('agent.act')
     def act(self, state):
-        """Epsilon-greedy action selection"""
+        """Epsilon-greedy action selection (a 2-D input acts on each row)"""
+        if np.ndim(state) == 2:
+            return self.act_batch(state)
         if np.random.rand() <= self.epsilon:
             return np.random.choice(self.action_size)  # Random action
-        q_values = self.model.predict(state[np.newaxis], verbose=0)
+        q_values = self.q_values(state[np.newaxis])
         return np.argmax(q_values[0])  # Best action
 
-    def remember(self, state, action, reward, next_state, done):
-        """Store experience in replay buffer"""
-        self.memory.add(state, action, reward, next_state, done)
+    def act_batch(self, states):
+        """Epsilon-greedy actions for a batch of states (one forward pass)"""
+        actions = np.argmax(self.q_values(states), axis=1)
+        explore = np.random.rand(len(states)) <= self.epsilon
+        actions[explore] = np.random.randint(self.action_size, size=int(explore.sum()))
+        return actions
+
+    def remember(self, state, action, reward, next_state, done, row=None):
+        """Store experience in replay buffer (``row``: bar index of ``state``)
+
+        With ``N_STEP`` > 1 the transition passes through the agent's n-step
+        window first, so it must come from a single environment stream.
+        """
+        if self.n_step == 1:
+            self.memory.add(state, action, reward, next_state, done, row)
+            return
+        for transition in self.n_step_window.push(state, action, reward, next_state, done, row):
+            self.memory.add(*transition)
+
+    def _build_train_step(self):
+        """Compile targets, loss and gradient update into a single graph call"""
+        model, target_model = self.model, self.target_model
+        optimizer = model.optimizer
+        loss_scaled = isinstance(optimizer, tf.keras.mixed_precision.LossScaleOptimizer)
+        loss_fn = tf.keras.losses.MeanSquaredError()
+        # n-step returns already hold n discounted rewards; bootstrap n steps ahead
+        discount = self.gamma ** self.n_step
+
+        def train_step(states, actions, rewards, next_states, dones, weights):
+            # Targets use inference-mode Q values, as model.predict did
+            q_values = tf.cast(model(states, training=False), tf.float32)
+            next_q = tf.cast(target_model(next_states, training=False), tf.float32)
+            not_done = 1.0 - tf.cast(dones, tf.float32)
+            targets = rewards + discount * tf.reduce_max(next_q, axis=1) * not_done
+
+            # Replace only the taken action's Q value with its Bellman target
+            mask = tf.one_hot(actions, self.action_size)
+            target_q = q_values * (1.0 - mask) + targets[:, tf.newaxis] * mask
+            td_errors = targets - tf.reduce_sum(q_values * mask, axis=1)
+
+            with tf.GradientTape() as tape:
+                predictions = tf.cast(model(states, training=True), tf.float32)
+                loss = loss_fn(target_q, predictions, sample_weight=weights)
+                scaled_loss = optimizer.get_scaled_loss(loss) if loss_scaled else loss
+            grads = tape.gradient(scaled_loss, model.trainable_variables)
+            if loss_scaled:
+                grads = optimizer.get_unscaled_gradients(grads)
+            optimizer.apply_gradients(zip(grads, model.trainable_variables))
+            return loss, td_errors
 
+        return tf.function(train_step, jit_compile=settings.XLA_TRAIN_STEP, reduce_retracing=True)
+
+    @timed('agent.train')
     def train(self):
         """Train network using experience replay"""
         if len(self.memory) < settings.BATCH_SIZE:
             return
 
-        # Sample batch from memory
-        states, actions, rewards, next_states, dones = self.memory.sample(settings.BATCH_SIZE)
-        
-        # Calculate target Q-values
-        target_q = self.model.predict(states, verbose=0)
-        next_q = self.target_model.predict(next_states, verbose=0)
-        
-        # Update targets
-        for i in range(settings.BATCH_SIZE):
-            if dones[i]:
-                target_q[i][actions[i]] = rewards[i]
-            else:
-                target_q[i][actions[i]] = rewards[i] + self.gamma * np.max(next_q[i])
-
-        # Train model
-        self.model.fit(states, target_q, batch_size=settings.BATCH_SIZE, verbose=0)
+        # Sample batch from memory (prioritized buffers add weights and indices)
+        batch = self.memory.sample(settings.BATCH_SIZE)
+        states, actions, rewards, next_states, dones = batch[:5]
+        weights = batch[5] if len(batch) > 5 else self._unit_weights
+
+        loss, td_errors = self._train_step(
+            states, actions, rewards.astype(np.float32, copy=False),
+            next_states, dones, weights
+        )
+
+        # Feed TD errors back to the prioritized buffer
+        if len(batch) > 5:
+            self.memory.update_priorities(batch[6], td_errors.numpy())
         
         # Decay exploration rate
         self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
+        return loss
 
     def update_target_network(self):
         """Sync target network with main network"""
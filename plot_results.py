@@ -2,41 +2,56 @@ import numpy as np
 import matplotlib
 matplotlib.use('Agg')  # Non-GUI backend
 import matplotlib.pyplot as plt
+from utils.metrics_log import MetricsLog, downsample_minmax, chunked_diff_histogram
+
+def _load_series(path: str) -> dict:
+    """Per-step series from a metrics log (memory-mapped) or a legacy .npz"""
+    if path.endswith('.npz'):
+        data = np.load(path, allow_pickle=True)
+        values = np.asarray(data['portfolio_values'], dtype=np.float64)
+        peak = np.maximum.accumulate(values)
+        return {
+            'portfolio_values': values,
+            'positions': data['positions'],
+            'drawdowns': (peak - values) / peak
+        }
+    records = MetricsLog.read(path)
+    return {
+        'portfolio_values': records['portfolio_value'],
+        'positions': records['position'],
+        'drawdowns': records['drawdown']
+    }
+
+def plot_from_file(path: str = 'training_metrics.steps.bin', buckets: int = 2000):
+    # Load saved metrics lazily; every line is downsampled to min/max per bucket
+    metrics = _load_series(path)
 
-def plot_from_file():
-    # Load saved metrics
-    data = np.load('training_metrics.npz', allow_pickle=True)
-    metrics = {key: data[key] for key in data.files}
-    
-    # Plotting code (same as before)
     plt.figure(figsize=(15, 10))
-    
+
     # Portfolio Value
     plt.subplot(2, 2, 1)
-    plt.plot(metrics['portfolio_values'])
+    plt.plot(*downsample_minmax(metrics['portfolio_values'], buckets))
     plt.title("Portfolio Value Over Time")
-    
+
     # Position Sizing
     plt.subplot(2, 2, 2)
-    plt.plot(metrics['positions'])
+    plt.plot(*downsample_minmax(metrics['positions'], buckets))
     plt.title("Position History")
-    
+
     # Return Distribution
     plt.subplot(2, 2, 3)
-    returns = np.diff(metrics['portfolio_values'])
-    plt.hist(returns, bins=50)
+    counts, edges = chunked_diff_histogram(metrics['portfolio_values'], bins=50)
+    plt.stairs(counts, edges, fill=True)
     plt.title("Return Distribution")
-    
+
     # Drawdown
     plt.subplot(2, 2, 4)
-    peak = np.maximum.accumulate(metrics['portfolio_values'])
-    drawdown = (peak - metrics['portfolio_values']) / peak
-    plt.plot(drawdown)
+    plt.plot(*downsample_minmax(metrics['drawdowns'], buckets))
     plt.title("Drawdown Analysis")
-    
+
     plt.tight_layout()
     plt.savefig('backtest_results.png')
     print("Saved plot to backtest_results.png")
 
 if __name__ == "__main__":
-    plot_from_file()
\ No newline at end of file
+    plot_from_file()
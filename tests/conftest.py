@@ -0,0 +1,9 @@
+import pytest
+from config.settings import settings
+
+
+@pytest.fixture(autouse=True)
+def scratch_logs(tmp_path):
+    """Keep TradingLogger output and the trade journal out of the repo tree"""
+    with settings.override(LOG_PATH=str(tmp_path / 'trading.log'), JOURNAL_DIR=str(tmp_path / 'journal')):
+        yield
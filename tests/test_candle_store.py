@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+from utils.candle_store import CandleStore, timeframe_to_ms
+
+MINUTE = timeframe_to_ms('1m')
+# 2024-01-31 23:00 UTC, so the history crosses a month partition
+START = 1706742000000
+
+
+class FakeExchange:
+    """ccxt-like ``fetch_ohlcv`` over an in-memory candle list"""
+
+    def __init__(self, candles):
+        self.candles = candles
+        self.calls = []
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=1000):
+        self.calls.append(since)
+        rows = [c for c in self.candles if since is None or c[0] >= since]
+        return [list(c) for c in rows[:limit]]
+
+
+def candles(count, start=START):
+    return [[start + i * MINUTE, 100.0 + i, 101.0 + i, 99.0 + i, 100.5 + i, 10.0 + i]
+            for i in range(count)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CandleStore(str(tmp_path))
+
+
+def test_update_paginates_full_history(store):
+    exchange = FakeExchange(candles(250))
+    added = store.update(exchange, 'BTC/USDT', '1m', since=START, limit=100)
+
+    assert added == 250
+    assert len(exchange.calls) == 3
+    assert store.partitions('BTC/USDT', '1m') == ['2024-01', '2024-02']
+    data = store.load('BTC/USDT', '1m')
+    assert data['timestamp'].tolist() == [c[0] for c in candles(250)]
+    assert data['close'].tolist() == [c[4] for c in candles(250)]
+
+
+def test_update_fetches_tail_and_refreshes_last_bar(store):
+    history = candles(50)
+    exchange = FakeExchange(history[:-1])
+    store.update(exchange, 'BTC/USDT', '1m', since=START)
+
+    # The last stored bar was still forming; the exchange now has its final values
+    exchange.candles = [list(c) for c in history]
+    exchange.candles[48][4] = 42.0
+    exchange.calls.clear()
+    store.update(exchange, 'BTC/USDT', '1m')
+
+    assert exchange.calls == [history[48][0]]
+    data = store.load('BTC/USDT', '1m')
+    assert len(data) == 50
+    assert data['close'].iloc[48] == 42.0
+    assert data['timestamp'].is_monotonic_increasing
+
+
+def test_append_keeps_last_duplicate(store):
+    rows = candles(5)
+    store.append('BTC/USDT', '1m', rows)
+    changed = [list(r) for r in rows[2:4]]
+    for row in changed:
+        row[4] = -1.0
+    store.append('BTC/USDT', '1m', changed)
+
+    data = store.load('BTC/USDT', '1m')
+    assert data['timestamp'].tolist() == [r[0] for r in rows]
+    assert data['close'].tolist() == [rows[0][4], rows[1][4], -1.0, -1.0, rows[4][4]]
+
+
+def test_load_range_across_partitions(store):
+    rows = candles(120)
+    store.append('BTC/USDT', '1m', rows)
+
+    start, end = rows[30][0], rows[90][0]
+    arrays = store.load_arrays('BTC/USDT', '1m', start, end)
+    assert arrays['timestamp'].dtype == np.int64
+    assert arrays['timestamp'].tolist() == [r[0] for r in rows[30:90]]
+
+    # A range inside one partition is served from the memory map
+    inside = store.load_arrays('BTC/USDT', '1m', rows[70][0], rows[80][0])
+    assert not inside['close'].flags.writeable
+    assert inside['close'].tolist() == [r[4] for r in rows[70:80]]
+
+    assert len(store.load('BTC/USDT', '1m', end=rows[0][0])) == 0
+    assert len(store.load('BTC/USDT', '1m', start=rows[-1][0] + MINUTE)) == 0
+
+
+def test_update_writes_each_partition_once(store, monkeypatch):
+    import utils.candle_store as candle_store
+
+    hour = timeframe_to_ms('1h')
+    history = [[START + i * hour, 1.0, 2.0, 0.5, 1.5, 3.0] for i in range(24 * 70)]
+    writes = []
+    replace = candle_store.os.replace
+    monkeypatch.setattr(candle_store.os, 'replace', lambda src, dst: (writes.append(dst), replace(src, dst)))
+
+    added = store.update(FakeExchange(history), 'BTC/USDT', '1h', since=START, limit=100)
+    assert added == len(history)
+    months = store.partitions('BTC/USDT', '1h')
+    assert months == ['2024-01', '2024-02', '2024-03', '2024-04']
+    assert len(writes) == len(months)
+    assert store.load('BTC/USDT', '1h')['timestamp'].tolist() == [row[0] for row in history]
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+from config.settings import settings
+from environments.live_env import warm_up_features
+from utils.candle_store import CandleStore, COLUMNS, timeframe_to_ms
+from utils.features import ClosedCandleFeatures, compute_features
+from utils.market_feed import MarketDataCache
+
+NAMES = ['ema_12', 'rsi_14', 'atr_14', 'vol_20', 'zscore_close_20', 'zscore_volume_20']
+# Starts shortly before a month boundary so warm-up reads two partitions
+START = 1706742000000
+
+
+@pytest.fixture
+def history():
+    rng = np.random.default_rng(7)
+    n = 400
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    spread = np.abs(rng.normal(0, 0.001, n)) * close
+    return pd.DataFrame({
+        'timestamp': START + np.arange(n) * timeframe_to_ms(settings.TIMEFRAME),
+        'open': close + rng.normal(0, 0.05, n),
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': rng.uniform(1, 100, n),
+    })[COLUMNS]
+
+
+def test_live_features_match_vectorized(tmp_path, history):
+    expected = compute_features(history, NAMES)
+    rows = history.to_numpy().tolist()
+    stored = 300
+
+    store = CandleStore(str(tmp_path))
+    store.append(settings.SYMBOL, settings.TIMEFRAME, history.iloc[:stored])
+    cache = MarketDataCache()
+    features = ClosedCandleFeatures(cache, NAMES)
+
+    assert warm_up_features(features, store, bars=stored) == stored
+    np.testing.assert_array_equal(features.values, expected[stored - 1])
+    assert features.last_close == rows[stored - 1][4]
+
+    # The feed starts on the last stored bar; its close must not be counted twice
+    cache.on_candle(rows[stored - 1])
+    for i in range(stored, len(rows)):
+        cache.on_candle(rows[i])
+        np.testing.assert_array_equal(features.values, expected[i - 1])
+    assert features.last_timestamp == rows[-2][0]
+
+
+def test_warm_up_uses_newest_bars(tmp_path, history):
+    store = CandleStore(str(tmp_path))
+    store.append(settings.SYMBOL, settings.TIMEFRAME, history)
+    cache = MarketDataCache()
+    features = ClosedCandleFeatures(cache, NAMES)
+
+    assert warm_up_features(features, store, bars=50) == 50
+    expected = compute_features(history.iloc[-50:], NAMES)
+    np.testing.assert_array_equal(features.values, expected[-1])
@@ -0,0 +1,16 @@
+from utils.logger import TradingLogger, shutdown_logging
+
+
+def test_each_log_file_receives_only_its_own_records(tmp_path):
+    first = TradingLogger(str(tmp_path / 'first.log'))
+    second = TradingLogger(str(tmp_path / 'second.log'))
+    again = TradingLogger(str(tmp_path / 'first.log'))
+    first.log_error("from first")
+    second.log_error("from second")
+    again.log_error("first again")
+    shutdown_logging()
+
+    first_lines = (tmp_path / 'first.log').read_text().splitlines()
+    second_lines = (tmp_path / 'second.log').read_text().splitlines()
+    assert [line.split(' - ')[-1] for line in first_lines] == ["Error: from first", "Error: first again"]
+    assert [line.split(' - ')[-1] for line in second_lines] == ["Error: from second"]
@@ -0,0 +1,122 @@
+import os
+import numpy as np
+from utils.memory import NStepWindow
+
+
+def test_n_step_window_copies_reused_state_buffer():
+    window, gamma = NStepWindow(3, 0.5), 0.5
+    buffer = np.zeros(2)   # An environment that reuses one state array
+    emitted = []
+    for t in range(5):
+        buffer[:] = t
+        state = buffer
+        next_state = np.full(2, t + 1.0)
+        emitted += window.push(state, 0, 1.0, next_state, t == 4, row=t)
+
+    assert [s[0] for s, *_ in emitted] == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert [r for *_, r in emitted] == [0, 1, 2, 3, 4]
+    returns = [g for _, _, g, _, _, _ in emitted]
+    assert returns[:3] == [1 + gamma + gamma ** 2] * 3
+    assert returns[3:] == [1 + gamma, 1.0]
+    assert [d for _, _, _, _, d, _ in emitted] == [False, False, True, True, True]
+
+
+def test_n_step_window_clear_drops_abandoned_episode():
+    window = NStepWindow(3, 0.9)
+    window.push(np.zeros(2), 0, 1.0, np.ones(2), False)
+    window.push(np.ones(2), 1, 1.0, np.ones(2), False)
+    window.clear()
+    assert len(window) == 0
+    out = window.push(np.full(2, 7.0), 2, 5.0, np.full(2, 8.0), True)
+    assert len(out) == 1 and out[0][0][0] == 7.0 and out[0][2] == 5.0
+
+
+def _fill_pair(capacity, episodes, bars, overflow_size=4):
+    from benchmarks.data import synthetic_candles
+    from environments.backtest_env import BacktestEnvironment, ACCOUNT_COLUMNS
+    from utils.memory import IndexedReplayBuffer, ReplayBuffer
+
+    env = BacktestEnvironment(synthetic_candles(bars))
+    full = ReplayBuffer(capacity, env.market_states().shape[1], seed=3)
+    indexed = IndexedReplayBuffer(capacity, env.market_states(), ACCOUNT_COLUMNS, seed=3,
+                                  overflow_size=overflow_size)
+    rng = np.random.default_rng(0)
+    for _ in range(episodes):
+        state, done = env.reset(), False
+        # Abandon some episodes part-way so next states do not follow on
+        stop = rng.integers(bars // 2, bars)
+        while not done and env.current_step < stop:
+            row = env.current_step
+            next_state, reward, done, _ = env.step(int(rng.integers(3)))
+            full.add(state, 0, reward, next_state, done, row)
+            indexed.add(state, 0, reward, next_state, done, row)
+            state = next_state
+    return full, indexed
+
+
+def test_indexed_replay_matches_replay_buffer():
+    full, indexed = _fill_pair(capacity=150, episodes=12, bars=40)
+    assert indexed.size == full.size == 150
+    # Overflow holds one entry per episode end still referenced, not one per transition
+    assert indexed._overflow_size < indexed.capacity
+    for _ in range(20):
+        for a, b in zip(full.sample(32), indexed.sample(32)):
+            np.testing.assert_array_equal(a, b)
+
+
+def test_indexed_replay_checkpoint_round_trip():
+    from environments.backtest_env import ACCOUNT_COLUMNS
+    from utils.memory import IndexedReplayBuffer
+
+    full, indexed = _fill_pair(capacity=100, episodes=8, bars=40, overflow_size=2)
+    arrays, meta = indexed.get_state()
+    restored = IndexedReplayBuffer(100, indexed.market_states, ACCOUNT_COLUMNS, overflow_size=2)
+    restored.set_state(arrays, meta)
+    for a, b in zip(full.sample(64), restored.sample(64)):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_replay_buffer_samples_distinct_rows():
+    from utils.memory import ReplayBuffer
+
+    buffer = ReplayBuffer(100, 2, seed=0)
+    buffer.add_batch(np.zeros((100, 2)), np.zeros(100), np.arange(100), np.zeros((100, 2)),
+                     np.zeros(100, dtype=bool))
+    for _ in range(50):
+        assert len(np.unique(buffer.sample(64)[2])) == 64
+
+
+def test_disk_replay_run_directory_is_lazy_and_removed_without_checkpoint(tmp_path):
+    from utils.memory import DiskReplayBuffer
+
+    root = tmp_path / 'replay'
+    unused = DiskReplayBuffer(100, 3, root=str(root), hot_size=8)
+    assert not root.exists()
+    unused.close()
+
+    buffer = DiskReplayBuffer(100, 3, root=str(root), hot_size=8)
+    buffer.add_batch(np.ones((20, 3)), np.zeros(20), np.ones(20), np.ones((20, 3)), np.zeros(20, dtype=bool))
+    assert len(list(root.iterdir())) == 1
+    buffer.close()
+    assert list(root.iterdir()) == []
+
+
+def test_disk_replay_keeps_checkpointed_run_directory(tmp_path):
+    from utils.memory import DiskReplayBuffer
+
+    root = str(tmp_path / 'replay')
+    buffer = DiskReplayBuffer(100, 3, root=root, hot_size=8)
+    states = np.arange(60, dtype=np.float32).reshape(20, 3)
+    buffer.add_batch(states, np.zeros(20), np.ones(20), states, np.zeros(20, dtype=bool))
+    arrays, meta = buffer.get_state()
+    buffer.close()
+
+    # A fresh run restoring the checkpoint drops its own directory and reopens the saved one
+    restored = DiskReplayBuffer(100, 3, root=root, hot_size=8)
+    restored.add(states[0], 0, 0.0, states[0], False)
+    restored.set_state(arrays, meta)
+    assert os.listdir(root) == [os.path.basename(meta['directory'])]
+    assert len(restored) == 20
+    np.testing.assert_array_equal(restored.states[:20], states)
+    restored.close()
+    assert os.path.isdir(meta['directory'])
@@ -0,0 +1,42 @@
+import numpy as np
+from utils.metrics_log import MetricsLog, STEP_DTYPE
+
+
+def test_read_ignores_torn_tail(tmp_path):
+    path = str(tmp_path / 'steps.bin')
+    with MetricsLog(path, STEP_DTYPE, chunk_size=4) as log:
+        for i in range(10):
+            log.append(0, 100.0 + i, 0.0, 0.0)
+    with open(path, 'ab') as f:
+        f.write(b'\x00' * (STEP_DTYPE.itemsize // 2))
+
+    records = MetricsLog.read(path)
+    assert len(records) == 10
+    np.testing.assert_array_equal(records['portfolio_value'], 100.0 + np.arange(10))
+
+
+def test_read_empty_and_partial_first_record(tmp_path):
+    path = str(tmp_path / 'steps.bin')
+    MetricsLog(path, STEP_DTYPE).close()
+    assert len(MetricsLog.read(path)) == 0
+    with open(path, 'ab') as f:
+        f.write(b'\x00' * 3)
+    assert len(MetricsLog.read(path)) == 0
+
+
+def test_append_truncates_to_saved_records(tmp_path):
+    path = str(tmp_path / 'steps.bin')
+    with MetricsLog(path, STEP_DTYPE, chunk_size=4) as log:
+        for i in range(6):
+            log.append(0, float(i), 0.0, 0.0)
+        saved = log.records
+        for i in range(6, 9):
+            log.append(1, float(i), 0.0, 0.0)
+
+    with MetricsLog(path, STEP_DTYPE, append=True, records=saved) as log:
+        assert log.records == 6
+        log.append(1, 60.0, 0.0, 0.0)
+        assert log.records == 7
+
+    records = MetricsLog.read(path)
+    assert records['portfolio_value'].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 60.0]
@@ -0,0 +1,151 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+from environments.backtest_env import BacktestEnvironment
+from models.inference import NumpyQNetwork
+from utils.memory import SynchronizedReplayBuffer, NStepWindow
+from config.settings import settings
+
+class ActorLearner:
+    """Concurrent experience collection and training
+
+    Actor threads step their own ``BacktestEnvironment`` (one data slice
+    each) with a NumPy snapshot of the policy and write into the agent's
+    replay buffer. A learner thread trains continuously and republishes the
+    snapshot every ``publish_interval`` updates. ``replay_ratio`` is the
+    target number of gradient updates per actor step; whichever side runs
+    ahead by more than ``max_lag`` steps waits for the other.
+    """
+
+    def __init__(self, agent, historical_data: pd.DataFrame,
+                 num_actors: int = settings.NUM_ACTORS,
+                 replay_ratio: float = settings.REPLAY_RATIO,
+                 publish_interval: int = settings.WEIGHT_PUBLISH_INTERVAL,
+                 target_update_interval: int = 1000,
+                 max_lag: int = 1000):
+        self.agent = agent
+        if not isinstance(agent.memory, SynchronizedReplayBuffer):
+            agent.memory = SynchronizedReplayBuffer(agent.memory)
+        bounds = np.linspace(0, len(historical_data), num_actors + 1).astype(int)
+        self.envs = [
+            BacktestEnvironment(historical_data.iloc[start:end])
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+        self.replay_ratio = replay_ratio
+        self.publish_interval = publish_interval
+        self.target_update_interval = target_update_interval
+        self.max_lag = max_lag
+        self.warmup = settings.BATCH_SIZE
+
+        self.policy = NumpyQNetwork.from_keras(agent.model)
+        self.actor_steps = 0
+        self.updates = 0
+        self.episodes = 0
+        self.episode_rewards = []
+        self._progress = threading.Condition()
+        self._stop = threading.Event()
+        self._errors = []
+
+    def _learner_target(self) -> float:
+        """Updates the learner should have done for the current actor steps"""
+        return (self.actor_steps - self.warmup) * self.replay_ratio
+
+    def _actor(self, env: BacktestEnvironment, seed: int):
+        rng = np.random.default_rng(seed)
+        window = NStepWindow(self.agent.n_step, self.agent.gamma)
+        state = env.reset()
+        total_reward = 0.0
+        while not self._stop.is_set():
+            if rng.random() <= self.agent.epsilon:
+                action = int(rng.integers(self.agent.action_size))
+            else:
+                action = int(self.policy.act(state[np.newaxis])[0])
+            next_state, reward, done, _ = env.step(action)
+            for transition in window.push(state, action, reward, next_state, done):
+                self.agent.memory.add(*transition)
+            total_reward += reward
+            state = next_state
+
+            with self._progress:
+                self.actor_steps += 1
+                if done:
+                    self.episodes += 1
+                    self.episode_rewards.append(total_reward)
+                self._progress.notify_all()
+                while (self._learner_target() - self.updates > self.max_lag
+                       and not self._stop.is_set()):
+                    self._progress.wait(0.1)
+
+            if done:
+                state = env.reset()
+                total_reward = 0.0
+
+    def _learner(self):
+        while not self._stop.is_set():
+            with self._progress:
+                while self.updates >= self._learner_target() and not self._stop.is_set():
+                    self._progress.wait(0.1)
+            if self._stop.is_set():
+                break
+
+            if self.agent.train() is None:
+                # Replay is still below a batch: wait for actors instead of counting a no-op
+                with self._progress:
+                    self._progress.wait(0.1)
+                continue
+
+            with self._progress:
+                self.updates += 1
+                self._progress.notify_all()
+            if self.updates % self.publish_interval == 0:
+                self.policy = NumpyQNetwork.from_keras(self.agent.model)
+            if self.updates % self.target_update_interval == 0:
+                self.agent.update_target_network()
+
+    def _guard(self, fn, *args):
+        try:
+            fn(*args)
+        except Exception as e:
+            self._errors.append(e)
+            self._stop.set()
+
+    def run(self, total_steps: int, report_interval: float = 10.0) -> dict:
+        """Run until ``total_steps`` actor steps; returns throughput stats"""
+        threads = [threading.Thread(target=self._guard, args=(self._learner,), daemon=True)]
+        threads += [
+            threading.Thread(target=self._guard, args=(self._actor, env, i), daemon=True)
+            for i, env in enumerate(self.envs)
+        ]
+        start = last_report = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        last_steps, last_updates = 0, 0
+        while not self._stop.is_set() and self.actor_steps < total_steps:
+            time.sleep(0.05)
+            now = time.perf_counter()
+            if now - last_report >= report_interval:
+                elapsed = now - last_report
+                print(f"Actor steps/s: {(self.actor_steps - last_steps) / elapsed:.1f} | "
+                      f"Learner updates/s: {(self.updates - last_updates) / elapsed:.1f} | "
+                      f"Episodes: {self.episodes} | Epsilon: {self.agent.epsilon:.3f}")
+                last_report, last_steps, last_updates = now, self.actor_steps, self.updates
+
+        self._stop.set()
+        with self._progress:
+            self._progress.notify_all()
+        for thread in threads:
+            thread.join()
+        if self._errors:
+            raise self._errors[0]
+
+        elapsed = time.perf_counter() - start
+        return {
+            'actor_steps': self.actor_steps,
+            'learner_updates': self.updates,
+            'episodes': self.episodes,
+            'actor_steps_per_sec': self.actor_steps / elapsed,
+            'learner_updates_per_sec': self.updates / elapsed,
+            'wall_time': elapsed
+        }
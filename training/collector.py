@@ -0,0 +1,271 @@
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from environments.backtest_env import BacktestEnvironment
+from models.inference import NumpyQNetwork
+from utils.memory import NStepWindow
+from config.settings import settings
+
+def _attach(name: str, size: int) -> shared_memory.SharedMemory:
+    """Create (name=None) or attach to a shared-memory block"""
+    if name is None:
+        return shared_memory.SharedMemory(create=True, size=size)
+    return shared_memory.SharedMemory(name=name)
+
+
+class SharedWeights:
+    """Flat float32 policy weights in shared memory behind a seqlock
+
+    Header is ``[version, epsilon]`` (float64). The version is odd while
+    the learner writes, so readers skip torn snapshots and retry later.
+    """
+
+    HEADER_BYTES = 16
+
+    def __init__(self, size: int, name: str = None):
+        self.size = size
+        self.shm = _attach(name, self.HEADER_BYTES + size * 4)
+        self.header = np.ndarray(2, dtype=np.float64, buffer=self.shm.buf)
+        self.flat = np.ndarray(size, dtype=np.float32, buffer=self.shm.buf, offset=self.HEADER_BYTES)
+        if name is None:
+            self.header[:] = 0.0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def publish(self, weights: list, epsilon: float):
+        """Write a new weight snapshot (single writer)"""
+        self.header[0] += 1
+        offset = 0
+        for w in weights:
+            self.flat[offset:offset + w.size] = w.ravel()
+            offset += w.size
+        self.header[1] = epsilon
+        self.header[0] += 1
+
+    def read_into(self, net: NumpyQNetwork, last_version: float):
+        """Load a newer snapshot into ``net``; returns (version, epsilon) or None"""
+        version = self.header[0]
+        if version == last_version or version % 2:
+            return None
+        snapshot = self.flat.copy()
+        epsilon = float(self.header[1])
+        if self.header[0] != version:
+            return None
+
+        weights, offset = [], 0
+        for w in net.get_weights():
+            weights.append(snapshot[offset:offset + w.size].reshape(w.shape))
+            offset += w.size
+        net.set_weights(weights)
+        return version, epsilon
+
+    def close(self):
+        self.shm.close()
+
+
+class TransitionRing:
+    """Single-producer/single-consumer transition ring in shared memory
+
+    Rows are ``[state, action, reward, next_state, done]`` as float32; the
+    int64 header holds the write and read counters.
+    """
+
+    HEADER_BYTES = 16
+
+    def __init__(self, slots: int, state_size: int, name: str = None):
+        self.slots = slots
+        self.state_size = state_size
+        self.width = 2 * state_size + 3
+        self.shm = _attach(name, self.HEADER_BYTES + slots * self.width * 4)
+        self.counters = np.ndarray(2, dtype=np.int64, buffer=self.shm.buf)
+        self.rows = np.ndarray((slots, self.width), dtype=np.float32,
+                               buffer=self.shm.buf, offset=self.HEADER_BYTES)
+        if name is None:
+            self.counters[:] = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def push(self, state, action, reward, next_state, done, stop_event=None) -> bool:
+        """Append one transition, waiting while the ring is full"""
+        while self.counters[0] - self.counters[1] >= self.slots:
+            if stop_event is not None and stop_event.is_set():
+                return False
+            time.sleep(0.001)
+        s = self.state_size
+        row = self.rows[self.counters[0] % self.slots]
+        row[:s] = state
+        row[s] = action
+        row[s + 1] = reward
+        row[s + 2:2 * s + 2] = next_state
+        row[-1] = done
+        self.counters[0] += 1
+        return True
+
+    def drain(self) -> tuple:
+        """Copy out every unread transition as (states, actions, rewards, next_states, dones)"""
+        written, read = int(self.counters[0]), int(self.counters[1])
+        rows = self.rows[np.arange(read, written) % self.slots]
+        self.counters[1] = written
+        s = self.state_size
+        return (rows[:, :s], rows[:, s].astype(np.int32), rows[:, s + 1],
+                rows[:, s + 2:2 * s + 2], rows[:, -1] > 0.5)
+
+    def close(self):
+        self.shm.close()
+
+
+def _collector_worker(data: pd.DataFrame, layout: list, weights_name: str, weights_size: int,
+                      ring_name: str, ring_slots: int, state_size: int, seed: int, stop_event,
+                      n_step: int = 1, gamma: float = settings.GAMMA):
+    """Worker process: step a local environment with the shared policy"""
+    weights = SharedWeights(weights_size, name=weights_name)
+    ring = TransitionRing(ring_slots, state_size, name=ring_name)
+    window = NStepWindow(n_step, gamma)
+    policy = NumpyQNetwork.from_layout(layout, seed)
+    env = BacktestEnvironment(data)
+    rng = np.random.default_rng(seed)
+    action_size = layout[-1][0][1]
+    version, epsilon = 0.0, 1.0
+
+    try:
+        state = env.reset()
+        while not stop_event.is_set():
+            update = weights.read_into(policy, version)
+            if update is not None:
+                version, epsilon = update
+
+            if rng.random() <= epsilon:
+                action = int(rng.integers(action_size))
+            else:
+                action = int(policy.act(state[np.newaxis])[0])
+            next_state, reward, done, _ = env.step(action)
+            pushed = all(ring.push(*transition[:5], stop_event)
+                         for transition in window.push(state, action, reward, next_state, done))
+            if not pushed:
+                break
+            state = env.reset() if done else next_state
+    finally:
+        weights.close()
+        ring.close()
+
+
+class DistributedCollector:
+    """Process-pool experience collection feeding one learner
+
+    Each of ``num_workers`` spawned processes runs a ``BacktestEnvironment``
+    over its own slice of history with a NumPy copy of the policy. Weights
+    are broadcast through one shared-memory block and transitions stream
+    back through per-worker shared-memory rings; no Keras object is pickled.
+    """
+
+    def __init__(self, agent, historical_data: pd.DataFrame,
+                 num_workers: int = settings.NUM_WORKERS,
+                 ring_size: int = settings.TRANSITION_RING_SIZE):
+        self.agent = agent
+        self.policy = NumpyQNetwork.from_keras(agent.model)
+        weights_size = sum(w.size for w in self.policy.get_weights())
+        self.weights = SharedWeights(weights_size)
+        self.publish_weights()
+
+        ctx = mp.get_context('spawn')
+        self.stop_event = ctx.Event()
+        self.rings = [TransitionRing(ring_size, agent.state_size) for _ in range(num_workers)]
+        bounds = np.linspace(0, len(historical_data), num_workers + 1).astype(int)
+        self.workers = [
+            ctx.Process(
+                target=_collector_worker,
+                args=(historical_data.iloc[start:end], self.policy.layout(),
+                      self.weights.name, weights_size, ring.name, ring_size,
+                      agent.state_size, i, self.stop_event, agent.n_step, agent.gamma),
+                daemon=True
+            )
+            for i, (start, end, ring) in enumerate(zip(bounds[:-1], bounds[1:], self.rings))
+        ]
+
+    def start(self):
+        for worker in self.workers:
+            worker.start()
+
+    def stop(self):
+        """Stop workers and release shared memory"""
+        self.stop_event.set()
+        for worker in self.workers:
+            worker.join(timeout=10)
+            if worker.is_alive():
+                worker.terminate()
+        for block in [self.weights] + self.rings:
+            block.close()
+            block.shm.unlink()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def publish_weights(self):
+        """Broadcast the learner's current weights and epsilon"""
+        self.policy.load_weights(self.agent.model)
+        self.weights.publish(self.policy.get_weights(), self.agent.epsilon)
+
+    def collect(self) -> int:
+        """Move all pending transitions into the agent's replay buffer"""
+        total = 0
+        for ring in self.rings:
+            batch = ring.drain()
+            if len(batch[0]):
+                self.agent.memory.add_batch(*batch)
+                total += len(batch[0])
+        return total
+
+    def run(self, total_steps: int, replay_ratio: float = settings.REPLAY_RATIO,
+            publish_interval: int = settings.WEIGHT_PUBLISH_INTERVAL,
+            target_update_interval: int = 1000, report_interval: float = 10.0) -> dict:
+        """Learner loop: drain workers, train ``replay_ratio`` updates per step"""
+        steps, updates, owed = 0, 0, 0.0
+        start = last_report = time.perf_counter()
+        last_steps, last_updates = 0, 0
+
+        while steps < total_steps:
+            for worker in self.workers:
+                if not worker.is_alive():
+                    raise RuntimeError(f"Collector worker {worker.pid} exited ({worker.exitcode})")
+            collected = self.collect()
+            steps += collected
+            if len(self.agent.memory) >= settings.BATCH_SIZE:
+                owed += collected * replay_ratio
+
+            if owed < 1:
+                time.sleep(0.001)
+            while owed >= 1:
+                self.agent.train()
+                owed -= 1
+                updates += 1
+                if updates % publish_interval == 0:
+                    self.publish_weights()
+                if updates % target_update_interval == 0:
+                    self.agent.update_target_network()
+
+            now = time.perf_counter()
+            if now - last_report >= report_interval:
+                elapsed = now - last_report
+                print(f"Actor steps/s: {(steps - last_steps) / elapsed:.1f} | "
+                      f"Learner updates/s: {(updates - last_updates) / elapsed:.1f} | "
+                      f"Epsilon: {self.agent.epsilon:.3f}")
+                last_report, last_steps, last_updates = now, steps, updates
+
+        elapsed = time.perf_counter() - start
+        return {
+            'actor_steps': steps,
+            'learner_updates': updates,
+            'actor_steps_per_sec': steps / elapsed,
+            'learner_updates_per_sec': updates / elapsed,
+            'wall_time': elapsed
+        }
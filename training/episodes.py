@@ -0,0 +1,55 @@
+import os
+from config.settings import settings
+
+def limit_threads(threads: int):
+    """Cap TF/BLAS threads for this process (call before TensorFlow runs ops)"""
+    for var in ('OMP_NUM_THREADS', 'TF_NUM_INTRAOP_THREADS', 'TF_NUM_INTEROP_THREADS'):
+        os.environ[var] = str(threads)
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(threads)
+
+
+def train_episodes(agent, env, episodes: int, target_update_interval: int = 10,
+                   callback=None) -> list:
+    """Train like ``main_backtest2.py``; returns each episode's final portfolio value
+
+    ``callback(episode, portfolio_value)`` may return True to stop early.
+    """
+    values = []
+    for episode in range(episodes):
+        state = env.reset()
+        agent.n_step_window.clear()   # Nothing from an abandoned episode carries over
+        done = False
+        while not done:
+            row = env.current_step
+            action = agent.act(state)
+            next_state, reward, done, _ = env.step(action)
+            agent.remember(state, action, reward, next_state, done, row)
+            agent.train()
+            state = next_state
+        values.append(float(env.portfolio_value))
+        if episode % target_update_interval == 0:
+            agent.update_target_network()
+        if callback is not None and callback(episode, env.portfolio_value):
+            break
+    return values
+
+
+def evaluate_greedy(agent, env) -> dict:
+    """One greedy (epsilon 0) pass over ``env``; returns the StreamingMetrics summary"""
+    from utils.metrics import StreamingMetrics
+
+    tracker = StreamingMetrics(settings.RISK_FREE_RATE)
+    epsilon, agent.epsilon = agent.epsilon, 0.0
+    try:
+        state = env.reset()
+        tracker.start_episode(env.portfolio_value, env.position)
+        done = False
+        while not done:
+            state, _, done, _ = env.step(agent.act(state))
+            tracker.update(env.portfolio_value, env.position, env.current_price)
+    finally:
+        agent.epsilon = epsilon
+    return tracker.summary()
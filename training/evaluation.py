@@ -0,0 +1,133 @@
+import numpy as np
+from environments.backtest_env import ACCOUNT_COLUMNS
+from utils.checkpoint import Checkpointer
+from utils.metrics import StreamingMetrics
+from config.settings import settings
+
+# Balance/position columns and the price-change column of the state
+_HOLDINGS = slice(ACCOUNT_COLUMNS.start, ACCOUNT_COLUMNS.start + 2)
+_PRICE_CHANGE = ACCOUNT_COLUMNS.start + 2
+
+
+def greedy_actions(agent, states: np.ndarray, tie_tolerance: float = 1e-4) -> np.ndarray:
+    """Argmax actions for a batch, identical to per-state ``agent.act`` at epsilon 0
+
+    A batched forward pass may round differently from a single-row one, so
+    rows whose best two Q values are within ``tie_tolerance`` (relative)
+    are re-evaluated one at a time.
+    """
+    q = agent.q_values(states)
+    actions = np.argmax(q, axis=1)
+    if len(states) > 1 and q.shape[1] > 1:
+        top2 = np.partition(q, -2, axis=1)[:, -2:]
+        gap = top2[:, 1] - top2[:, 0]
+        scale = np.maximum(np.abs(top2[:, 1]), 1.0)
+        for i in np.flatnonzero(gap <= tie_tolerance * scale):
+            actions[i] = np.argmax(agent.q_values(states[i:i + 1])[0])
+    return actions
+
+
+class HybridEvaluator:
+    """Greedy evaluation over one backtest environment with batched inference
+
+    The market part of every state is built once for the whole data set.
+    Account columns only change when a trade executes, so the states of the
+    coming bars are known in advance as long as the account stays put: Q
+    values for a block of them are computed in one batch, and the real
+    environment is stepped with those actions until a trade changes the
+    balance or position as the network sees them (float32), at which point
+    the block is rebuilt from the new state. Stepping the environment itself keeps rewards, fills and metrics
+    on the exact code path of step-by-step evaluation; block sizes adapt to
+    how long the policy sits between trades.
+    """
+
+    def __init__(self, env, min_batch: int = 1, max_batch: int = 4096,
+                 tie_tolerance: float = 1e-4):
+        self.env = env
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.tie_tolerance = tie_tolerance
+
+        # Market columns and bar-to-bar price change for every bar (shared by all runs)
+        self.market_states = env.market_states()
+        closes = env.close_prices
+        change = np.zeros(len(closes))
+        change[1:] = (closes[1:] - closes[:-1]) / closes[:-1]
+        self.market_states[:, _PRICE_CHANGE] = change
+
+    def _block(self, state: np.ndarray, start: int, size: int) -> np.ndarray:
+        """States for bars ``start..`` assuming the account in ``state`` holds"""
+        end = min(start + size, self.env.max_steps)
+        block = self.market_states[start:end].copy()
+        block[:, _HOLDINGS] = state[_HOLDINGS]
+        block[0] = state   # The current state is exact, including the post-reset price change
+        return block
+
+    def run(self, agent, record: bool = True) -> dict:
+        """One greedy pass; returns the ``generate_metrics`` metrics dict"""
+        env = self.env
+        # Match a freshly built environment (reset keeps the last price change)
+        env.current_price = env.previous_price = float(env.close_prices[0])
+        tracker = StreamingMetrics(settings.RISK_FREE_RATE)
+        metrics = {'portfolio_values': [], 'positions': [], 'episode_rewards': [], 'drawdowns': []}
+
+        state = env.reset()
+        tracker.start_episode(env.portfolio_value, env.position)
+        batch, done = self.max_batch, False
+        while not done:
+            start = env.current_step
+            block = self._block(state, start, batch)
+            actions = greedy_actions(agent, block, self.tie_tolerance)
+            holdings = block[0, _HOLDINGS]
+            used = 0
+            for action in actions:
+                state, reward, done, _ = env.step(int(action))
+                used += 1
+                drawdown = tracker.update(env.portfolio_value, env.position, env.current_price)
+                if record:
+                    metrics['portfolio_values'].append(env.portfolio_value)
+                    metrics['positions'].append(env.position)
+                    metrics['episode_rewards'].append(reward)
+                    metrics['drawdowns'].append(drawdown)
+                if done or (state[_HOLDINGS].astype(np.float32) != holdings).any():
+                    break
+            # Grow while blocks are used up; otherwise expect a run like the last one
+            batch = 2 * used if used == len(actions) else used
+            batch = min(self.max_batch, max(self.min_batch, batch))
+
+        for key, value in tracker.end_episode().items():
+            metrics[f'summary_{key}'] = value
+        return metrics
+
+    def run_checkpoints(self, agent, paths: list, record: bool = True) -> dict:
+        """Evaluate several saved models over the same data: {path: metrics}"""
+        results = {}
+        for path in paths:
+            Checkpointer.load_weights(agent.model, path)
+            results[path] = self.run(agent, record)
+        return results
+
+
+def evaluate_sequential(agent, env, record: bool = True) -> dict:
+    """Reference step-by-step greedy evaluation (one ``agent.act`` per bar)"""
+    env.current_price = env.previous_price = float(env.close_prices[0])
+    tracker = StreamingMetrics(settings.RISK_FREE_RATE)
+    metrics = {'portfolio_values': [], 'positions': [], 'episode_rewards': [], 'drawdowns': []}
+    epsilon, agent.epsilon = agent.epsilon, 0.0
+    try:
+        state = env.reset()
+        tracker.start_episode(env.portfolio_value, env.position)
+        done = False
+        while not done:
+            state, reward, done, _ = env.step(agent.act(state))
+            drawdown = tracker.update(env.portfolio_value, env.position, env.current_price)
+            if record:
+                metrics['portfolio_values'].append(env.portfolio_value)
+                metrics['positions'].append(env.position)
+                metrics['episode_rewards'].append(reward)
+                metrics['drawdowns'].append(drawdown)
+    finally:
+        agent.epsilon = epsilon
+    for key, value in tracker.end_episode().items():
+        metrics[f'summary_{key}'] = value
+    return metrics
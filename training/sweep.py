@@ -0,0 +1,230 @@
+import hashlib
+import itertools
+import json
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import asdict
+import numpy as np
+import pandas as pd
+from config.settings import settings
+from .episodes import limit_threads, train_episodes, evaluate_greedy
+
+# Per-worker state set by the pool initializer
+_worker_data = None
+
+
+def grid_search(space: dict) -> list:
+    """Every combination of ``{field: [values]}``"""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+
+def random_search(space: dict, num_trials: int, seed: int = None) -> list:
+    """Random draws: lists are sampled uniformly, ``(low, high)`` tuples as ranges
+
+    Integer bounds give integers (inclusive); float bounds are sampled
+    log-uniformly when both are positive and span more than a decade.
+    """
+    rng = np.random.default_rng(seed)
+    trials = []
+    for _ in range(num_trials):
+        params = {}
+        for name, spec in space.items():
+            if isinstance(spec, list):
+                params[name] = spec[int(rng.integers(len(spec)))]
+            elif all(isinstance(v, int) for v in spec):
+                params[name] = int(rng.integers(spec[0], spec[1] + 1))
+            elif spec[0] > 0 and spec[1] / spec[0] > 10:
+                params[name] = float(np.exp(rng.uniform(np.log(spec[0]), np.log(spec[1]))))
+            else:
+                params[name] = float(rng.uniform(spec[0], spec[1]))
+        trials.append(params)
+    return trials
+
+
+def data_hash(data: pd.DataFrame) -> str:
+    """Content hash of the OHLCV columns"""
+    digest = hashlib.sha256()
+    for column in ['open', 'high', 'low', 'close', 'volume']:
+        digest.update(np.ascontiguousarray(data[column].to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+def trial_key(params: dict, data_digest: str, seed: int, train_fraction: float) -> str:
+    """Cache key: every effective setting plus the data and run options"""
+    config = asdict(settings)
+    config['EPS_MIN'] = settings.EPS_MIN
+    config.update(params)
+    payload = json.dumps({'settings': config, 'data': data_digest, 'seed': seed,
+                          'train_fraction': train_fraction}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def should_prune(value: float, episode: int, reference: list,
+                 min_episodes: int, min_trials: int) -> bool:
+    """Median stopping rule against the curves of finished trials"""
+    if episode + 1 < min_episodes:
+        return False
+    values = [curve[episode] for curve in reference if len(curve) > episode]
+    return len(values) >= min_trials and value < float(np.median(values))
+
+
+def _init_worker(data: pd.DataFrame, threads: int):
+    """Limit BLAS/TF threads before TensorFlow starts, then keep the data"""
+    global _worker_data
+    limit_threads(threads)
+    _worker_data = data
+
+
+def _run_trial(key: str, params: dict, seed: int, train_fraction: float,
+               reference: list, min_episodes: int, min_trials: int) -> dict:
+    import tensorflow as tf
+    from environments.backtest_env import BacktestEnvironment
+    from models.q_network import DQNAgent
+
+    started = time.perf_counter()
+    result = {'key': key, 'params': params, 'status': 'complete'}
+    agent = None
+
+    def prune(episode, value):
+        if should_prune(value, episode, reference, min_episodes, min_trials):
+            result['status'] = 'pruned'
+            return True
+        return False
+
+    try:
+        # Overrides live only for this trial; the worker's settings are restored after
+        with settings.override(**params):
+            np.random.seed(seed)
+            tf.random.set_seed(seed)
+            split = int(len(_worker_data) * train_fraction)
+            env = BacktestEnvironment(_worker_data.iloc[:split])
+            agent = DQNAgent(settings.STATE_SIZE, settings.ACTION_SIZE)
+            result['curve'] = train_episodes(agent, env, settings.EPISODES, callback=prune)
+
+            # Greedy evaluation on the held-out tail
+            test_env = BacktestEnvironment(_worker_data.iloc[split:], copy_state=False)
+            result['test'] = evaluate_greedy(agent, test_env)
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = repr(e)
+    finally:
+        if agent is not None:
+            agent.memory.close()   # Removes a disk replay run directory
+        tf.keras.backend.clear_session()
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+class SweepRunner:
+    """Parallel hyperparameter search over ``Settings`` fields
+
+    Each trial trains a fresh agent for ``settings.EPISODES`` episodes on
+    the first ``train_fraction`` of the data (as ``main_backtest2.py`` does)
+    and scores a greedy pass over the rest. Trials run in spawned worker
+    processes with ``threads_per_worker`` TF/BLAS threads each; overrides
+    are applied with ``settings.override`` and undone after every trial.
+
+    Finished trials are cached as JSON in ``cache_dir`` under a hash of the
+    effective settings and data, so rerunning a sweep only runs new work.
+    A trial is pruned once its episode value falls below the median of
+    finished trials at the same episode (after ``min_episodes``).
+    """
+
+    def __init__(self, data: pd.DataFrame, cache_dir: str = 'sweeps/cache',
+                 workers: int = settings.NUM_WORKERS, threads_per_worker: int = None,
+                 metric: str = 'final_value', maximize: bool = True, seed: int = 0,
+                 train_fraction: float = 0.8, min_episodes: int = 3, min_trials: int = 3):
+        self.data = data
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+        self.metric = metric
+        self.maximize = maximize
+        self.seed = seed
+        self.train_fraction = train_fraction
+        self.min_episodes = min_episodes
+        self.min_trials = min_trials
+        self.data_digest = data_hash(data)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load_cached(self, key: str):
+        path = self._cache_path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _store(self, result: dict):
+        path = self._cache_path(result['key'])
+        tmp = os.path.join(self.cache_dir, f".{result['key']}.tmp")
+        with open(tmp, 'w') as f:
+            json.dump(result, f, default=float)
+        os.replace(tmp, path)
+
+    def run(self, trials: list, results_path: str = 'sweeps/results.csv') -> pd.DataFrame:
+        """Run (or load from cache) every trial and write the results table"""
+        for params in trials:
+            for name in params:
+                if not hasattr(settings, name) or name == 'STATE_SIZE':
+                    raise ValueError(f"Unknown setting: {name}")
+
+        results, pending = [], []
+        for params in trials:
+            key = trial_key(params, self.data_digest, self.seed, self.train_fraction)
+            cached = self._load_cached(key)
+            if cached is not None:
+                results.append(cached)
+            else:
+                pending.append((key, params))
+        print(f"{len(results)} cached trials, {len(pending)} to run")
+
+        if pending:
+            context = mp.get_context('spawn')
+            with ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker,
+                                     initargs=(self.data, self.threads_per_worker)) as pool:
+                # Submit lazily so later trials are pruned against earlier ones
+                running = {}
+                while pending or running:
+                    while pending and len(running) < self.workers:
+                        key, params = pending.pop(0)
+                        reference = [r['curve'] for r in results if r['status'] != 'failed']
+                        future = pool.submit(_run_trial, key, params, self.seed, self.train_fraction,
+                                             reference, self.min_episodes, self.min_trials)
+                        running[future] = key
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        del running[future]
+                        result = future.result()
+                        results.append(result)
+                        if result['status'] != 'failed':
+                            self._store(result)
+                        print(f"Trial {result['key']} {result['status']} "
+                              f"({result['seconds']:.0f}s): {result['params']}")
+
+        table = self.table(results)
+        if results_path:
+            os.makedirs(os.path.dirname(results_path) or '.', exist_ok=True)
+            table.to_csv(results_path, index=False)
+        return table
+
+    def table(self, results: list) -> pd.DataFrame:
+        """One row per trial, best score first"""
+        rows = []
+        for result in results:
+            row = {'key': result['key'], 'status': result['status'],
+                   'episodes': len(result.get('curve', [])), 'seconds': result.get('seconds')}
+            row.update(result['params'])
+            for name, value in result.get('test', {}).items():
+                row[f"test_{name}"] = value
+            row['score'] = result.get('test', {}).get(self.metric, np.nan)
+            rows.append(row)
+        table = pd.DataFrame(rows)
+        if len(table):
+            table = table.sort_values('score', ascending=not self.maximize, na_position='last')
+        return table.reset_index(drop=True)
@@ -0,0 +1,194 @@
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from config.settings import settings
+from utils.candle_store import COLUMNS, to_milliseconds
+from .episodes import limit_threads, train_episodes, evaluate_greedy
+
+# Per-worker view of the shared candles set by the pool initializer
+_worker_candles = None
+
+
+def walk_forward_folds(num_bars: int, train_size: int, test_size: int,
+                       step: int = None, anchored: bool = False) -> list:
+    """Rolling ``(train_start, train_end, test_start, test_end)`` bar ranges
+
+    Each test window directly follows its training window. Folds advance
+    by ``step`` bars (default ``test_size``, so test windows tile the
+    history). With ``anchored=True`` every training window starts at bar 0.
+    """
+    step = step or test_size
+    folds = []
+    start = 0
+    while start + train_size + test_size <= num_bars:
+        train_end = start + train_size
+        folds.append((0 if anchored else start, train_end, train_end, train_end + test_size))
+        start += step
+    return folds
+
+
+class SharedCandles:
+    """OHLCV history in one shared-memory block, attachable by name
+
+    The block is (6, n) float64 in ``CandleStore`` row order (timestamps in
+    ms). ``frame()`` wraps it in a DataFrame without copying, so workers
+    slice folds out of the same physical pages.
+    """
+
+    def __init__(self, num_bars: int, name: str = None):
+        self.num_bars = num_bars
+        size = len(COLUMNS) * num_bars * 8
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.block = np.ndarray((len(COLUMNS), num_bars), dtype=np.float64, buffer=self.shm.buf)
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame):
+        shared = cls(len(data))
+        shared.block[0] = to_milliseconds(data['timestamp'])
+        for row, column in enumerate(COLUMNS[1:], start=1):
+            shared.block[row] = data[column].to_numpy(dtype=np.float64)
+        return shared
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def frame(self) -> pd.DataFrame:
+        """Zero-copy DataFrame view (timestamp column is float ms)"""
+        return pd.DataFrame(self.block.T, columns=COLUMNS, copy=False)
+
+    def close(self):
+        self.block = None
+        self.shm.close()
+
+
+def _init_worker(name: str, num_bars: int, threads: int):
+    global _worker_candles
+    limit_threads(threads)
+    _worker_candles = SharedCandles(num_bars, name=name)
+
+
+def _run_fold(index: int, bounds: tuple, episodes: int, overrides: dict,
+              seed: int, initial_weights: list = None, return_weights: bool = False) -> tuple:
+    """Train an agent on one fold's training window and test it greedily"""
+    import tensorflow as tf
+    from environments.backtest_env import BacktestEnvironment
+    from models.q_network import DQNAgent
+
+    started = time.perf_counter()
+    train_start, train_end, test_start, test_end = bounds
+    data = _worker_candles.frame()
+    agent = None
+    try:
+        with settings.override(**overrides):
+            np.random.seed(seed + index)
+            tf.random.set_seed(seed + index)
+            agent = DQNAgent(settings.STATE_SIZE, settings.ACTION_SIZE)
+            if initial_weights is not None:
+                agent.model.set_weights(initial_weights)
+                agent.update_target_network()
+
+            env = BacktestEnvironment(data.iloc[train_start:train_end])
+            curve = train_episodes(agent, env, episodes)
+            test_env = BacktestEnvironment(data.iloc[test_start:test_end], copy_state=False)
+            result = evaluate_greedy(agent, test_env)
+
+        closes = data['close'].to_numpy()
+        result.update({
+            'fold': index,
+            'train_start': train_start, 'train_end': train_end,
+            'test_start': test_start, 'test_end': test_end,
+            'train_final_value': curve[-1] if curve else np.nan,
+            'buy_and_hold_return': closes[test_end - 1] / closes[test_start] - 1,
+            'seconds': time.perf_counter() - started
+        })
+        weights = agent.model.get_weights() if return_weights else None
+    finally:
+        if agent is not None:
+            agent.memory.close()   # Removes a disk replay run directory
+        tf.keras.backend.clear_session()
+    return result, weights
+
+
+class WalkForward:
+    """Walk-forward evaluation over rolling train/test windows
+
+    The candle history is copied once into shared memory; every worker
+    process attaches to it and slices its folds as views, so the data is
+    never pickled or duplicated per process. Independent folds (fresh agent
+    per fold) run in parallel; with ``warm_start=True`` each fold starts
+    from the previous fold's weights and folds run in order.
+    """
+
+    def __init__(self, data: pd.DataFrame, train_size: int, test_size: int,
+                 step: int = None, anchored: bool = False,
+                 episodes: int = settings.EPISODES, workers: int = settings.NUM_WORKERS,
+                 threads_per_worker: int = None, overrides: dict = None,
+                 warm_start: bool = False, seed: int = 0):
+        self.data = data
+        self.folds = walk_forward_folds(len(data), train_size, test_size, step, anchored)
+        if not self.folds:
+            raise ValueError(f"{len(data)} bars is too short for a {train_size}+{test_size} bar fold")
+        self.episodes = episodes
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+        self.overrides = overrides or {}
+        self.warm_start = warm_start
+        self.seed = seed
+
+    def run(self) -> pd.DataFrame:
+        """Per-fold test metrics, one row per fold"""
+        shared = SharedCandles.from_frame(self.data)
+        try:
+            workers = 1 if self.warm_start else min(self.workers, len(self.folds))
+            with ProcessPoolExecutor(workers, mp_context=mp.get_context('spawn'),
+                                     initializer=_init_worker,
+                                     initargs=(shared.name, shared.num_bars, self.threads_per_worker)) as pool:
+                if self.warm_start:
+                    results, weights = [], None
+                    for index, bounds in enumerate(self.folds):
+                        result, weights = pool.submit(_run_fold, index, bounds, self.episodes,
+                                                      self.overrides, self.seed, weights, True).result()
+                        results.append(result)
+                        print(f"Fold {index}: return {result['total_return']:.4f}")
+                else:
+                    futures = [pool.submit(_run_fold, index, bounds, self.episodes,
+                                           self.overrides, self.seed)
+                               for index, bounds in enumerate(self.folds)]
+                    results = []
+                    for future in futures:
+                        result = future.result()[0]
+                        results.append(result)
+                        print(f"Fold {result['fold']}: return {result['total_return']:.4f}")
+        finally:
+            shared.close()
+            shared.shm.unlink()
+
+        table = pd.DataFrame(results)
+        timestamps = self.data['timestamp']
+        table['test_from'] = timestamps.iloc[table['test_start']].to_numpy()
+        table['test_to'] = timestamps.iloc[table['test_end'] - 1].to_numpy()
+        return table
+
+    @staticmethod
+    def aggregate(table: pd.DataFrame) -> dict:
+        """Cross-fold summary of the per-fold test metrics"""
+        returns = table['total_return'].to_numpy()
+        return {
+            'folds': len(table),
+            'mean_return': float(returns.mean()),
+            'std_return': float(returns.std()),
+            'median_return': float(np.median(returns)),
+            'compounded_return': float(np.prod(1 + returns) - 1),
+            'profitable_folds': float((returns > 0).mean()),
+            'mean_sharpe': float(table['sharpe'].mean()),
+            'worst_drawdown': float(table['max_drawdown'].max()),
+            'mean_excess_return': float((returns - table['buy_and_hold_return']).mean()),
+        }
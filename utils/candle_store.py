@@ -0,0 +1,175 @@
+import bisect
+import os
+import numpy as np
+import pandas as pd
+from config.settings import settings
+
+COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+TIMEFRAME_UNITS = {'m': 60_000, 'h': 3_600_000, 'd': 86_400_000, 'w': 604_800_000}
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """Convert a ccxt timeframe string ('1m', '4h', '1d') to milliseconds"""
+    return int(timeframe[:-1]) * TIMEFRAME_UNITS[timeframe[-1]]
+
+
+def month_start(timestamp: int) -> int:
+    """Epoch ms of the first instant of the month containing ``timestamp`` (ms)"""
+    month = np.datetime64(int(timestamp), 'ms').astype('datetime64[M]')
+    return int(month.astype('datetime64[ms]').astype(np.int64))
+
+
+def to_milliseconds(timestamps) -> np.ndarray:
+    """Epoch milliseconds from integer or datetime-like timestamps"""
+    values = pd.Series(timestamps)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=np.int64)
+    return pd.to_datetime(values).astype('datetime64[ms]').to_numpy().astype(np.int64)
+
+
+class CandleStore:
+    """Local columnar OHLCV store partitioned by symbol, timeframe and month
+
+    Each month is one ``.npy`` file holding a (6, n) float64 array, one row
+    per column, sorted by timestamp. Reads memory-map only the partitions
+    overlapping the requested range and binary-search the timestamp row.
+    Writes go to a temporary file and are renamed into place.
+    """
+
+    def __init__(self, root: str = settings.DATA_DIR):
+        self.root = root
+
+    def _dir(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, symbol.replace('/', '_'), timeframe)
+
+    def partitions(self, symbol: str, timeframe: str) -> list:
+        """Sorted partition months ('YYYY-MM') on disk"""
+        path = self._dir(symbol, timeframe)
+        if not os.path.isdir(path):
+            return []
+        return sorted(f[:-4] for f in os.listdir(path) if f.endswith('.npy') and not f.startswith('.'))
+
+    def _open(self, symbol: str, timeframe: str, month: str) -> np.ndarray:
+        return np.load(os.path.join(self._dir(symbol, timeframe), f"{month}.npy"), mmap_mode='r')
+
+    def last_timestamp(self, symbol: str, timeframe: str):
+        """Newest stored candle time in ms, or None if empty"""
+        months = self.partitions(symbol, timeframe)
+        if not months:
+            return None
+        return int(self._open(symbol, timeframe, months[-1])[0, -1])
+
+    def append(self, symbol: str, timeframe: str, candles) -> int:
+        """Merge candles (ccxt rows or a DataFrame) into their month partitions"""
+        if isinstance(candles, pd.DataFrame):
+            frame = candles[COLUMNS]
+            block = np.vstack([to_milliseconds(frame['timestamp']).astype(np.float64)] +
+                              [frame[c].to_numpy(dtype=np.float64) for c in COLUMNS[1:]])
+        else:
+            block = np.asarray(candles, dtype=np.float64).reshape(-1, len(COLUMNS)).T
+        if block.shape[1] == 0:
+            return 0
+
+        path = self._dir(symbol, timeframe)
+        os.makedirs(path, exist_ok=True)
+        months = block[0].astype(np.int64).astype('datetime64[ms]').astype('datetime64[M]')
+        for month in np.unique(months):
+            name = str(month)
+            part = block[:, months == month]
+            if name in self.partitions(symbol, timeframe):
+                part = np.hstack([np.array(self._open(symbol, timeframe, name)), part])
+            # Sort by time and keep the last copy of duplicate timestamps
+            order = np.argsort(part[0], kind='stable')
+            part = part[:, order]
+            keep = np.append(part[0, 1:] != part[0, :-1], True)
+            tmp = os.path.join(path, f".{name}.tmp.npy")
+            np.save(tmp, np.ascontiguousarray(part[:, keep]))
+            os.replace(tmp, os.path.join(path, f"{name}.npy"))
+        return block.shape[1]
+
+    def load_arrays(self, symbol: str, timeframe: str, start: int = None, end: int = None) -> dict:
+        """Column arrays for ``start <= timestamp < end`` (ms, either bound optional)
+
+        A range inside one partition returns read-only memory-mapped views.
+        """
+        pieces = []
+        first_month = None if start is None else str(np.datetime64(int(start), 'ms').astype('datetime64[M]'))
+        last_month = None if end is None else str(np.datetime64(int(end), 'ms').astype('datetime64[M]'))
+        for month in self.partitions(symbol, timeframe):
+            if (first_month and month < first_month) or (last_month and month > last_month):
+                continue
+            part = self._open(symbol, timeframe, month)
+            lo = 0 if start is None else np.searchsorted(part[0], start, side='left')
+            hi = part.shape[1] if end is None else np.searchsorted(part[0], end, side='left')
+            if hi > lo:
+                pieces.append(part[:, lo:hi])
+
+        if not pieces:
+            block = np.empty((len(COLUMNS), 0))
+        else:
+            block = pieces[0] if len(pieces) == 1 else np.hstack(pieces)
+        arrays = {c: block[i] for i, c in enumerate(COLUMNS)}
+        arrays['timestamp'] = arrays['timestamp'].astype(np.int64)
+        return arrays
+
+    def tail(self, symbol: str, timeframe: str, count: int, end: int = None) -> np.ndarray:
+        """The last ``count`` candles before ``end`` (ms) as (n, 6) ccxt-style rows"""
+        pieces, total = [], 0
+        for month in reversed(self.partitions(symbol, timeframe)):
+            if total >= count:
+                break
+            part = self._open(symbol, timeframe, month)
+            hi = part.shape[1] if end is None else np.searchsorted(part[0], end, side='left')
+            lo = max(0, hi - (count - total))
+            if hi > lo:
+                pieces.append(part[:, lo:hi])
+                total += hi - lo
+        if not pieces:
+            return np.empty((0, len(COLUMNS)))
+        return np.hstack(pieces[::-1]).T.copy()
+
+    def load(self, symbol: str, timeframe: str, start: int = None, end: int = None) -> pd.DataFrame:
+        """Candles in ``[start, end)`` as a DataFrame shaped like fetch_historical_data"""
+        return pd.DataFrame(self.load_arrays(symbol, timeframe, start, end), columns=COLUMNS)
+
+    def update(self, exchange, symbol: str, timeframe: str, since: int = None,
+               limit: int = 1000) -> int:
+        """Fetch only the missing tail from ``exchange`` page by page
+
+        The newest stored bar is fetched again: it may have been stored
+        while still forming, and ``append`` keeps the refetched copy.
+        Pages are buffered until they move past a month, so each partition
+        is written once per update rather than once per page.
+        """
+        last = self.last_timestamp(symbol, timeframe)
+        if last is not None:
+            since = last
+        added, pending = 0, []
+        for page in fetch_ohlcv_pages(exchange, symbol, timeframe, since, limit):
+            pending.extend(page)
+            month = month_start(page[-1][0])
+            if pending[0][0] < month:
+                split = bisect.bisect_left([row[0] for row in pending], month)
+                added += self.append(symbol, timeframe, pending[:split])
+                pending = pending[split:]
+        if pending:
+            added += self.append(symbol, timeframe, pending)
+        return added
+
+    def has(self, symbol: str, timeframe: str) -> bool:
+        return bool(self.partitions(symbol, timeframe))
+
+
+def fetch_ohlcv_pages(exchange, symbol: str, timeframe: str, since: int = None, limit: int = 1000):
+    """Yield successive ``fetch_ohlcv`` pages until the exchange runs out"""
+    step = timeframe_to_ms(timeframe)
+    while True:
+        page = exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+        if since is not None:
+            page = [row for row in page if row[0] >= since]
+        if not page:
+            return
+        yield page
+        if len(page) < limit:
+            return
+        since = page[-1][0] + step
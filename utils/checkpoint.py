@@ -0,0 +1,161 @@
+import json
+import os
+import shutil
+import threading
+import numpy as np
+from utils.instrumentation import instruments
+from config.settings import settings
+
+_PREFIX = 'ckpt-'
+
+
+def _save_arrays(path: str, arrays: list):
+    np.savez(path, *arrays)
+
+
+def _load_arrays(path: str) -> list:
+    with np.load(path) as data:
+        return [data[f'arr_{i}'] for i in range(len(data.files))]
+
+
+class Checkpointer:
+    """Full training-state checkpoints written in the background
+
+    ``save`` copies the model, target model and optimizer variables,
+    epsilon, the episode counter and the replay buffer contents on the
+    calling thread, then hands the copies to a writer thread so training
+    continues while they reach disk. Each checkpoint is written to a
+    temporary directory and renamed into place, so a crash never leaves a
+    partial ``ckpt-<episode>``; only the newest ``keep`` are retained.
+    ``restore`` memory-maps the replay arrays (copy-on-write) instead of
+    deserializing them.
+    """
+
+    def __init__(self, directory: str = settings.CHECKPOINT_DIR, keep: int = settings.CHECKPOINT_KEEP):
+        self.directory = directory
+        self.keep = max(1, keep)
+        self._thread = None
+        self._error = None
+        os.makedirs(directory, exist_ok=True)
+
+    # Saving ---------------------------------------------------------------
+
+    def snapshot(self, agent, episode: int, extra: dict = None) -> dict:
+        """Copy the agent's full training state"""
+        with instruments.timer('checkpoint.snapshot'):
+            optimizer = agent.model.optimizer
+            buffer_arrays, buffer_meta = agent.memory.get_state()
+            return {
+                'model': agent.model.get_weights(),
+                'target': agent.target_model.get_weights(),
+                'optimizer': [v.numpy() for v in optimizer.variables],
+                'buffer': buffer_arrays,
+                'meta': {'episode': episode, 'epsilon': float(agent.epsilon),
+                         'buffer': buffer_meta, 'extra': extra or {}}
+            }
+
+    def save(self, agent, episode: int, extra: dict = None):
+        """Snapshot now and write in the background (waits for the previous write)"""
+        state = self.snapshot(agent, episode, extra)
+        self.wait()
+        self._thread = threading.Thread(target=self._write_safely, args=(state,),
+                                        name='checkpoint-writer', daemon=True)
+        self._thread.start()
+
+    def _write_safely(self, state: dict):
+        try:
+            self._write(state)
+        except Exception as e:
+            self._error = e
+
+    def _write(self, state: dict):
+        name = f"{_PREFIX}{state['meta']['episode']:08d}"
+        final = os.path.join(self.directory, name)
+        tmp = os.path.join(self.directory, f".{name}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(os.path.join(tmp, 'buffer'))
+
+        _save_arrays(os.path.join(tmp, 'model.npz'), state['model'])
+        _save_arrays(os.path.join(tmp, 'target.npz'), state['target'])
+        _save_arrays(os.path.join(tmp, 'optimizer.npz'), state['optimizer'])
+        # One raw .npy per array so restore can memory-map it
+        for key, array in state['buffer'].items():
+            np.save(os.path.join(tmp, 'buffer', f"{key}.npy"), array)
+        with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+            json.dump(state['meta'], f)
+
+        if os.path.exists(final):
+            shutil.rmtree(final)
+        os.replace(tmp, final)
+        self._prune()
+
+    def _prune(self):
+        for path in self.checkpoints()[:-self.keep]:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def wait(self):
+        """Block until the pending write finishes; re-raise its error"""
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def close(self):
+        self.wait()
+
+    # Restoring ------------------------------------------------------------
+
+    def checkpoints(self) -> list:
+        """Complete checkpoint directories, oldest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        names = sorted(n for n in os.listdir(self.directory) if n.startswith(_PREFIX))
+        return [os.path.join(self.directory, n) for n in names]
+
+    def latest(self):
+        paths = self.checkpoints()
+        return paths[-1] if paths else None
+
+    @staticmethod
+    def load_weights(model, path: str):
+        """Load model weights from a checkpoint directory or a Keras weights file"""
+        if os.path.isdir(path):
+            model.set_weights(_load_arrays(os.path.join(path, 'model.npz')))
+        else:
+            model.load_weights(path)
+
+    def restore(self, agent, path: str = None):
+        """Load a checkpoint (default: the latest) into ``agent``
+
+        Returns the checkpoint metadata (``episode``, ``epsilon``, ``extra``),
+        or None when there is nothing to restore.
+        """
+        self.wait()
+        path = path or self.latest()
+        if path is None:
+            return None
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+
+        agent.model.set_weights(_load_arrays(os.path.join(path, 'model.npz')))
+        agent.target_model.set_weights(_load_arrays(os.path.join(path, 'target.npz')))
+
+        values = _load_arrays(os.path.join(path, 'optimizer.npz'))
+        optimizer = agent.model.optimizer
+        if len(optimizer.variables) != len(values):
+            # Slots are created lazily on the first update
+            optimizer.build(agent.model.trainable_variables)
+        if len(optimizer.variables) != len(values):
+            raise ValueError(f"Checkpoint has {len(values)} optimizer variables, "
+                             f"optimizer has {len(optimizer.variables)}")
+        for variable, value in zip(optimizer.variables, values):
+            variable.assign(value)
+
+        buffer_dir = os.path.join(path, 'buffer')
+        arrays = {name[:-4]: np.load(os.path.join(buffer_dir, name), mmap_mode='c')
+                  for name in os.listdir(buffer_dir) if name.endswith('.npy')}
+        agent.memory.set_state(arrays, meta['buffer'])
+        agent.epsilon = meta['epsilon']
+        return meta
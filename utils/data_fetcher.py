@@ -1,12 +1,40 @@
 import ccxt
 import pandas as pd
 from config.settings import settings
+from utils.candle_store import CandleStore, COLUMNS
 
-def fetch_historical_data(symbol: str, timeframe: str, limit: int = 1000) -> pd.DataFrame:
+_exchange = None
+
+def get_exchange():
+    """Shared public Binance client (markets and rate limiter are reused)"""
+    global _exchange
+    if _exchange is None:
+        _exchange = ccxt.binance({'enableRateLimit': True})
+    return _exchange
+
+def fetch_historical_data(symbol: str, timeframe: str, limit: int = 1000, since: int = None,
+                          exchange=None) -> pd.DataFrame:
     """Fetch OHLCV data from exchange"""
-    exchange = ccxt.binance()
-    data = exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
-    return pd.DataFrame(data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    exchange = exchange or get_exchange()
+    data = exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+    return pd.DataFrame(data, columns=COLUMNS)
+
+def load_candles(symbol: str, timeframe: str, start: int = None, end: int = None,
+                 exchange=None, update: bool = True) -> pd.DataFrame:
+    """Load candles from the local store, fetching only the missing tail first"""
+    store = CandleStore(settings.DATA_DIR)
+    if update:
+        store.update(exchange or get_exchange(), symbol, timeframe)
+    return store.load(symbol, timeframe, start, end)
+
+def load_backtest_data(csv_path: str = 'historical_data.csv') -> pd.DataFrame:
+    """Stored candles for SYMBOL/TIMEFRAME, importing the CSV on first use"""
+    store = CandleStore(settings.DATA_DIR)
+    if not store.has(settings.SYMBOL, settings.TIMEFRAME):
+        store.append(settings.SYMBOL, settings.TIMEFRAME, pd.read_csv(csv_path))
+    data = store.load(settings.SYMBOL, settings.TIMEFRAME)
+    data['timestamp'] = pd.to_datetime(data['timestamp'], unit='ms')
+    return data
 
 def save_data(data: pd.DataFrame, filename: str):
     """Save historical data to parquet"""
@@ -14,4 +42,4 @@ def save_data(data: pd.DataFrame, filename: str):
 
 def load_data(filename: str) -> pd.DataFrame:
     """Load historical data from parquet"""
-    return pd.read_parquet(f"data/historical/{filename}")
\ No newline at end of file
+    return pd.read_parquet(f"data/historical/{filename}")
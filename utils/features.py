@@ -0,0 +1,262 @@
+import math
+import threading
+import numpy as np
+import pandas as pd
+from config.settings import settings
+
+# Feature names are '<kind>_<window>' or 'zscore_<column>_<window>':
+#   ema_N              close / EMA(close, N) - 1
+#   rsi_N              Wilder RSI / 100
+#   atr_N              Wilder ATR / close
+#   vol_N              rolling std of simple close-to-close returns
+#   zscore_<col>_N     rolling z-score of close or volume
+#
+# Both paths below use only IEEE-exact operations (+ - * / sqrt abs max) in
+# the same order, so the vectorized history and the incremental live values
+# are bit-identical:
+#   * Rolling sums are differences of a running (cumulative) sum.
+#   * EMAs are evaluated in blocks of B bars from an anchor A (the EMA just
+#     before the block): y[k] = r**(k+1) * (A + sum_{j<=k} a * r**-(j+1) * x[j]),
+#     with r = 1 - a. Within a block the sum is a cumsum; the block's last
+#     value becomes the next anchor. B keeps r**-B below 1e8.
+
+def parse_feature(name: str) -> tuple:
+    """('ema', 'close', 12) style tuple for a feature name"""
+    parts = name.split('_')
+    if parts[0] == 'zscore':
+        if len(parts) != 3 or parts[1] not in ('close', 'volume'):
+            raise ValueError(f"Unknown feature: {name}")
+        return 'zscore', parts[1], int(parts[2])
+    if len(parts) != 2 or parts[0] not in ('ema', 'rsi', 'atr', 'vol'):
+        raise ValueError(f"Unknown feature: {name}")
+    return parts[0], 'close', int(parts[1])
+
+
+class _EMACoefficients:
+    """Shared per-alpha block coefficients for both EMA paths"""
+
+    def __init__(self, alpha: float):
+        r = 1.0 - alpha
+        self.block = max(1, int(math.log(1e8) / -math.log(r))) if r > 0 else 1
+        k = np.arange(self.block, dtype=np.float64)
+        self.weights = alpha * r ** -(k + 1)      # a * r**-(j+1)
+        self.decay = r ** (k + 1)                 # r**(k+1)
+        self.weight_list = self.weights.tolist()
+        self.decay_list = self.decay.tolist()
+
+
+def ema(values: np.ndarray, alpha: float) -> np.ndarray:
+    """Vectorized blocked EMA seeded with the first value"""
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n == 0:
+        return values.copy()
+    coef = _EMACoefficients(alpha)
+    blocks = -(-n // coef.block)
+    padded = np.zeros(blocks * coef.block)
+    padded[:n] = values
+    sums = np.cumsum(padded.reshape(blocks, coef.block) * coef.weights, axis=1)
+
+    # Anchors are sequential across blocks only (n / B scalar steps)
+    anchors = np.empty(blocks)
+    anchor = float(values[0])
+    last_decay = coef.decay_list[-1]
+    for b in range(blocks):
+        anchors[b] = anchor
+        anchor = last_decay * (anchor + float(sums[b, -1]))
+    return (coef.decay * (anchors[:, np.newaxis] + sums)).ravel()[:n]
+
+
+class IncrementalEMA:
+    """O(1) EMA with the same block arithmetic as ``ema``"""
+
+    def __init__(self, alpha: float):
+        self.coef = _EMACoefficients(alpha)
+        self.anchor = None
+        self.total = 0.0
+        self.k = 0
+
+    def update(self, x: float) -> float:
+        coef = self.coef
+        if self.anchor is None:
+            self.anchor = x
+        self.total = self.total + coef.weight_list[self.k] * x
+        value = coef.decay_list[self.k] * (self.anchor + self.total)
+        self.k += 1
+        if self.k == coef.block:
+            self.anchor, self.total, self.k = value, 0.0, 0
+        return value
+
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing window sums as differences of the running sum"""
+    running = np.cumsum(values)
+    sums = running.copy()
+    sums[window:] = running[window:] - running[:-window]
+    return sums
+
+
+class IncrementalRollingSum:
+    """O(1) trailing window sum identical to ``rolling_sum``"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.history = [0.0] * window     # Running sums of the last window bars
+        self.running = 0.0
+        self.t = 0
+
+    def update(self, x: float) -> float:
+        self.running = self.running + x
+        slot = self.t % self.window
+        value = self.running - self.history[slot] if self.t >= self.window else self.running
+        self.history[slot] = self.running
+        self.t += 1
+        return value
+
+
+def _rolling_zscore(values: np.ndarray, window: int) -> np.ndarray:
+    counts = np.minimum(np.arange(1, len(values) + 1), window).astype(np.float64)
+    s1 = rolling_sum(values, window)
+    s2 = rolling_sum(values * values, window)
+    mean = s1 / counts
+    var = np.maximum((s2 - s1 * s1 / counts) / np.maximum(counts - 1, 1), 0.0)
+    std = np.sqrt(var)
+    return np.where(std > 0, (values - mean) / np.where(std > 0, std, 1.0), 0.0)
+
+
+def _zscore_value(x: float, s1: float, s2: float, count: float) -> float:
+    mean = s1 / count
+    var = max((s2 - s1 * s1 / count) / max(count - 1, 1), 0.0)
+    std = math.sqrt(var)
+    return (x - mean) / std if std > 0 else 0.0
+
+
+def _returns(close: np.ndarray) -> np.ndarray:
+    returns = np.zeros(len(close))
+    returns[1:] = close[1:] / close[:-1] - 1
+    return returns
+
+
+def compute_features(data: pd.DataFrame, names) -> np.ndarray:
+    """(len(data), len(names)) feature matrix over the full history"""
+    close = data['close'].to_numpy(dtype=np.float64)
+    high = data['high'].to_numpy(dtype=np.float64)
+    low = data['low'].to_numpy(dtype=np.float64)
+    columns = {'close': close, 'volume': data['volume'].to_numpy(dtype=np.float64)}
+    out = np.empty((len(close), len(names)))
+
+    for i, name in enumerate(names):
+        kind, column, window = parse_feature(name)
+        if kind == 'ema':
+            out[:, i] = close / ema(close, 2.0 / (window + 1)) - 1
+        elif kind == 'rsi':
+            change = np.zeros(len(close))
+            change[1:] = close[1:] - close[:-1]
+            gain = ema(np.maximum(change, 0.0), 1.0 / window)
+            loss = ema(np.maximum(-change, 0.0), 1.0 / window)
+            total = gain + loss
+            out[:, i] = np.where(total > 0, gain / np.where(total > 0, total, 1.0), 0.5)
+        elif kind == 'atr':
+            prev_close = np.concatenate(([close[0]], close[:-1])) if len(close) else close
+            true_range = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+            out[:, i] = ema(true_range, 1.0 / window) / close
+        elif kind == 'vol':
+            returns = _returns(close)
+            counts = np.minimum(np.arange(1, len(close) + 1), window).astype(np.float64)
+            s1 = rolling_sum(returns, window)
+            s2 = rolling_sum(returns * returns, window)
+            var = np.maximum((s2 - s1 * s1 / counts) / np.maximum(counts - 1, 1), 0.0)
+            out[:, i] = np.sqrt(var)
+        else:
+            out[:, i] = _rolling_zscore(columns[column], window)
+    return out
+
+
+class IncrementalFeatures:
+    """O(1)-per-bar version of ``compute_features`` for live trading"""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.specs = [parse_feature(name) for name in self.names]
+        self.prev_close = None
+        self.t = 0
+        self.values = np.zeros(len(self.names))
+        self.state = []
+        for kind, _, window in self.specs:
+            if kind == 'ema':
+                self.state.append(IncrementalEMA(2.0 / (window + 1)))
+            elif kind == 'rsi':
+                self.state.append((IncrementalEMA(1.0 / window), IncrementalEMA(1.0 / window)))
+            elif kind == 'atr':
+                self.state.append(IncrementalEMA(1.0 / window))
+            else:
+                self.state.append((IncrementalRollingSum(window), IncrementalRollingSum(window)))
+
+    def update(self, open_: float, high: float, low: float, close: float, volume: float) -> np.ndarray:
+        """Add one closed bar and return the feature vector for it"""
+        prev_close = close if self.prev_close is None else self.prev_close
+        self.t += 1
+        for i, ((kind, column, window), state) in enumerate(zip(self.specs, self.state)):
+            if kind == 'ema':
+                value = close / state.update(close) - 1
+            elif kind == 'rsi':
+                change = close - prev_close if self.t > 1 else 0.0
+                gain = state[0].update(max(change, 0.0))
+                loss = state[1].update(max(-change, 0.0))
+                total = gain + loss
+                value = gain / total if total > 0 else 0.5
+            elif kind == 'atr':
+                true_range = max(high - low, max(abs(high - prev_close), abs(low - prev_close)))
+                value = state.update(true_range) / close
+            else:
+                count = float(min(self.t, window))
+                if kind == 'vol':
+                    x = close / prev_close - 1 if self.t > 1 else 0.0
+                    s1, s2 = state[0].update(x), state[1].update(x * x)
+                    value = math.sqrt(max((s2 - s1 * s1 / count) / max(count - 1, 1), 0.0))
+                else:
+                    x = close if column == 'close' else volume
+                    s1, s2 = state[0].update(x), state[1].update(x * x)
+                    value = _zscore_value(x, s1, s2, count)
+            self.values[i] = value
+        self.prev_close = close
+        return self.values
+
+
+class ClosedCandleFeatures:
+    """Indicator values kept current from a ``MarketDataCache``
+
+    The engine advances once per closed bar (on the feed thread), so live
+    values follow the same bar sequence as ``compute_features`` on history.
+    ``warm_up`` replays stored closed bars first so indicators do not start
+    cold; closes at or before the last replayed bar are ignored.
+    """
+
+    def __init__(self, cache, names=None):
+        self.engine = IncrementalFeatures(settings.FEATURES if names is None else names)
+        self.values = self.engine.values.copy()
+        self.last_close = None
+        self.last_timestamp = None
+        self._lock = threading.Lock()
+        cache.add_close_listener(self.on_close)
+
+    def warm_up(self, candles) -> int:
+        """Replay closed ccxt-style rows (oldest first); returns the bars used"""
+        used = 0
+        with self._lock:
+            for candle in candles:
+                used += self._advance(candle)
+        return used
+
+    def on_close(self, candle):
+        with self._lock:
+            self._advance(candle)
+
+    def _advance(self, candle) -> bool:
+        if self.last_timestamp is not None and candle[0] <= self.last_timestamp:
+            return False
+        values = self.engine.update(*candle[1:6])
+        self.values = values.copy()     # Swap so readers never see a partial update
+        self.last_close = candle[4]
+        self.last_timestamp = candle[0]
+        return True
@@ -0,0 +1,254 @@
+import contextlib
+import functools
+import inspect
+import math
+import time
+from config.settings import settings
+
+# Log-spaced latency buckets: 8 per power of two from 2**-24 s (~60 ns)
+_BUCKETS_PER_OCTAVE = 8
+_MIN_EXP = -24
+_NUM_BUCKETS = 40 * _BUCKETS_PER_OCTAVE
+
+# (owner class, attribute, original function, stage name) for every @timed method
+_REGISTRY = []
+
+
+class timed:
+    """Register a method as an instrumented stage
+
+    The class keeps the undecorated function, so a disabled run pays
+    nothing; ``Instrumentation.enable`` swaps timing wrappers in and
+    ``disable`` puts the originals back.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.fn = None
+
+    def __call__(self, fn):
+        self.fn = fn
+        return self
+
+    def __set_name__(self, owner, attr):
+        setattr(owner, attr, self.fn)
+        _REGISTRY.append((owner, attr, self.fn, self.name))
+
+
+class StageStats:
+    """Call count, total time and a log-bucket latency histogram"""
+
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * _NUM_BUCKETS
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        index = int((math.log2(seconds) - _MIN_EXP) * _BUCKETS_PER_OCTAVE) if seconds > 0 else 0
+        self.buckets[min(max(index, 0), _NUM_BUCKETS - 1)] += 1
+
+    def percentile(self, q: float) -> float:
+        """Upper edge of the bucket holding the q-th percentile (seconds)"""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                return min(2 ** (_MIN_EXP + (index + 1) / _BUCKETS_PER_OCTAVE), self.max)
+        return self.max
+
+
+class Instrumentation:
+    """Named stage timers and counters with periodic p50/p99 breakdowns
+
+    Disabled by default. Once enabled, every ``@timed`` method and every
+    ``timer(name)`` block records into a per-stage histogram and a report
+    is emitted every ``report_interval`` seconds. Stages nest (e.g.
+    ``agent.train`` includes ``replay.sample``), so shares can sum past 100%.
+    Updates are not locked; concurrent threads may occasionally drop a count.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.stages = {}
+        self.counters = {}
+        self.report_interval = settings.INSTRUMENTATION_REPORT_INTERVAL
+        self.sink = print
+        self._window_start = time.perf_counter()
+        self._next_report = math.inf
+        self._profile = None
+
+    # Switching ------------------------------------------------------------
+
+    def enable(self, report_interval: float = None, sink=None):
+        if report_interval is not None:
+            self.report_interval = report_interval
+        if sink is not None:
+            self.sink = sink
+        if not self.enabled:
+            for owner, attr, fn, name in _REGISTRY:
+                setattr(owner, attr, self._wrap(name, fn))
+            self.enabled = True
+        self.reset()
+        return self
+
+    def disable(self):
+        if self.enabled:
+            for owner, attr, fn, _ in _REGISTRY:
+                setattr(owner, attr, fn)
+            self.enabled = False
+        self._next_report = math.inf
+
+    def enable_from_settings(self, stage: str = 'env.step'):
+        """Apply ``settings.INSTRUMENTATION`` and ``settings.PROFILE_*``
+
+        ``stage`` is the per-step stage that counts profiled steps.
+        """
+        if settings.INSTRUMENTATION or settings.PROFILE_STEPS:
+            self.enable(settings.INSTRUMENTATION_REPORT_INTERVAL)
+        if settings.PROFILE_STEPS:
+            self.profile(settings.PROFILE_STEPS, settings.PROFILE_MODE, stage)
+        return self
+
+    # Recording ------------------------------------------------------------
+
+    def _stage(self, name: str) -> StageStats:
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = StageStats()
+        return stage
+
+    def _record(self, name: str, seconds: float, now: float):
+        self._stage(name).record(seconds)
+        if self._profile is not None and name == self._profile['stage']:
+            self._profile['remaining'] -= 1
+            if self._profile['remaining'] <= 0:
+                self._stop_profile()
+        if now >= self._next_report:
+            self.report()
+
+    def _wrap(self, name: str, fn):
+        perf = time.perf_counter
+        record = self._record
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                start = perf()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    end = perf()
+                    record(name, end - start, end)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = perf()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                end = perf()
+                record(name, end - start, end)
+        return wrapper
+
+    @contextlib.contextmanager
+    def _timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._record(name, end - start, end)
+
+    def timer(self, name: str):
+        """Context manager timing a block (a no-op when disabled)"""
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._timer(name)
+
+    def count(self, name: str, n: int = 1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    # Reporting ------------------------------------------------------------
+
+    def reset(self):
+        self.stages = {}
+        self.counters = {}
+        self._window_start = time.perf_counter()
+        self._next_report = self._window_start + self.report_interval if self.enabled else math.inf
+
+    def snapshot(self) -> dict:
+        """Per-stage calls, total/mean/p50/p99/max seconds and share of wall time"""
+        wall = max(time.perf_counter() - self._window_start, 1e-12)
+        return {
+            name: {
+                'calls': s.count, 'total': s.total, 'share': s.total / wall,
+                'mean': s.total / s.count if s.count else 0.0,
+                'p50': s.percentile(50), 'p99': s.percentile(99), 'max': s.max
+            }
+            for name, s in self.stages.items()
+        }
+
+    def report(self, reset: bool = True) -> dict:
+        """Emit the breakdown for the current window and start a new one"""
+        stats = self.snapshot()
+        wall = time.perf_counter() - self._window_start
+        lines = [f"Stage breakdown over {wall:.1f}s",
+                 f"{'stage':<28}{'calls':>10}{'total s':>10}{'share':>8}"
+                 f"{'mean us':>11}{'p50 us':>11}{'p99 us':>11}"]
+        for name, s in sorted(stats.items(), key=lambda item: -item[1]['total']):
+            lines.append(f"{name:<28}{s['calls']:>10}{s['total']:>10.2f}{s['share']:>8.1%}"
+                         f"{s['mean'] * 1e6:>11.1f}{s['p50'] * 1e6:>11.1f}{s['p99'] * 1e6:>11.1f}")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name:<28}{value:>10}")
+        self.sink('\n'.join(lines))
+        if reset:
+            self.reset()
+        return stats
+
+    # Profiling ------------------------------------------------------------
+
+    def profile(self, steps: int, mode: str = 'cprofile', stage: str = 'env.step',
+                path: str = None):
+        """Capture a cProfile ('cprofile') or TF profiler ('tf') trace for the
+        next ``steps`` calls of ``stage``; instrumentation is enabled if needed"""
+        if not self.enabled:
+            self.enable()
+        if mode == 'cprofile':
+            import cProfile
+            profiler = cProfile.Profile()
+            path = path or 'logs/profile.prof'
+            profiler.enable()
+        elif mode == 'tf':
+            import tensorflow as tf
+            profiler = None
+            path = path or 'logs/tf_profile'
+            tf.profiler.experimental.start(path)
+        else:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self._profile = {'mode': mode, 'stage': stage, 'remaining': steps,
+                         'path': path, 'profiler': profiler}
+
+    def _stop_profile(self):
+        profile, self._profile = self._profile, None
+        if profile['mode'] == 'cprofile':
+            profile['profiler'].disable()
+            profile['profiler'].dump_stats(profile['path'])
+        else:
+            import tensorflow as tf
+            tf.profiler.experimental.stop()
+        self.sink(f"Saved {profile['mode']} trace to {profile['path']}")
+
+
+instruments = Instrumentation()
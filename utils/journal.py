@@ -0,0 +1,124 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from config.settings import settings
+from utils.metrics_log import MetricsLog
+
+ORDER_DTYPE = np.dtype([
+    ('timestamp', np.int64),        # Journal time, epoch ms
+    ('order_id', np.int64),         # Numeric exchange id (-1 if not numeric)
+    ('side', np.int8),
+    ('status', np.int8),
+    ('price', np.float64),
+    ('amount', np.float64),
+    ('filled', np.float64),
+    ('cost', np.float64),
+    ('fee', np.float64)
+])
+
+BALANCE_DTYPE = np.dtype([
+    ('timestamp', np.int64),
+    ('quote', np.float64),
+    ('base', np.float64),
+    ('price', np.float64),
+    ('total_value', np.float64)
+])
+
+PERFORMANCE_DTYPE = np.dtype([
+    ('timestamp', np.int64),
+    ('portfolio_value', np.float64),
+    ('position', np.float64),
+    ('drawdown', np.float64),
+    ('sharpe', np.float64),
+    ('reward', np.float64)
+])
+
+DTYPES = {'orders': ORDER_DTYPE, 'balances': BALANCE_DTYPE, 'performance': PERFORMANCE_DTYPE}
+SIDES = ['buy', 'sell']
+STATUSES = ['open', 'closed', 'canceled', 'expired', 'rejected']
+
+
+def _code(values: list, value) -> int:
+    return values.index(value) if value in values else -1
+
+
+def _number(value) -> float:
+    return np.nan if value is None else float(value)
+
+
+class TradeJournal:
+    """Append-only binary journal of orders, balances and performance
+
+    One ``MetricsLog`` file per kind under ``directory`` (opened on first
+    use, appended across runs). Records are buffered and flushed at most
+    every ``flush_interval`` seconds. ``read``/``frame`` load a kind back
+    memory-mapped for replay and queries.
+    """
+
+    def __init__(self, directory: str = settings.JOURNAL_DIR, chunk_size: int = 1024,
+                 flush_interval: float = 1.0):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.flush_interval = flush_interval
+        self.logs = {}
+        self._last_flush = time.monotonic()
+
+    def _log(self, kind: str) -> MetricsLog:
+        log = self.logs.get(kind)
+        if log is None:
+            path = os.path.join(self.directory, f"{kind}.bin")
+            log = self.logs[kind] = MetricsLog(path, DTYPES[kind], self.chunk_size, append=True)
+        return log
+
+    def record(self, kind: str, payload, timestamp_ms: int):
+        """Convert a ``TradingLogger`` payload and append it"""
+        if kind == 'orders':
+            order = payload
+            fee = order.get('fee') or {}
+            order_id = str(order.get('id', ''))
+            values = (timestamp_ms, int(order_id) if order_id.isdigit() else -1,
+                      _code(SIDES, order.get('side')), _code(STATUSES, order.get('status')),
+                      _number(order.get('price')), _number(order.get('amount')),
+                      _number(order.get('filled')), _number(order.get('cost')),
+                      _number(fee.get('cost')))
+        elif kind == 'balances':
+            quote, base, price = payload
+            values = (timestamp_ms, quote, base, price, quote + base * price)
+        else:
+            metrics = payload
+            values = (timestamp_ms,) + tuple(_number(metrics.get(name))
+                                             for name in PERFORMANCE_DTYPE.names[1:])
+        self._log(kind).append(*values)
+
+        now = time.monotonic()
+        if now - self._last_flush >= self.flush_interval:
+            self.flush()
+            self._last_flush = now
+
+    def flush(self):
+        for log in self.logs.values():
+            log.flush()
+
+    def close(self):
+        for log in self.logs.values():
+            log.close()
+        self.logs = {}
+
+    @staticmethod
+    def read(kind: str, directory: str = settings.JOURNAL_DIR) -> np.ndarray:
+        """Memory-mapped records of one kind"""
+        path = os.path.join(directory, f"{kind}.bin")
+        if not os.path.exists(path):
+            return np.empty(0, dtype=DTYPES[kind])
+        return MetricsLog.read(path)
+
+    @staticmethod
+    def frame(kind: str, directory: str = settings.JOURNAL_DIR) -> pd.DataFrame:
+        """Records of one kind as a DataFrame with decoded times, sides and statuses"""
+        frame = pd.DataFrame(TradeJournal.read(kind, directory))
+        frame['timestamp'] = pd.to_datetime(frame['timestamp'], unit='ms')
+        if kind == 'orders':
+            frame['side'] = pd.Categorical.from_codes(frame['side'], SIDES)
+            frame['status'] = pd.Categorical.from_codes(frame['status'], STATUSES)
+        return frame
@@ -1,42 +1,148 @@
+import atexit
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from config.settings import settings
+from utils.journal import TradeJournal
 
-class TradingLogger:
-    """Unified logging system"""
-    
-    def __init__(self, log_file=settings.LOG_PATH):
-        self.logger = logging.getLogger(__name__)
-        self.logger.setLevel(logging.DEBUG)
-        
-        # File handler
-        fh = logging.FileHandler(log_file)
-        fh.setLevel(logging.INFO)
-        
-        # Console handler
+class _DeferredQueueHandler(QueueHandler):
+    """Enqueue records unformatted; the listener thread does the formatting"""
+
+    def prepare(self, record):
+        return record
+
+
+class JournalHandler(logging.Handler):
+    """Writes records carrying a ``journal`` payload to a ``TradeJournal``"""
+
+    def __init__(self, journal: TradeJournal):
+        super().__init__()
+        self.journal = journal
+
+    def emit(self, record):
+        entry = getattr(record, 'journal', None)
+        if entry is not None:
+            try:
+                self.journal.record(entry[0], entry[1], int(record.created * 1000))
+            except Exception:
+                self.handleError(record)
+
+    def flush(self):
+        self.journal.flush()
+
+    def close(self):
+        self.journal.close()
+        super().close()
+
+
+# Process-wide handler state: handlers are attached once per log path, not per logger instance
+_log_files = set()
+_shared_handlers = []   # Console and journal, attached to every path's logger
+_listeners = []
+_journal = None
+
+
+def _path_logger(log_file: str) -> logging.Logger:
+    """The logger writing to ``log_file``; records do not propagate to other paths"""
+    return logging.getLogger(f"{__name__}.{log_file}")
+
+
+def _attach(logger: logging.Logger, handlers: list):
+    """Route handlers through a background listener (or directly when synchronous)"""
+    if not settings.ASYNC_LOGGING:
+        for handler in handlers:
+            logger.addHandler(handler)
+        return
+    records = queue.SimpleQueue()
+    logger.addHandler(_DeferredQueueHandler(records))
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    if not _listeners:
+        atexit.register(shutdown_logging)
+    _listeners.append((logger, listener))
+
+
+def _configure(log_file: str):
+    global _journal
+    if log_file in _log_files:
+        return
+    logger = _path_logger(log_file)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+
+    if not _log_files:
+        # Console handler and trade journal (once per process)
         ch = logging.StreamHandler()
         ch.setLevel(logging.DEBUG)
-        
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        fh.setFormatter(formatter)
         ch.setFormatter(formatter)
-        
-        self.logger.addHandler(fh)
-        self.logger.addHandler(ch)
-    
+        _shared_handlers.append(ch)
+        if settings.TRADE_JOURNAL:
+            _journal = TradeJournal(settings.JOURNAL_DIR)
+            _shared_handlers.append(JournalHandler(_journal))
+
+    # File handler (one per distinct path)
+    fh = logging.FileHandler(log_file)
+    fh.setLevel(logging.INFO)
+    fh.setFormatter(formatter)
+
+    _attach(logger, [fh] + _shared_handlers)
+    _log_files.add(log_file)
+
+
+def _flush(handler: logging.Handler):
+    try:
+        handler.flush()
+    except ValueError:
+        pass   # Stream already closed (e.g. a redirected stderr at exit)
+
+
+def shutdown_logging():
+    """Drain the queues and flush the file handlers and journal
+
+    Later records are written synchronously by the same handlers.
+    """
+    while _listeners:
+        logger, listener = _listeners.pop()
+        listener.stop()
+        for handler in list(logger.handlers):
+            if isinstance(handler, _DeferredQueueHandler):
+                logger.removeHandler(handler)
+        for handler in listener.handlers:
+            _flush(handler)
+            logger.addHandler(handler)
+    if _journal is not None:
+        _journal.flush()
+
+
+class TradingLogger:
+    """Unified logging system
+
+    Handlers are attached once per log path, each path to its own logger,
+    so a file only receives its own instances' records; the console and
+    the journal see every record once. With ``settings.ASYNC_LOGGING``,
+    records are queued unformatted and written by a background thread, so
+    callers never wait on disk. Orders, balances and performance updates
+    are also appended to the binary trade journal.
+    """
+
+    def __init__(self, log_file=settings.LOG_PATH):
+        _configure(log_file)
+        self.logger = _path_logger(log_file)
+
     def log_order(self, order):
-        self.logger.info(f"Order executed: {order}")
-    
+        self.logger.info("Order executed: %s", order, extra={'journal': ('orders', order)})
+
     def log_error(self, message):
-        self.logger.error(f"Error: {message}")
-    
+        self.logger.error("Error: %s", message)
+
     def log_performance(self, metrics):
-        self.logger.info(f"Performance Update: {metrics}")
+        self.logger.info("Performance Update: %s", metrics, extra={'journal': ('performance', metrics)})
 
     def log_balance(self, usdt_balance: float, asset_balance: float, price: float):
-        total_value = usdt_balance + (asset_balance * price)
         self.logger.info(
-            f"Balance | USDT: {usdt_balance:.2f} | "
-            f"{settings.SYMBOL.split('/')[0]}: {asset_balance:.4f} | "
-            f"Total: {total_value:.2f} USDT"
+            "Balance | USDT: %.2f | %s: %.4f | Total: %.2f USDT",
+            usdt_balance, settings.SYMBOL.split('/')[0], asset_balance,
+            usdt_balance + (asset_balance * price),
+            extra={'journal': ('balances', (usdt_balance, asset_balance, price))}
         )
-
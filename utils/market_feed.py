@@ -0,0 +1,222 @@
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+import pandas as pd
+from config.settings import settings
+from utils.candle_store import COLUMNS, timeframe_to_ms, to_milliseconds
+from utils.logger import TradingLogger
+
+class MarketDataCache:
+    """Latest candle and ticker pushed by a feed, read without I/O
+
+    Every push bumps ``sequence``; ``wait_for_update`` blocks until data
+    newer than a given sequence arrives. Listeners added with
+    ``add_close_listener`` are called (on the feed thread) with each candle
+    once a newer timestamp supersedes it, i.e. when the bar has closed.
+    A feed marks a stream stale when it fails; ``stale`` stays set until
+    that stream pushes again.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self.candle = None
+        self.ticker = None
+        self.sequence = 0
+        self._close_listeners = []
+        self._stale = set()
+
+    @property
+    def stale(self) -> bool:
+        return bool(self._stale)
+
+    def mark_stale(self, stream: str):
+        """Flag ``stream`` ('candle' or 'ticker') as out of date"""
+        with self._cond:
+            self._stale.add(stream)
+
+    def add_close_listener(self, callback):
+        self._close_listeners.append(callback)
+
+    def on_candle(self, candle):
+        """Store a ccxt-style [timestamp, open, high, low, close, volume] row"""
+        with self._cond:
+            self._set_candle(candle)
+            self._publish()
+
+    def on_ticker(self, ticker: dict):
+        with self._cond:
+            self._set_ticker(ticker)
+            self._publish()
+
+    def on_bar(self, ticker: dict, candle):
+        """Store a ticker and candle together as one update"""
+        with self._cond:
+            self._set_ticker(ticker)
+            self._set_candle(candle)
+            self._publish()
+
+    def _set_candle(self, candle):
+        previous = self.candle
+        if previous is not None and candle[0] > previous[0]:
+            for callback in self._close_listeners:
+                callback(previous)
+        self.candle = list(candle)
+        self._stale.discard('candle')
+
+    def _set_ticker(self, ticker: dict):
+        self.ticker = ticker
+        self._stale.discard('ticker')
+
+    def _publish(self):
+        self.sequence += 1
+        self._cond.notify_all()
+
+    def last_price(self) -> float:
+        """Ticker last price, falling back to the latest close"""
+        ticker = self.ticker
+        if ticker is not None and ticker.get('last') is not None:
+            return ticker['last']
+        return self.candle[4]
+
+    def wait_for_update(self, after: int, timeout: float = None) -> int:
+        """Block until ``sequence > after``; returns the new sequence"""
+        with self._cond:
+            self._cond.wait_for(lambda: self.sequence > after, timeout)
+            return self.sequence
+
+    def ready(self) -> bool:
+        return self.candle is not None
+
+
+class MarketFeed(ABC):
+    """Background producer that pushes market data into a cache"""
+
+    def __init__(self, symbol: str = settings.SYMBOL, timeframe: str = settings.TIMEFRAME):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.cache = MarketDataCache()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def wait_ready(self, timeout: float = 30.0) -> bool:
+        """Wait for the first candle"""
+        deadline = time.monotonic() + timeout
+        while not self.cache.ready() and time.monotonic() < deadline:
+            self.cache.wait_for_update(self.cache.sequence, 0.1)
+        return self.cache.ready()
+
+    @abstractmethod
+    def _run(self):
+        """Push data into ``self.cache`` until ``self._stop`` is set (feed thread)"""
+
+
+class CcxtProFeed(MarketFeed):
+    """Websocket feed using ccxt.pro ``watch_ohlcv``/``watch_ticker``
+
+    A failed subscription is logged, its stream is marked stale in the
+    cache, and it is re-subscribed after an exponential backoff (reset by
+    the next successful push).
+    """
+
+    def __init__(self, symbol: str = settings.SYMBOL, timeframe: str = settings.TIMEFRAME,
+                 exchange_id: str = 'binance', min_backoff: float = 1.0, max_backoff: float = 60.0):
+        super().__init__(symbol, timeframe)
+        self.exchange_id = exchange_id
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.logger = TradingLogger(settings.LOG_PATH)
+
+    def _run(self):
+        asyncio.run(self._main())
+
+    async def _main(self):
+        import ccxt.pro as ccxtpro
+        exchange = getattr(ccxtpro, self.exchange_id)({'enableRateLimit': True})
+        try:
+            await asyncio.gather(self._watch_candles(exchange), self._watch_ticker(exchange))
+        finally:
+            await exchange.close()
+
+    async def _watch(self, stream: str, subscribe, on_data):
+        delay = self.min_backoff
+        while not self._stop.is_set():
+            try:
+                data = await subscribe()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.cache.mark_stale(stream)
+                self.logger.log_error(f"{self.symbol} {stream} stream failed, "
+                                      f"re-subscribing in {delay:g}s: {str(e)}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_backoff)
+                continue
+            delay = self.min_backoff
+            on_data(data)
+
+    async def _watch_candles(self, exchange):
+        def on_candles(candles):
+            if candles:
+                self.cache.on_candle(candles[-1])
+        await self._watch('candle', lambda: exchange.watch_ohlcv(self.symbol, self.timeframe), on_candles)
+
+    async def _watch_ticker(self, exchange):
+        await self._watch('ticker', lambda: exchange.watch_ticker(self.symbol), self.cache.on_ticker)
+
+
+class ReplayFeed(MarketFeed):
+    """Offline stand-in that replays recorded candles as a push feed
+
+    ``speed`` is a multiple of real time (one candle every
+    ``timeframe / speed``); ``speed=None`` replays as fast as possible.
+    Each candle and a ticker whose last/bid/ask is the close are pushed as
+    one cache update. With ``loop=True`` the recording restarts when
+    exhausted.
+    """
+
+    def __init__(self, candles, symbol: str = settings.SYMBOL, timeframe: str = settings.TIMEFRAME,
+                 speed: float = 1.0, loop: bool = False):
+        super().__init__(symbol, timeframe)
+        if isinstance(candles, str):
+            candles = pd.read_csv(candles)
+        frame = candles[COLUMNS].copy()
+        frame['timestamp'] = to_milliseconds(frame['timestamp'])
+        self.rows = frame.to_numpy().tolist()
+        self.interval = None if not speed else timeframe_to_ms(timeframe) / 1000 / speed
+        self.loop = loop
+        self.finished = threading.Event()
+
+    def _run(self):
+        next_time = time.monotonic()
+        while not self._stop.is_set():
+            for row in self.rows:
+                if self._stop.is_set():
+                    return
+                self.cache.on_bar({
+                    'symbol': self.symbol, 'timestamp': int(row[0]),
+                    'last': row[4], 'bid': row[4], 'ask': row[4]
+                }, row)
+                if self.interval:
+                    next_time += self.interval
+                    delay = next_time - time.monotonic()
+                    if delay > 0:
+                        self._stop.wait(delay)
+            if not self.loop:
+                break
+        self.finished.set()
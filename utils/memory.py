@@ -1,26 +1,672 @@
+import json
+import os
+import shutil
+import tempfile
+import time
 import numpy as np
-import random
-from collections import deque
+import threading
+from utils.instrumentation import timed
+
+def _restore_array(current, saved, rows):
+    """Reuse a copy-on-write memmap of a full array, else copy the filled rows"""
+    if len(saved) == len(current) and saved.dtype == current.dtype:
+        return saved
+    current[:rows] = saved[:rows]
+    return current
+
 
 class ReplayBuffer:
-    """Experience replay buffer"""
-    
+    """Experience replay buffer
+
+    Transitions live in preallocated fixed-dtype ring arrays; the oldest
+    entries are overwritten once ``capacity`` is reached. ``np.empty`` only
+    reserves address space, so pages are committed as the buffer fills.
+    ``sample`` writes into reused batch arrays, which stay valid until the
+    next call. ``row`` (the bar index of ``state``) is accepted for
+    compatibility with ``IndexedReplayBuffer`` and ignored.
+    """
+
+    ARRAYS = ('states', 'actions', 'rewards', 'next_states', 'dones')
+
+    def __init__(self, capacity, state_size=None, dtype=np.float32, seed=None):
+        self.capacity = int(capacity)
+        self.state_size = state_size
+        self.dtype = dtype
+        self.rng = np.random.default_rng(seed)
+        self.index = 0   # Next write position
+        self.size = 0
+        self._batch_size = None
+        if state_size is not None:
+            self._allocate(state_size)
+
+    def _allocate(self, state_size):
+        self.state_size = state_size
+        self.states = np.empty((self.capacity, state_size), dtype=self.dtype)
+        self.next_states = np.empty((self.capacity, state_size), dtype=self.dtype)
+        self.actions = np.empty(self.capacity, dtype=np.int32)
+        self.rewards = np.empty(self.capacity, dtype=self.dtype)
+        self.dones = np.empty(self.capacity, dtype=np.bool_)
+
+    def _allocate_batch(self, batch_size):
+        self._batch_size = batch_size
+        self._batch = (
+            np.empty((batch_size, self.state_size), dtype=self.dtype),
+            np.empty(batch_size, dtype=np.int32),
+            np.empty(batch_size, dtype=self.dtype),
+            np.empty((batch_size, self.state_size), dtype=self.dtype),
+            np.empty(batch_size, dtype=np.bool_)
+        )
+
+    def add(self, state, action, reward, next_state, done, row=None):
+        if self.state_size is None:
+            self._allocate(len(state))
+        i = self.index
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+        self.index = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_batch(self, states, actions, rewards, next_states, dones, rows=None):
+        """Append a batch of transitions (e.g. from a vectorized env)"""
+        states = np.asarray(states)
+        if self.state_size is None:
+            self._allocate(states.shape[1])
+        idx = (self.index + np.arange(len(states))) % self.capacity
+        self.states[idx] = states
+        self.actions[idx] = actions
+        self.rewards[idx] = rewards
+        self.next_states[idx] = next_states
+        self.dones[idx] = dones
+        self.index = int(idx[-1] + 1) % self.capacity if len(idx) else self.index
+        self.size = min(self.size + len(idx), self.capacity)
+
+    def sample_indices(self, batch_size):
+        """Distinct row indices, like ``random.sample``"""
+        if batch_size > self.size:
+            raise ValueError("Sample larger than population")
+        return self.rng.choice(self.size, batch_size, replace=False)
+
+    @timed('replay.sample')
+    def sample(self, batch_size):
+        return self._gather(self.sample_indices(batch_size))
+
+    def _gather(self, idx):
+        """Copy the transitions at ``idx`` into the reused batch arrays"""
+        if len(idx) != self._batch_size:
+            self._allocate_batch(len(idx))
+        states, actions, rewards, next_states, dones = self._batch
+        np.take(self.states, idx, axis=0, out=states)
+        np.take(self.actions, idx, out=actions)
+        np.take(self.rewards, idx, out=rewards)
+        np.take(self.next_states, idx, axis=0, out=next_states)
+        np.take(self.dones, idx, out=dones)
+        return states, actions, rewards, next_states, dones
+
+    def __len__(self):
+        return self.size
+
+    def close(self):
+        """Nothing to persist for in-memory buffers"""
+
+    def get_state(self) -> tuple:
+        """Copies of the filled rows and scalar metadata, for checkpoints"""
+        arrays = {}
+        if self.state_size is not None:
+            arrays = {name: getattr(self, name)[:self.size].copy() for name in self.ARRAYS}
+        meta = {'capacity': self.capacity, 'state_size': self.state_size, 'index': self.index,
+                'size': self.size, 'rng': self.rng.bit_generator.state}
+        return arrays, meta
+
+    def set_state(self, arrays: dict, meta: dict):
+        """Restore ``get_state`` output; arrays may be copy-on-write memmaps
+
+        A full buffer adopts the mapped arrays directly, so pages are read
+        lazily instead of being copied up front.
+        """
+        if meta['capacity'] != self.capacity:
+            raise ValueError(f"Checkpoint capacity {meta['capacity']} != buffer capacity {self.capacity}")
+        self.index = meta['index']
+        self.size = meta['size']
+        self.rng.bit_generator.state = meta['rng']
+        if meta['state_size'] is None:
+            return
+        if self.state_size is None:
+            self._allocate(meta['state_size'])
+        for name in self.ARRAYS:
+            setattr(self, name, _restore_array(getattr(self, name), arrays[name], self.size))
+
+
+class SumTree:
+    """Array-backed binary sum tree over ``capacity`` leaf priorities"""
+
     def __init__(self, capacity):
-        self.buffer = deque(maxlen=capacity)
-    
-    def add(self, state, action, reward, next_state, done):
-        self.buffer.append( (state, action, reward, next_state, done) )
-    
+        self.capacity = int(capacity)
+        self.leaf_offset = 1
+        while self.leaf_offset < self.capacity:
+            self.leaf_offset *= 2
+        self.depth = self.leaf_offset.bit_length() - 1
+        self.tree = np.zeros(2 * self.leaf_offset)   # Node 1 is the root
+
+    @property
+    def total(self):
+        return self.tree[1]
+
+    def update_one(self, index, priority):
+        """Set a single leaf and walk its path to the root"""
+        node = index + self.leaf_offset
+        tree = self.tree
+        tree[node] = priority
+        node //= 2
+        while node:
+            tree[node] = tree[2 * node] + tree[2 * node + 1]
+            node //= 2
+
+    def update(self, indices, priorities):
+        """Set many leaves, recomputing each touched level once"""
+        nodes = np.asarray(indices) + self.leaf_offset
+        self.tree[nodes] = priorities
+        for _ in range(self.depth):
+            nodes = np.unique(nodes // 2)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def find(self, targets):
+        """Leaf indices whose prefix-sum interval contains each target"""
+        targets = np.array(targets, dtype=np.float64)
+        nodes = np.ones(len(targets), dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * nodes
+            left_sum = self.tree[left]
+            go_right = targets > left_sum
+            targets -= np.where(go_right, left_sum, 0.0)
+            nodes = left + go_right
+        return nodes - self.leaf_offset
+
+    def priorities(self, indices):
+        return self.tree[np.asarray(indices) + self.leaf_offset]
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """Proportional prioritized replay on top of the ring buffer
+
+    ``sample`` additionally returns importance-sampling weights and the
+    sampled indices; feed TD errors back with ``update_priorities``.
+    """
+
+    def __init__(self, capacity, state_size=None, alpha=0.6, beta=0.4,
+                 beta_increment=0.001, epsilon=1e-6, dtype=np.float32, seed=None):
+        super().__init__(capacity, state_size, dtype, seed)
+        self.tree = SumTree(self.capacity)
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = beta_increment
+        self.epsilon = epsilon
+        self.max_priority = 1.0
+
+    def add(self, state, action, reward, next_state, done, row=None):
+        index = self.index
+        super().add(state, action, reward, next_state, done)
+        self.tree.update_one(index, self.max_priority ** self.alpha)
+
+    def add_batch(self, states, actions, rewards, next_states, dones, rows=None):
+        idx = (self.index + np.arange(len(states))) % self.capacity
+        super().add_batch(states, actions, rewards, next_states, dones)
+        self.tree.update(idx, np.full(len(idx), self.max_priority ** self.alpha))
+
+    def sample_indices(self, batch_size):
+        """Stratified proportional sampling: one draw per equal-mass segment"""
+        if batch_size > self.size:
+            raise ValueError("Sample larger than population")
+        segment = self.tree.total / batch_size
+        targets = (np.arange(batch_size) + self.rng.random(batch_size)) * segment
+        # Rounding can walk past the last filled leaf
+        return np.minimum(self.tree.find(targets), self.size - 1)
+
+    @timed('replay.sample')
     def sample(self, batch_size):
-        samples = random.sample(self.buffer, batch_size)
-        states, actions, rewards, next_states, dones = zip(*samples)
-        return (
-            np.array(states),
-            np.array(actions),
-            np.array(rewards),
-            np.array(next_states),
-            np.array(dones)
-        )
-    
+        idx = self.sample_indices(batch_size)
+        states, actions, rewards, next_states, dones = self._gather(idx)
+        probs = self.tree.priorities(idx) / self.tree.total
+        weights = (self.size * probs) ** -self.beta
+        weights = (weights / weights.max()).astype(self.dtype)
+        self.beta = min(1.0, self.beta + self.beta_increment)
+        return states, actions, rewards, next_states, dones, weights, idx
+
+    def update_priorities(self, indices, td_errors):
+        priorities = np.abs(td_errors) + self.epsilon
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(indices, priorities ** self.alpha)
+
+    def get_state(self) -> tuple:
+        arrays, meta = super().get_state()
+        arrays['tree'] = self.tree.tree.copy()
+        meta.update(beta=self.beta, max_priority=self.max_priority)
+        return arrays, meta
+
+    def set_state(self, arrays: dict, meta: dict):
+        super().set_state(arrays, meta)
+        self.tree.tree = _restore_array(self.tree.tree, arrays['tree'], len(self.tree.tree))
+        self.beta = meta['beta']
+        self.max_priority = meta['max_priority']
+
+
+class DiskReplayBuffer(ReplayBuffer):
+    """Ring buffer stored in memory-mapped files under ``directory``
+
+    New transitions collect in an in-RAM hot tier of ``hot_size`` rows and
+    are written to disk as one sequential block when it fills (or on
+    ``flush``). Sampled rows still in the hot tier are read from RAM; the
+    rest are read from the mapped files in ascending index order, i.e.
+    page order, so a batch touches each page once and reads sequentially.
+    ``flush`` also records the ring position in ``meta.json``, and a buffer
+    reopened on the same directory with the same capacity continues where
+    the previous process stopped. Give each concurrent run its own
+    directory: with ``directory=None`` a fresh ``run-*`` directory is
+    created under ``root`` when the first transition arrives, and
+    ``close`` deletes it again unless a checkpoint refers to it.
+
+    Checkpoints do not copy the files: ``get_state`` records the directory
+    and ring position, and ``set_state`` reopens that directory at that
+    position. Rows written after the checkpoint stay in the files, so once
+    the ring has wrapped, the restored buffer samples them in place of the
+    older rows they overwrote.
+    """
+
+    def __init__(self, capacity, state_size=None, directory=None, hot_size=65536,
+                 dtype=np.float32, seed=None, root='replay'):
+        self.hot_size = int(min(hot_size, capacity))
+        self.root = root
+        super().__init__(capacity, None, dtype, seed)
+        self._open(directory, state_size)
+
+    def _open(self, directory, state_size=None):
+        self.directory = directory
+        self._staged = 0        # Rows waiting in the hot tier
+        self._spill_start = 0   # Ring position of the first staged row
+        self.index = self.size = 0
+        self.state_size = None
+        self._owned = False         # Run directory created (and removable) by this buffer
+        self._checkpointed = False  # A checkpoint refers to the files
+        if directory is None:
+            return              # Created with the first add
+        os.makedirs(directory, exist_ok=True)
+
+        meta = self._read_meta()
+        if meta is not None:
+            if meta['capacity'] != self.capacity or meta['dtype'] != np.dtype(self.dtype).str:
+                raise ValueError(f"{directory} holds a buffer with capacity {meta['capacity']} "
+                                 f"and dtype {meta['dtype']}")
+            self._allocate(meta['state_size'], mode='r+')
+            self.index = self._spill_start = meta['index']
+            self.size = meta['size']
+        elif state_size is not None:
+            self._allocate(state_size)
+
+    def _read_meta(self):
+        path = os.path.join(self.directory, 'meta.json')
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _allocate(self, state_size, mode='w+'):
+        if self.directory is None:
+            os.makedirs(self.root, exist_ok=True)
+            self.directory = tempfile.mkdtemp(prefix=time.strftime('run-%Y%m%d-%H%M%S-'), dir=self.root)
+            self._owned = True
+        self.state_size = state_size
+        shapes = {'states': (self.capacity, state_size), 'next_states': (self.capacity, state_size),
+                  'actions': (self.capacity,), 'rewards': (self.capacity,), 'dones': (self.capacity,)}
+        dtypes = {'states': self.dtype, 'next_states': self.dtype, 'actions': np.int32,
+                  'rewards': self.dtype, 'dones': np.bool_}
+        self._hot = {}
+        for name in self.ARRAYS:
+            path = os.path.join(self.directory, f"{name}.dat")
+            setattr(self, name, np.memmap(path, dtype=dtypes[name], mode=mode, shape=shapes[name]))
+            self._hot[name] = np.empty((self.hot_size,) + shapes[name][1:], dtype=dtypes[name])
+
+    def add(self, state, action, reward, next_state, done, row=None):
+        if self.state_size is None:
+            self._allocate(len(state))
+        hot, i = self._hot, self._staged
+        hot['states'][i] = state
+        hot['actions'][i] = action
+        hot['rewards'][i] = reward
+        hot['next_states'][i] = next_state
+        hot['dones'][i] = done
+        self._staged = i + 1
+        self.index = (self.index + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        if self._staged == self.hot_size:
+            self._spill()
+
+    def add_batch(self, states, actions, rewards, next_states, dones, rows=None):
+        states = np.asarray(states)
+        if self.state_size is None:
+            self._allocate(states.shape[1])
+        batch = dict(zip(self.ARRAYS, (states, np.asarray(actions), np.asarray(rewards),
+                                       np.asarray(next_states), np.asarray(dones))))
+        start = 0
+        while start < len(states):
+            n = min(self.hot_size - self._staged, len(states) - start)
+            for name, values in batch.items():
+                self._hot[name][self._staged:self._staged + n] = values[start:start + n]
+            self._staged += n
+            start += n
+            if self._staged == self.hot_size:
+                self._spill()
+        self.index = (self.index + len(states)) % self.capacity
+        self.size = min(self.size + len(states), self.capacity)
+
+    def _spill(self):
+        """Write the hot tier to disk as (at most two) contiguous blocks"""
+        n, start = self._staged, self._spill_start
+        first = min(n, self.capacity - start)
+        for name in self.ARRAYS:
+            disk, hot = getattr(self, name), self._hot[name]
+            disk[start:start + first] = hot[:first]
+            disk[:n - first] = hot[first:n]
+        self._spill_start = (start + n) % self.capacity
+        self._staged = 0
+
+    def _gather(self, idx):
+        if len(idx) != self._batch_size:
+            self._allocate_batch(len(idx))
+        offset = (idx - self._spill_start) % self.capacity
+        hot = np.flatnonzero(offset < self._staged)
+        cold = np.flatnonzero(offset >= self._staged)
+        cold = cold[np.argsort(idx[cold], kind='stable')]   # Page order
+        rows = idx[cold]
+        for name, out in zip(self.ARRAYS, self._batch):
+            out[cold] = getattr(self, name)[rows]
+            if len(hot):
+                out[hot] = self._hot[name][offset[hot]]
+        return self._batch
+
+    def flush(self):
+        """Spill the hot tier, sync the files and record the ring position"""
+        if self.state_size is None:
+            return
+        if self._staged:
+            self._spill()
+        for name in self.ARRAYS:
+            getattr(self, name).flush()
+        meta = {'capacity': self.capacity, 'state_size': self.state_size,
+                'dtype': np.dtype(self.dtype).str, 'index': self.index, 'size': self.size}
+        path = os.path.join(self.directory, 'meta.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(path + '.tmp', path)
+
+    def close(self):
+        """Flush, or delete a run directory that no checkpoint refers to"""
+        if self._owned and not self._checkpointed:
+            self._remove()
+        else:
+            self.flush()
+
+    def _remove(self):
+        for name in self.ARRAYS:
+            setattr(self, name, None)   # Unmap before deleting the files
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self._open(None)
+
+    def get_state(self) -> tuple:
+        """The files persist themselves; checkpoints carry the directory and ring position"""
+        self.flush()
+        self._checkpointed = self.directory is not None
+        return {}, {'capacity': self.capacity, 'rng': self.rng.bit_generator.state,
+                    'directory': self.directory, 'index': self.index, 'size': self.size}
+
+    def set_state(self, arrays: dict, meta: dict):
+        if meta['capacity'] != self.capacity:
+            raise ValueError(f"Checkpoint capacity {meta['capacity']} != buffer capacity {self.capacity}")
+        # A checkpoint taken before the first add has no directory: just empty this buffer
+        directory = meta['directory'] and os.path.abspath(meta['directory'])
+        if directory is not None and (self.directory is None or
+                                      directory != os.path.abspath(self.directory)):
+            if not os.path.exists(os.path.join(directory, 'meta.json')):
+                raise ValueError(f"Checkpoint replay directory {directory} is missing")
+            if self.directory is not None:
+                self.close()
+            self._open(directory)
+            self._checkpointed = True
+        self.index = self._spill_start = meta['index']
+        self.size = meta['size']
+        self._staged = 0
+        self.rng.bit_generator.state = meta['rng']
+
+
+class IndexedReplayBuffer(ReplayBuffer):
+    """Compact replay that stores bar indices instead of market features
+
+    ``market_states`` holds the market part of the state for every bar
+    (full state width; the ``account_columns`` slice is ignored) and is
+    shared, not copied. A transition keeps only the bar index of ``state``,
+    its account columns, action, reward and done in one packed 32-bit
+    record; ``next_state`` is assumed to be bar ``row + 1``. Within an
+    episode the next state equals the following transition's state, so
+    each record points at the record holding its next state's accounts and
+    nothing is stored twice. A next state that does not match the
+    following add (an episode end) is kept in an overflow ring that starts
+    small and doubles only while all of its entries are still referenced.
+    ``sample`` returns exactly what ``ReplayBuffer`` would.
+    """
+
+    ARRAYS = ('records',)
+    # Record columns (int32; reward and accounts hold float32 bits)
+    _ROW, _NEXT, _ACTION, _DONE, _REWARD, _ACCOUNT = range(6)
+
+    def __init__(self, capacity, market_states, account_columns=slice(4, 7), seed=None,
+                 overflow_size=64):
+        self.market_states = np.asarray(market_states, dtype=np.float32)
+        state_size = self.market_states.shape[1]
+        self.account_columns = account_columns
+        self.account_size = len(range(*account_columns.indices(state_size)))
+        self._overflow_size = int(min(overflow_size, capacity))
+        self._overflow_index = 0
+        self._adds = 0            # Transitions added so far (ages overflow entries)
+        self._pending_row = -1
+        super().__init__(capacity, state_size, np.float32, seed)
+
+    def _allocate(self, state_size):
+        self.state_size = state_size
+        # Transition records, the pending next state, then the overflow ring
+        width = self._ACCOUNT + self.account_size
+        self.records = np.empty((self.capacity + 1 + self._overflow_size, width), dtype=np.int32)
+        self._values = self.records.view(np.float32)
+        self._pending = self.capacity
+        self._overflow_start = self.capacity + 1
+        # Add count of the record pointing at each overflow entry (-capacity: free)
+        self._overflow_owner = np.full(self._overflow_size, -self.capacity, dtype=np.int64)
+
+    def _grow_overflow(self, size):
+        extra = size - self._overflow_size
+        self.records = np.concatenate([self.records, np.empty((extra, self.records.shape[1]), np.int32)])
+        self._values = self.records.view(np.float32)
+        self._overflow_owner = np.concatenate([self._overflow_owner,
+                                               np.full(extra, -self.capacity, dtype=np.int64)])
+        self._overflow_index = self._overflow_size
+        self._overflow_size = size
+
+    def _overflow_slot(self) -> int:
+        """Next free overflow row; grows the ring when every entry is still referenced"""
+        slot = self._overflow_index
+        # An entry is free once the record pointing at it has been overwritten
+        if self._overflow_owner[slot] + self.capacity > self._adds:
+            free = np.flatnonzero(self._overflow_owner + self.capacity <= self._adds)
+            if len(free):
+                slot = int(free[0])
+            else:
+                # At most capacity - 1 entries are live, so this stops below capacity
+                self._grow_overflow(min(2 * self._overflow_size, self.capacity))
+                slot = self._overflow_index
+        self._overflow_owner[slot] = self._adds - 1
+        self._overflow_index = (slot + 1) % self._overflow_size
+        return self._overflow_start + slot
+
+    def add(self, state, action, reward, next_state, done, row=None):
+        if row is None:
+            raise ValueError("IndexedReplayBuffer needs the bar index of each state")
+        i = self.index
+        accounts = self._values[i, self._ACCOUNT:]
+        accounts[:] = state[self.account_columns]
+        pending = self._values[self._pending, self._ACCOUNT:]
+        if self.size:
+            previous = (i - 1) % self.capacity
+            if self._pending_row == row and (pending == accounts).all():
+                self.records[previous, self._NEXT] = i
+            else:
+                overflow = self._overflow_slot()
+                self._values[overflow, self._ACCOUNT:] = self._values[self._pending, self._ACCOUNT:]
+                self.records[previous, self._NEXT] = overflow
+        record, values = self.records[i], self._values[i]
+        record[self._ROW] = row
+        record[self._NEXT] = self._pending
+        record[self._ACTION] = action
+        record[self._DONE] = done
+        values[self._REWARD] = reward
+        self._values[self._pending, self._ACCOUNT:] = next_state[self.account_columns]
+        self._pending_row = row + 1
+        self._adds += 1
+        self.index = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_batch(self, states, actions, rewards, next_states, dones, rows=None):
+        if rows is None:
+            raise ValueError("IndexedReplayBuffer needs the bar index of each state")
+        for transition in zip(states, actions, rewards, next_states, dones, rows):
+            self.add(*transition)
+
+    def _gather(self, idx):
+        n = len(idx)
+        if n != self._batch_size:
+            self._allocate_batch(n)
+        states, actions, rewards, next_states, dones = self._batch
+        records = np.take(self.records, idx, axis=0, mode='clip')
+        following = np.take(self.records, records[:, self._NEXT], axis=0, mode='clip')
+        values, following = records.view(np.float32), following.view(np.float32)
+        rows = records[:, self._ROW]
+        np.take(self.market_states, rows, axis=0, out=states, mode='clip')
+        np.take(self.market_states, rows + 1, axis=0, out=next_states, mode='clip')
+        states[:, self.account_columns] = values[:, self._ACCOUNT:]
+        next_states[:, self.account_columns] = following[:, self._ACCOUNT:]
+
+        actions[:] = records[:, self._ACTION]
+        rewards[:] = values[:, self._REWARD]
+        dones[:] = records[:, self._DONE]
+        return self._batch
+
+    def get_state(self) -> tuple:
+        arrays, meta = super().get_state()
+        arrays['overflow'] = self.records[self._overflow_start:].copy()
+        arrays['overflow_owner'] = self._overflow_owner.copy()
+        meta.update(overflow_index=self._overflow_index, adds=self._adds,
+                    pending_row=self._pending_row, pending=self.records[self._pending].tolist())
+        return arrays, meta
+
+    def set_state(self, arrays: dict, meta: dict):
+        super().set_state(arrays, meta)
+        size = len(arrays['overflow'])
+        if size > self._overflow_size:
+            self._grow_overflow(size)
+        elif size < self._overflow_size:
+            self.records = self.records[:self._overflow_start + size].copy()
+            self._values = self.records.view(np.float32)
+            self._overflow_owner = self._overflow_owner[:size].copy()
+            self._overflow_size = size
+        self.records[self._overflow_start:] = arrays['overflow']
+        self._overflow_owner[:] = arrays['overflow_owner']
+        self._overflow_index = meta['overflow_index']
+        self._adds = meta['adds']
+        self._pending_row = meta['pending_row']
+        self.records[self._pending] = meta['pending']
+
+
+class NStepWindow:
+    """Turns one environment's 1-step transitions into n-step transitions
+
+    ``push`` returns the transitions it completes as ``(state, action,
+    return, next_state, done, row)`` tuples, where ``return`` is the
+    discounted sum of the next ``n`` rewards and ``next_state`` is ``n``
+    steps ahead; targets then bootstrap with ``gamma ** n``. At an episode
+    end the shorter tails are emitted with ``done=True`` (no bootstrap).
+    Returns come from a precomputed discount matrix, so a window costs one
+    small dot product per step. States are copied on push, so environments
+    may reuse their state buffer; ``clear`` drops an abandoned episode.
+    """
+
+    def __init__(self, n, gamma):
+        self.n = int(n)
+        # Row k discounts window rewards k.. back to position k
+        offsets = np.arange(self.n)[np.newaxis, :] - np.arange(self.n)[:, np.newaxis]
+        self._discounts = np.where(offsets >= 0, float(gamma) ** np.maximum(offsets, 0), 0.0)
+        self._rewards = np.zeros(self.n)
+        self._pending = []   # (state, action, row) awaiting their n-step return
+
+    def __len__(self):
+        return len(self._pending)
+
+    def push(self, state, action, reward, next_state, done, row=None) -> list:
+        k = len(self._pending)
+        self._pending.append((np.array(state, copy=True), action, row))
+        self._rewards[k] = reward
+        if done:
+            returns = (self._discounts[:k + 1, :k + 1] @ self._rewards[:k + 1]).tolist()
+            ready = [(s, a, g, next_state, True, r) for (s, a, r), g in zip(self._pending, returns)]
+            self._pending = []
+            return ready
+        if k + 1 < self.n:
+            return []
+        g = float(self._discounts[0] @ self._rewards)
+        s, a, r = self._pending.pop(0)
+        self._rewards[:-1] = self._rewards[1:]
+        return [(s, a, g, next_state, False, r)]
+
+    def clear(self):
+        self._pending = []
+
+
+class SynchronizedReplayBuffer:
+    """Thread-safe proxy so actors can add while a learner samples
+
+    Only buffer access is serialized; the sampled batch arrays belong to
+    the single learner thread and are used outside the lock.
+    """
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.lock = threading.Lock()
+
+    def add(self, *transition):
+        with self.lock:
+            self.buffer.add(*transition)
+
+    def add_batch(self, *transitions):
+        with self.lock:
+            self.buffer.add_batch(*transitions)
+
+    def sample(self, batch_size):
+        with self.lock:
+            return self.buffer.sample(batch_size)
+
+    def update_priorities(self, indices, td_errors):
+        with self.lock:
+            self.buffer.update_priorities(indices, td_errors)
+
+    def close(self):
+        with self.lock:
+            self.buffer.close()
+
+    def get_state(self) -> tuple:
+        with self.lock:
+            return self.buffer.get_state()
+
+    def set_state(self, arrays: dict, meta: dict):
+        with self.lock:
+            self.buffer.set_state(arrays, meta)
+
     def __len__(self):
-        return len(self.buffer)
\ No newline at end of file
+        return len(self.buffer)
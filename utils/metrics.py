@@ -0,0 +1,97 @@
+import math
+from config.settings import settings
+
+class StreamingMetrics:
+    """Constant-time, constant-memory performance metrics
+
+    ``update`` is called once per environment step and keeps the running
+    peak, drawdown, max drawdown, Welford mean/variance of step returns,
+    trade count and turnover for the current episode. ``end_episode``
+    closes the episode and appends its summary to ``episodes``.
+    """
+
+    def __init__(self, risk_free_rate: float = settings.RISK_FREE_RATE):
+        self.risk_free_rate = risk_free_rate
+        self.episodes = []
+        self.start_episode()
+
+    def start_episode(self, initial_value: float = None, initial_position: float = 0.0):
+        self.steps = 0
+        self.initial_value = initial_value
+        self.last_value = initial_value
+        self.last_position = initial_position
+        self.peak = initial_value if initial_value is not None else -math.inf
+        self.drawdown = 0.0
+        self.max_drawdown = 0.0
+        self.return_count = 0
+        self.return_mean = 0.0
+        self.return_m2 = 0.0
+        self.trades = 0
+        self.turnover = 0.0
+
+    def update(self, portfolio_value: float, position: float = None, price: float = None) -> float:
+        """Record one step; returns the current drawdown"""
+        self.steps += 1
+        if self.initial_value is None:
+            self.initial_value = portfolio_value
+
+        # Peak and drawdown
+        if portfolio_value > self.peak:
+            self.peak = portfolio_value
+        self.drawdown = (self.peak - portfolio_value) / self.peak
+        if self.drawdown > self.max_drawdown:
+            self.max_drawdown = self.drawdown
+
+        # Welford update of per-step returns
+        if self.last_value:
+            ret = (portfolio_value - self.last_value) / self.last_value
+            self.return_count += 1
+            delta = ret - self.return_mean
+            self.return_mean += delta / self.return_count
+            self.return_m2 += delta * (ret - self.return_mean)
+        self.last_value = portfolio_value
+
+        # Trades and turnover
+        if position is not None:
+            traded = abs(position - self.last_position)
+            if traded > 0:
+                self.trades += 1
+                self.turnover += traded * price if price is not None else traded
+            self.last_position = position
+
+        return self.drawdown
+
+    @property
+    def return_std(self) -> float:
+        if self.return_count < 2:
+            return 0.0
+        return math.sqrt(self.return_m2 / (self.return_count - 1))
+
+    @property
+    def sharpe(self) -> float:
+        std = self.return_std
+        if std == 0:
+            return 0.0
+        return (self.return_mean - self.risk_free_rate) / std
+
+    def summary(self) -> dict:
+        initial = self.initial_value or 0.0
+        return {
+            'steps': self.steps,
+            'final_value': self.last_value,
+            'total_return': (self.last_value - initial) / initial if initial else 0.0,
+            'peak': self.peak,
+            'max_drawdown': self.max_drawdown,
+            'mean_return': self.return_mean,
+            'return_std': self.return_std,
+            'sharpe': self.sharpe,
+            'trades': self.trades,
+            'turnover': self.turnover
+        }
+
+    def end_episode(self) -> dict:
+        """Store and return the finished episode's summary, then reset"""
+        summary = self.summary()
+        self.episodes.append(summary)
+        self.start_episode()
+        return summary
@@ -0,0 +1,142 @@
+import json
+import os
+import numpy as np
+
+STEP_DTYPE = np.dtype([
+    ('episode', np.int32),
+    ('portfolio_value', np.float64),
+    ('position', np.float64),
+    ('drawdown', np.float64)
+])
+
+EPISODE_DTYPE = np.dtype([
+    ('episode', np.int32),
+    ('reward', np.float64),
+    ('final_value', np.float64),
+    ('max_drawdown', np.float64),
+    ('sharpe', np.float64),
+    ('trades', np.int64),
+    ('turnover', np.float64)
+])
+
+
+class MetricsLog:
+    """Append-only binary log of fixed-dtype records
+
+    Records collect in a preallocated chunk and are appended to ``path``
+    whenever the chunk fills or ``flush`` is called, so memory stays at one
+    chunk and a crash loses at most the unflushed tail. The dtype is kept
+    in a ``.json`` sidecar; ``read`` memory-maps the file.
+
+    With ``append=True`` an existing log is continued; ``records`` cuts it
+    back to that many records first (e.g. the count saved with a
+    checkpoint), and a torn partial record at the end is always dropped.
+    """
+
+    def __init__(self, path: str, dtype: np.dtype, chunk_size: int = 65536, append: bool = False,
+                 records: int = None):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.chunk = np.empty(chunk_size, dtype=self.dtype)
+        self.count = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path + '.json', 'w') as f:
+            json.dump(self.dtype.descr, f)
+        self.file = open(path, 'ab' if append else 'wb')
+        self.flushed = self.file.seek(0, os.SEEK_END) // self.dtype.itemsize
+        if records is not None:
+            self.flushed = min(self.flushed, records)
+        self.file.truncate(self.flushed * self.dtype.itemsize)
+
+    @property
+    def records(self) -> int:
+        """Records logged so far, flushed or not"""
+        return self.flushed + self.count
+
+    def append(self, *values):
+        """Add one record (values in dtype field order)"""
+        self.chunk[self.count] = values
+        self.count += 1
+        if self.count == len(self.chunk):
+            self.flush()
+
+    def flush(self):
+        if self.count:
+            self.file.write(self.chunk[:self.count].tobytes())
+            self.flushed += self.count
+            self.count = 0
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def read(path: str) -> np.ndarray:
+        """Memory-mapped structured array of every complete flushed record
+
+        A torn partial record at the end (e.g. from a crash mid-write) is
+        left out.
+        """
+        with open(path + '.json') as f:
+            dtype = np.dtype([tuple(field) for field in json.load(f)])
+        count = os.path.getsize(path) // dtype.itemsize
+        if count == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r', shape=(count,))
+
+
+def downsample_minmax(values: np.ndarray, buckets: int = 2000, block: int = 1 << 20) -> tuple:
+    """Reduce a long series to per-bucket min/max pairs for plotting
+
+    Returns ``(x, y)`` with two points per bucket, in the order they occur,
+    so spikes stay visible. Reads ``values`` block by block, which keeps
+    memory bounded for memory-mapped input.
+    """
+    n = len(values)
+    if n <= 2 * buckets:
+        return np.arange(n), np.asarray(values)
+
+    size = -(-n // buckets)   # Samples per bucket (ceil)
+    bucket_rows = max(1, block // size)
+    xs, ys = [], []
+    for start in range(0, n, bucket_rows * size):
+        chunk = np.asarray(values[start:start + bucket_rows * size], dtype=np.float64)
+        pad = -len(chunk) % size
+        if pad:
+            chunk = np.concatenate([chunk, np.full(pad, np.nan)])
+        rows = chunk.reshape(-1, size)
+        lo, hi = np.nanargmin(rows, axis=1), np.nanargmax(rows, axis=1)
+        first, second = np.minimum(lo, hi), np.maximum(lo, hi)
+        offsets = start + np.arange(len(rows)) * size
+        idx = np.arange(len(rows))
+        xs.append(np.column_stack([offsets + first, offsets + second]).ravel())
+        ys.append(np.column_stack([rows[idx, first], rows[idx, second]]).ravel())
+    return np.concatenate(xs), np.concatenate(ys)
+
+
+def chunked_diff_histogram(values: np.ndarray, bins: int = 50, block: int = 1 << 20) -> tuple:
+    """Histogram of ``np.diff(values)`` computed block by block (two passes)"""
+    n = len(values)
+    lo, hi = np.inf, -np.inf
+    for start in range(0, n - 1, block):
+        diff = np.diff(np.asarray(values[start:start + block + 1], dtype=np.float64))
+        if len(diff):
+            lo, hi = min(lo, diff.min()), max(hi, diff.max())
+    if not np.isfinite(lo):
+        return np.zeros(bins), np.linspace(0, 1, bins + 1)
+
+    counts = np.zeros(bins, dtype=np.int64)
+    edges = np.linspace(lo, hi, bins + 1)
+    for start in range(0, n - 1, block):
+        diff = np.diff(np.asarray(values[start:start + block + 1], dtype=np.float64))
+        counts += np.histogram(diff, bins=edges)[0]
+    return counts, edges
@@ -0,0 +1,333 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+import ccxt
+from config.settings import settings
+
+class SimOrder:
+    """Resting or completed order in the simulated book"""
+
+    __slots__ = ('id', 'side', 'price', 'amount', 'remaining', 'cost', 'fee',
+                 'owned', 'status', 'timestamp', 'trades')
+
+    def __init__(self, id, side, price, amount, owned):
+        self.id = id
+        self.side = side
+        self.price = price
+        self.amount = amount
+        self.remaining = amount
+        self.cost = 0.0
+        self.fee = 0.0
+        self.owned = owned          # Placed through the API (vs. external liquidity)
+        self.status = 'open'
+        self.timestamp = int(time.time() * 1000)
+        self.trades = 0
+
+
+class SimulatedExchange:
+    """In-process exchange implementing the ccxt subset used by the live path
+
+    One limit order book per instance with price-time priority matching,
+    partial fills and a flat ``fee_rate`` charged in the quote currency
+    (same model as ``BacktestEnvironment``). Orders placed through the API
+    belong to a single account whose balances are reserved while orders
+    rest. Counterparty liquidity comes from ``add_liquidity`` or
+    ``set_mid_price``. ``latency`` (seconds, or a zero-argument callable)
+    is slept before every API call.
+    """
+
+    def __init__(self, symbol: str = settings.SYMBOL, balances: dict = None,
+                 fee_rate: float = settings.FEE_RATE, min_amount: float = 0.001,
+                 min_cost: float = 1.0, latency=0.0):
+        self.symbol = symbol
+        self.base, self.quote = symbol.split('/')
+        self.fee_rate = fee_rate
+        self.min_amount = min_amount
+        self.min_cost = min_cost
+        self.latency = latency
+        self.markets = {}
+
+        self.free = {self.quote: settings.INITIAL_BALANCE, self.base: 0.0}
+        if balances:
+            self.free.update(balances)
+        self.used = {currency: 0.0 for currency in self.free}
+
+        self.bids = []          # Heap of -price
+        self.asks = []          # Heap of price
+        self.levels = {'buy': {}, 'sell': {}}   # price -> deque of SimOrder
+        self.orders = {}        # Owned orders by id
+        self.last_price = None
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+
+    # ccxt API ---------------------------------------------------------
+
+    def _delay(self):
+        delay = self.latency() if callable(self.latency) else self.latency
+        if delay:
+            time.sleep(delay)
+
+    def load_markets(self, reload: bool = False):
+        self._delay()
+        self.markets[self.symbol] = {
+            'symbol': self.symbol, 'base': self.base, 'quote': self.quote,
+            'limits': {'amount': {'min': self.min_amount, 'max': None},
+                       'cost': {'min': self.min_cost, 'max': None}},
+            'taker': self.fee_rate, 'maker': self.fee_rate
+        }
+        return self.markets
+
+    def market(self, symbol: str) -> dict:
+        if symbol not in self.markets:
+            raise ccxt.BadSymbol(f"{symbol} not loaded")
+        return self.markets[symbol]
+
+    def fetch_balance(self) -> dict:
+        self._delay()
+        with self._lock:
+            result = {'free': dict(self.free), 'used': dict(self.used), 'total': {}}
+            for currency in self.free:
+                total = self.free[currency] + self.used[currency]
+                result['total'][currency] = total
+                result[currency] = {'free': self.free[currency], 'used': self.used[currency], 'total': total}
+            return result
+
+    def fetch_ticker(self, symbol: str) -> dict:
+        self._delay()
+        with self._lock:
+            bid = self._best('buy')
+            ask = self._best('sell')
+            return {'symbol': symbol, 'timestamp': int(time.time() * 1000),
+                    'last': self.last_price, 'bid': bid, 'ask': ask}
+
+    def create_limit_buy_order(self, symbol: str, amount: float, price: float, params: dict = None) -> dict:
+        return self.create_order(symbol, 'limit', 'buy', amount, price)
+
+    def create_limit_sell_order(self, symbol: str, amount: float, price: float, params: dict = None) -> dict:
+        return self.create_order(symbol, 'limit', 'sell', amount, price)
+
+    def create_order(self, symbol: str, type: str, side: str, amount: float,
+                     price: float = None, params: dict = None) -> dict:
+        self._delay()
+        if symbol != self.symbol:
+            raise ccxt.BadSymbol(symbol)
+        if type != 'limit' or price is None:
+            raise ccxt.InvalidOrder("Only limit orders are supported")
+        if amount < self.min_amount or amount * price < self.min_cost:
+            raise ccxt.InvalidOrder(f"Order {amount}@{price} below market limits")
+
+        with self._lock:
+            # Reserve funds for the full order up front
+            if side == 'buy':
+                currency, reserve = self.quote, amount * price * (1 + self.fee_rate)
+            else:
+                currency, reserve = self.base, amount
+            if self.free.get(currency, 0.0) < reserve:
+                raise ccxt.InsufficientFunds(f"Need {reserve} {currency}")
+            self.free[currency] -= reserve
+            self.used[currency] += reserve
+
+            order = SimOrder(str(next(self._ids)), side, price, amount, True)
+            self.orders[order.id] = order
+            self._match(order)
+            return self._to_ccxt(order)
+
+    def cancel_order(self, id: str, symbol: str = None) -> dict:
+        self._delay()
+        with self._lock:
+            order = self.orders.get(id)
+            if order is None or order.status != 'open':
+                raise ccxt.OrderNotFound(id)
+            self._remove_resting(order)
+            order.status = 'canceled'
+            self._release(order)
+            return self._to_ccxt(order)
+
+    def fetch_order(self, id: str, symbol: str = None) -> dict:
+        self._delay()
+        with self._lock:
+            if id not in self.orders:
+                raise ccxt.OrderNotFound(id)
+            return self._to_ccxt(self.orders[id])
+
+    def fetch_open_orders(self, symbol: str = None) -> list:
+        self._delay()
+        with self._lock:
+            return [self._to_ccxt(o) for o in self.orders.values() if o.status == 'open']
+
+    # Liquidity --------------------------------------------------------
+
+    def add_liquidity(self, side: str, price: float, amount: float):
+        """External order: matches against the book, remainder rests"""
+        with self._lock:
+            self._match(SimOrder(None, side, price, amount, False))
+
+    def set_mid_price(self, price: float, levels: int = 5, size: float = 10.0, tick: float = 0.01):
+        """Replace external quotes with a symmetric ladder around ``price``"""
+        with self._lock:
+            for side in ('buy', 'sell'):
+                for level_price, queue in list(self.levels[side].items()):
+                    kept = deque(o for o in queue if o.owned)
+                    if kept:
+                        self.levels[side][level_price] = kept
+                    else:
+                        del self.levels[side][level_price]
+            self.bids = [-p for p in self.levels['buy']]
+            self.asks = list(self.levels['sell'])
+            heapq.heapify(self.bids)
+            heapq.heapify(self.asks)
+            for i in range(1, levels + 1):
+                self._match(SimOrder(None, 'sell', round(price + i * tick, 10), size, False))
+                self._match(SimOrder(None, 'buy', round(price - i * tick, 10), size, False))
+            if self.last_price is None:
+                self.last_price = price
+
+    # Matching engine --------------------------------------------------
+
+    def _best(self, side: str):
+        heap = self.bids if side == 'buy' else self.asks
+        levels = self.levels[side]
+        while heap:
+            price = -heap[0] if side == 'buy' else heap[0]
+            if price in levels:
+                return price
+            heapq.heappop(heap)     # Stale level
+        return None
+
+    def _match(self, order: SimOrder):
+        opposite = 'sell' if order.side == 'buy' else 'buy'
+        levels = self.levels[opposite]
+        while order.remaining > 0:
+            best = self._best(opposite)
+            if best is None or (best > order.price if order.side == 'buy' else best < order.price):
+                break
+            queue = levels[best]
+            while queue and order.remaining > 0:
+                resting = queue[0]
+                quantity = min(order.remaining, resting.remaining)
+                self._fill(resting, quantity, best)
+                self._fill(order, quantity, best)
+                if resting.remaining <= 0:
+                    queue.popleft()
+            if not queue:
+                del levels[best]
+
+        if order.remaining > 0:
+            self._rest(order)
+
+    def _fill(self, order: SimOrder, quantity: float, price: float):
+        order.remaining -= quantity
+        order.cost += quantity * price
+        order.trades += 1
+        self.last_price = price
+        if order.remaining <= 1e-12:
+            order.remaining = 0.0
+            order.status = 'closed'
+        if not order.owned:
+            return
+
+        fee = quantity * price * self.fee_rate
+        order.fee += fee
+        if order.side == 'buy':
+            # Reserved at the limit price; refund any price improvement
+            reserved = quantity * order.price * (1 + self.fee_rate)
+            self._unreserve(self.quote, reserved)
+            self.free[self.quote] += reserved - quantity * price - fee
+            self.free[self.base] += quantity
+        else:
+            self._unreserve(self.base, quantity)
+            self.free[self.quote] += quantity * price - fee
+
+    def _rest(self, order: SimOrder):
+        levels = self.levels[order.side]
+        if order.price not in levels:
+            levels[order.price] = deque()
+            heapq.heappush(self.bids if order.side == 'buy' else self.asks,
+                           -order.price if order.side == 'buy' else order.price)
+        levels[order.price].append(order)
+
+    def _remove_resting(self, order: SimOrder):
+        levels = self.levels[order.side]
+        queue = levels.get(order.price)
+        if queue is not None:
+            queue.remove(order)
+            if not queue:
+                del levels[order.price]
+
+    def _release(self, order: SimOrder):
+        """Return the reservation held by an order's unfilled remainder"""
+        if order.side == 'buy':
+            amount, currency = order.remaining * order.price * (1 + self.fee_rate), self.quote
+        else:
+            amount, currency = order.remaining, self.base
+        self._unreserve(currency, amount)
+        self.free[currency] += amount
+
+    def _unreserve(self, currency: str, amount: float):
+        used = self.used[currency] - amount
+        self.used[currency] = used if used > 1e-9 else 0.0  # Absorb rounding dust
+
+    def _to_ccxt(self, order: SimOrder) -> dict:
+        filled = order.amount - order.remaining
+        return {
+            'id': order.id, 'symbol': self.symbol, 'type': 'limit', 'side': order.side,
+            'price': order.price, 'amount': order.amount, 'filled': filled,
+            'remaining': order.remaining, 'cost': order.cost,
+            'average': order.cost / filled if filled else None,
+            'status': order.status, 'timestamp': order.timestamp,
+            'fee': {'currency': self.quote, 'cost': order.fee, 'rate': self.fee_rate}
+        }
+
+
+class AsyncSimulatedExchange:
+    """Awaitable facade over ``SimulatedExchange`` for the asyncio live loop
+
+    Latency is awaited with ``asyncio.sleep`` so concurrent requests overlap.
+    """
+
+    def __init__(self, exchange: SimulatedExchange):
+        self.sync = exchange
+        self.latency = exchange.latency
+        exchange.latency = 0.0
+
+    async def _delay(self):
+        delay = self.latency() if callable(self.latency) else self.latency
+        if delay:
+            await asyncio.sleep(delay)
+
+    def market(self, symbol: str) -> dict:
+        return self.sync.market(symbol)
+
+    async def load_markets(self, reload: bool = False):
+        await self._delay()
+        return self.sync.load_markets(reload)
+
+    async def fetch_balance(self) -> dict:
+        await self._delay()
+        return self.sync.fetch_balance()
+
+    async def fetch_ticker(self, symbol: str) -> dict:
+        await self._delay()
+        return self.sync.fetch_ticker(symbol)
+
+    async def create_limit_buy_order(self, symbol: str, amount: float, price: float, params: dict = None) -> dict:
+        await self._delay()
+        return self.sync.create_limit_buy_order(symbol, amount, price)
+
+    async def create_limit_sell_order(self, symbol: str, amount: float, price: float, params: dict = None) -> dict:
+        await self._delay()
+        return self.sync.create_limit_sell_order(symbol, amount, price)
+
+    async def cancel_order(self, id: str, symbol: str = None) -> dict:
+        await self._delay()
+        return self.sync.cancel_order(id, symbol)
+
+    async def fetch_order(self, id: str, symbol: str = None) -> dict:
+        await self._delay()
+        return self.sync.fetch_order(id, symbol)
+
+    async def close(self):
+        pass